@@ -1,14 +1,19 @@
 # Tag: core
 # Path: /Users/hodduk/Documents/git/mfa/backend/app/db/supabase.py
 
+import asyncio
 import threading
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
 
 from supabase import create_client, Client
 from app.config import SUPABASE_URL, SUPABASE_SERVICE_KEY
 
 _main_client: Optional[Client] = None
 _thread_local = threading.local()
+# 블로킹 Supabase 호출용 공유 스레드 풀 (워커 스레드마다 thread-local 클라이언트 사용)
+_db_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="supabase")
 
 
 def get_supabase() -> Client:
@@ -24,3 +29,8 @@ def get_supabase() -> Client:
             client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
             _thread_local.client = client
         return client
+
+
+async def run_db(fn: Callable[..., Any], *args: Any) -> Any:
+    """블로킹 DB 함수를 공유 DB 스레드 풀에서 실행하여 이벤트 루프를 막지 않는다."""
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, partial(fn, *args))
@@ -1,16 +1,20 @@
 # Tag: core
 # Path: /Users/hodduk/Documents/git/mfa/backend/app/dependencies/auth.py
 
-from datetime import datetime, timedelta, timezone
+import asyncio
+import hmac
+
+import jwt
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.config import METRICS_TOKEN
 from app.db.supabase import get_supabase
+from app.services.session_cache import is_session_active
+from app.services.token_verifier import verify_access_token
 
 security = HTTPBearer()
 
-SESSION_TIMEOUT_MINUTES = 30
-
 # 세션 검사를 건너뛸 경로 (로그인 직후 호출되므로 세션 미존재 상태)
 SESSION_EXEMPT_PATHS = {"/api/session/register"}
 
@@ -21,50 +25,51 @@ async def get_current_user(
 ) -> dict:
     """Authorization Bearer 토큰을 검증하고 user 정보를 반환한다."""
     token = credentials.credentials
-    db = get_supabase()
+    user = await _verify_token(token)
 
-    try:
-        user_response = db.auth.get_user(token)
-        user = user_response.user
-        if not user:
+    # 세션 검사 (exempt 경로 제외)
+    if request.url.path not in SESSION_EXEMPT_PATHS:
+        device_id = request.headers.get("X-Device-ID")
+        if not await is_session_active(user["id"], device_id):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid or expired token",
+                detail="session_expired",
             )
-    except HTTPException:
-        raise
-    except Exception as e:
+
+    return user
+
+
+async def _verify_token(token: str) -> dict:
+    """토큰을 로컬(JWT secret/JWKS)에서 우선 검증하고, 불가능하면 Supabase Auth에 조회한다."""
+    try:
+        claims = await verify_access_token(token)
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
+    if claims is not None:
+        return {"id": claims["sub"], "email": claims.get("email")}
 
-    # 세션 검사 (exempt 경로 제외)
-    if request.url.path not in SESSION_EXEMPT_PATHS:
-        cutoff = (datetime.now(timezone.utc) - timedelta(minutes=SESSION_TIMEOUT_MINUTES)).isoformat()
-        device_id = request.headers.get("X-Device-ID")
-        if device_id:
-            result = db.table("user_sessions") \
-                .select("id") \
-                .eq("user_id", user.id) \
-                .eq("device_id", device_id) \
-                .gte("last_activity", cutoff) \
-                .execute()
-            if not result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="session_expired",
-                )
-        else:
-            result = db.table("user_sessions") \
-                .select("id") \
-                .eq("user_id", user.id) \
-                .gte("last_activity", cutoff) \
-                .execute()
-            if not result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="session_expired",
-                )
-
+    try:
+        user_response = await asyncio.to_thread(lambda: get_supabase().auth.get_user(token))
+        user = user_response.user
+    except Exception:
+        user = None
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
     return {"id": user.id, "email": user.email}
+
+
+async def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> None:
+    """운영 metrics 접근 검사. Bearer 토큰이 METRICS_TOKEN과 같아야 한다."""
+    if not METRICS_TOKEN or not hmac.compare_digest(credentials.credentials, METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid metrics token",
+        )
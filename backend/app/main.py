@@ -5,23 +5,42 @@ import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # 프로젝트 루트의 .env 로딩
 load_dotenv(Path(__file__).parent.parent.parent / ".env")
 
-from app.routers import schedule, briefing, flight, push, session, far117
+from app.dependencies.auth import require_metrics_token
+from app.routers import schedule, briefing, flight, push, session, far117, metrics
+from app.services.cache import start_cache_sweeper, stop_cache_sweeper
+from app.services.calendar_sync_scheduler import start_calendar_sync_scheduler, stop_calendar_sync_scheduler
+from app.services.flight_tracker import start_opensky_poller, stop_opensky_poller
+from app.services.http_client import start_http_clients, close_http_clients
+from app.services.push_dispatcher import start_push_dispatcher, stop_push_dispatcher
+from app.services.session_cache import start_session_flusher, stop_session_flusher
 from app.services.reminder_scheduler import start_scheduler, stop_scheduler
 from app.services.weather_alert_scheduler import start_weather_scheduler, stop_weather_scheduler
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await start_http_clients()
+    start_cache_sweeper()
+    start_session_flusher()
+    start_push_dispatcher()
     start_scheduler()
     start_weather_scheduler()
+    start_calendar_sync_scheduler()
+    start_opensky_poller()
     yield
+    stop_opensky_poller()
     stop_scheduler()
     stop_weather_scheduler()
+    stop_calendar_sync_scheduler()
+    stop_cache_sweeper()
+    await stop_session_flusher()
+    await stop_push_dispatcher()
+    await close_http_clients()
 
 
 app = FastAPI(
@@ -47,6 +66,12 @@ app.include_router(flight.router, prefix="/api/flight", tags=["flight"])
 app.include_router(push.router, prefix="/api/push", tags=["push"])
 app.include_router(session.router, prefix="/api/session", tags=["session"])
 app.include_router(far117.router, prefix="/api/far117", tags=["far117"])
+app.include_router(
+    metrics.router,
+    prefix="/api/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(require_metrics_token)],
+)
 
 
 
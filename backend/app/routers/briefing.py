@@ -2,12 +2,24 @@
 # Path: /Users/hodduk/Documents/git/mfa/backend/app/routers/briefing.py
 
 import asyncio
+from datetime import date, timezone
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.db.supabase import run_db
+from app.dependencies.auth import get_current_user
 from app.services.airport import get_airport, get_coordinates, iata_to_icao
-from app.services.weather import fetch_airsigmet, fetch_metar, fetch_taf
-from app.services.notam import fetch_notams
+from app.services.schedule_db import get_schedule
+from app.services.weather import (
+    ROUTE_CORRIDOR_NM,
+    fetch_airsigmet_route,
+    fetch_airsigmet_routes,
+    fetch_metar,
+    fetch_metars,
+    fetch_taf,
+    fetch_tafs,
+)
+from app.services.notam import fetch_notams, fetch_notams_entry
 
 router = APIRouter()
 
@@ -53,41 +65,48 @@ async def get_taf(station: str):
 @router.get("/notam/{station}")
 async def get_notam(station: str):
     """공항의 NOTAM을 조회한다."""
-    notams = await fetch_notams(station)
+    entry = await fetch_notams_entry(station)
+    notams = entry["notams"]
     return {
         "station": station.upper(),
         "icao": iata_to_icao(station) or station.upper(),
         "notams": notams,
         "total": len(notams),
         "critical_count": sum(1 for n in notams if n.get("is_critical")),
+        "fetched_at": entry["fetched_at"],
+        "stale": entry["stale"],
     }
 
 
 @router.get("/full/{station}")
 async def get_full_briefing(station: str):
     """공항의 전체 브리핑(METAR + TAF + NOTAM)을 조회한다."""
-    airport = get_airport(station.upper())
-    icao = iata_to_icao(station) or station.upper()
-
     results = await asyncio.gather(
         fetch_metar(station),
         fetch_taf(station),
-        fetch_notams(station),
+        fetch_notams_entry(station),
         return_exceptions=True,
     )
     metar = results[0] if not isinstance(results[0], Exception) else None
     taf = results[1] if not isinstance(results[1], Exception) else None
-    notams = results[2] if not isinstance(results[2], Exception) else []
+    notam_entry = results[2] if not isinstance(results[2], Exception) else None
+    return _full_briefing(station, metar, taf, notam_entry)
+
 
+def _full_briefing(station: str, metar: dict | None, taf: dict | None, notam_entry: dict | None) -> dict:
+    """/full/{station} 응답 형식."""
+    notams = notam_entry["notams"] if notam_entry else []
     return {
         "station": station.upper(),
-        "icao": icao,
-        "airport": airport,
+        "icao": iata_to_icao(station) or station.upper(),
+        "airport": get_airport(station.upper()),
         "metar": metar,
         "taf": taf,
         "notams": notams,
         "notam_total": len(notams),
         "notam_critical_count": sum(1 for n in notams if n.get("is_critical")),
+        "notam_fetched_at": notam_entry["fetched_at"] if notam_entry else None,
+        "notam_stale": notam_entry["stale"] if notam_entry else False,
     }
 
 
@@ -95,8 +114,9 @@ async def get_full_briefing(station: str):
 async def get_airsigmet(
     origin: str = Query(..., description="출발 공항 IATA/ICAO"),
     destination: str = Query(..., description="도착 공항 IATA/ICAO"),
+    corridor_nm: float = Query(ROUTE_CORRIDOR_NM, gt=0, le=300, description="대권 경로 양옆 폭 (NM)"),
 ):
-    """경로상 SIGMET/AIRMET를 조회한다."""
+    """대권 경로 corridor와 겹치는 SIGMET/AIRMET를 조회한다."""
     origin_coords = get_coordinates(origin.upper())
     dest_coords = get_coordinates(destination.upper())
 
@@ -106,23 +126,110 @@ async def get_airsigmet(
     lat1, lon1 = origin_coords
     lat2, lon2 = dest_coords
 
-    margin = 2.0
-    min_lat = min(lat1, lat2) - margin
-    max_lat = max(lat1, lat2) + margin
-    min_lon = min(lon1, lon2) - margin
-    max_lon = max(lon1, lon2) + margin
+    data = await fetch_airsigmet_route(lat1, lon1, lat2, lon2, corridor_nm)
+    return _airsigmet_briefing(origin, destination, origin_coords, dest_coords, data, corridor_nm)
 
-    data = await fetch_airsigmet(min_lat, max_lat, min_lon, max_lon)
-
-    sigmets = [d for d in data if d.get("type") == "SIGMET"]
-    airmets = [d for d in data if d.get("type") == "AIRMET"]
 
+def _airsigmet_briefing(
+    origin: str,
+    destination: str,
+    origin_coords: tuple[float, float],
+    dest_coords: tuple[float, float],
+    data: list[dict],
+    corridor_nm: float,
+) -> dict:
+    """/airsigmet 응답 형식."""
+    lat1, lon1 = origin_coords
+    lat2, lon2 = dest_coords
     return {
         "origin": {"iata": origin.upper(), "lat": lat1, "lon": lon1},
         "destination": {"iata": destination.upper(), "lat": lat2, "lon": lon2},
-        "sigmets": sigmets,
-        "airmets": airmets,
+        "sigmets": [d for d in data if d.get("type") == "SIGMET"],
+        "airmets": [d for d in data if d.get("type") == "AIRMET"],
         "total": len(data),
+        "corridor_nm": corridor_nm,
+    }
+
+
+def _utc_date(dt) -> date:
+    return (dt.astimezone(timezone.utc) if dt.tzinfo else dt).date()
+
+
+@router.get("/pairing/{pairing_id}")
+async def get_pairing_briefing(
+    pairing_id: str,
+    start_date: date = Query(..., description="페어링 시작일 (UTC, YYYY-MM-DD) — 같은 페어링 번호가 날짜별로 반복됨"),
+    corridor_nm: float = Query(ROUTE_CORRIDOR_NM, gt=0, le=300, description="대권 경로 양옆 폭 (NM)"),
+    current_user: dict = Depends(get_current_user),
+):
+    """페어링 전체 브리핑을 한 번에 조회한다.
+
+    모든 레그의 출발/도착 공항을 중복 제거하여 METAR/TAF는 배치로, NOTAM은 동시에 조회하고,
+    레그별 경로 SIGMET/AIRMET은 같은 AIRSIGMET 스냅샷 하나로 계산한다.
+    stations[공항]은 /full/{station}, legs[].airsigmet은 /airsigmet 응답과 같은 형식이다.
+    """
+    schedule = await run_db(get_schedule, current_user["id"])
+    pairing = next(
+        (
+            p for p in (schedule.pairings if schedule else [])
+            if p.pairing_id == pairing_id and _utc_date(p.start_utc) == start_date
+        ),
+        None,
+    )
+    if pairing is None:
+        raise HTTPException(status_code=404, detail=f"Pairing {pairing_id} starting {start_date} not found")
+
+    legs = [leg for day in pairing.days for leg in day.legs]
+    stations = list(dict.fromkeys(s.upper() for leg in legs for s in (leg.origin, leg.destination)))
+    coords = {s: get_coordinates(s) for s in stations}
+    routed = [leg for leg in legs if coords[leg.origin.upper()] and coords[leg.destination.upper()]]
+
+    results = await asyncio.gather(
+        fetch_metars(stations),
+        fetch_tafs(stations),
+        fetch_airsigmet_routes(
+            [(*coords[leg.origin.upper()], *coords[leg.destination.upper()]) for leg in routed],
+            corridor_nm,
+        ),
+        *(fetch_notams_entry(s) for s in stations),
+        return_exceptions=True,
+    )
+    metars = results[0] if not isinstance(results[0], Exception) else {}
+    tafs = results[1] if not isinstance(results[1], Exception) else {}
+    routes = results[2] if not isinstance(results[2], Exception) else [[] for _ in routed]
+    notam_entries = [r if not isinstance(r, Exception) else None for r in results[3:]]
+    route_by_leg = {id(leg): data for leg, data in zip(routed, routes)}
+
+    return {
+        "pairing_id": pairing.pairing_id,
+        "start_utc": pairing.start_utc,
+        "end_utc": pairing.end_utc,
+        "corridor_nm": corridor_nm,
+        "stations": {
+            s: _full_briefing(s, metars.get(s), tafs.get(s), entry)
+            for s, entry in zip(stations, notam_entries)
+        },
+        "legs": [
+            {
+                "flight_date": leg.flight_date,
+                "leg_number": leg.leg_number,
+                "flight_number": leg.flight_number,
+                "origin": leg.origin.upper(),
+                "destination": leg.destination.upper(),
+                "depart_utc": leg.depart_utc,
+                "arrive_utc": leg.arrive_utc,
+                "is_deadhead": leg.is_deadhead,
+                "airsigmet": _airsigmet_briefing(
+                    leg.origin,
+                    leg.destination,
+                    coords[leg.origin.upper()],
+                    coords[leg.destination.upper()],
+                    route_by_leg[id(leg)],
+                    corridor_nm,
+                ) if id(leg) in route_by_leg else None,
+            }
+            for leg in legs
+        ],
     }
 
 
@@ -6,7 +6,9 @@ from __future__ import annotations
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
+from app.services.flight_stream import event_stream
 from app.services.flight_tracker import get_tracker_status, track_inbound
 
 router = APIRouter()
@@ -39,6 +41,38 @@ async def track_flight(
     )
 
 
+@router.get("/track/stream")
+async def track_flight_stream(
+    tail_number: Optional[str] = Query(None, description="항공기 등록번호 (e.g. N728SK)"),
+    flight_number: Optional[str] = Query(None, description="편명 (e.g. DL5678)"),
+    provider: Optional[str] = Query(None, description="API provider: opensky | aviationstack | flightlabs"),
+    destination: Optional[str] = Query(None, description="도착 공항 IATA (ETA 계산용, e.g. PHX)"),
+    origin: Optional[str] = Query(None, description="출발 공항 IATA (비행 단계 추정용)"),
+    scheduled_dep: Optional[str] = Query(None, description="스케줄 출발시간 ISO 8601 (하이브리드 ETA용)"),
+    scheduled_arr: Optional[str] = Query(None, description="스케줄 도착시간 ISO 8601 (하이브리드 ETA용)"),
+):
+    """/track 결과를 SSE(`event: track`)로 push한다. 같은 항공기 구독자는 조회 하나를 공유한다."""
+    if not tail_number and not flight_number:
+        raise HTTPException(
+            status_code=400,
+            detail="tail_number 또는 flight_number 중 최소 하나 필수",
+        )
+    params = {
+        "tail_number": tail_number.strip().upper() if tail_number else None,
+        "flight_number": flight_number.strip().upper() if flight_number else None,
+        "provider": provider,
+        "destination": destination,
+        "origin": origin,
+        "scheduled_dep": scheduled_dep,
+        "scheduled_arr": scheduled_arr,
+    }
+    return StreamingResponse(
+        event_stream(params),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/status")
 async def tracker_status():
     """설정된 flight tracker provider 목록을 반환한다."""
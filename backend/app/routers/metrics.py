@@ -0,0 +1,55 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/routers/metrics.py
+
+from fastapi import APIRouter
+
+from app.services.cache import cache_stats
+from app.services.calendar_sync_scheduler import sync_stats
+from app.services.flight_stream import stream_stats
+from app.services.flight_tracker import estimator_stats, poller_stats
+from app.services.provider_gateway import provider_health
+from app.services.push_dispatcher import dispatcher_stats
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def get_cache_metrics():
+    """namespace별 인메모리 캐시 통계(hit/miss/eviction)를 반환한다."""
+    return {"caches": cache_stats()}
+
+
+@router.get("/calendar-sync")
+async def get_calendar_sync_metrics():
+    """백그라운드 캘린더 동기화 latency 요약을 반환한다."""
+    return sync_stats()
+
+
+@router.get("/push")
+async def get_push_metrics():
+    """Web Push 발송 통계(sent/failed/expired/retries)와 큐 상태를 반환한다."""
+    return dispatcher_stats()
+
+
+@router.get("/flight-estimators")
+async def get_flight_estimator_metrics():
+    """추적 중인 항공기별 비행 단계 추정기 수와 메모리 사용량을 반환한다."""
+    return estimator_stats()
+
+
+@router.get("/opensky-poller")
+async def get_opensky_poller_metrics():
+    """OpenSky 배치 poller의 폴링 횟수/추적 대상 수/마지막 폴링 시각을 반환한다."""
+    return poller_stats()
+
+
+@router.get("/flight-providers")
+async def get_flight_provider_metrics():
+    """flight tracker provider별 circuit 상태, 남은 토큰, 호출/실패/건너뛴 횟수를 반환한다."""
+    return provider_health()
+
+
+@router.get("/flight-streams")
+async def get_flight_stream_metrics():
+    """flight track SSE의 활성 스트림(항공기) 수와 구독자 수를 반환한다."""
+    return stream_stats()
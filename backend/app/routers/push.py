@@ -7,11 +7,11 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, field_validator
-from pywebpush import webpush, WebPushException
-
-from app.config import VAPID_PUBLIC_KEY, VAPID_PRIVATE_KEY, VAPID_CLAIM_EMAIL
+from app.config import VAPID_PUBLIC_KEY
 from app.dependencies.auth import get_current_user
 from app.db.supabase import get_supabase
+from app.services import push_dispatcher
+from app.services.reminder_scheduler import invalidate_user
 
 router = APIRouter()
 
@@ -38,6 +38,7 @@ async def subscribe(
 
     subscription_json = json.dumps(payload.model_dump())
     db.table("users").update({"push_token": subscription_json}).eq("id", user_id).execute()
+    invalidate_user(user_id)
 
     return {"status": "subscribed"}
 
@@ -51,6 +52,7 @@ async def unsubscribe(
     db = get_supabase()
 
     db.table("users").update({"push_token": None}).eq("id", user_id).execute()
+    invalidate_user(user_id)
 
     return {"status": "unsubscribed"}
 
@@ -69,20 +71,16 @@ async def send_test_push(
     if not push_token:
         raise HTTPException(status_code=400, detail="No push subscription found")
 
-    subscription_info = json.loads(push_token)
-
-    try:
-        webpush(
-            subscription_info=subscription_info,
-            data=json.dumps({
-                "title": "MFA Test",
-                "body": "Push notification is working!",
-            }),
-            vapid_private_key=VAPID_PRIVATE_KEY,
-            vapid_claims={"sub": VAPID_CLAIM_EMAIL},
-        )
-    except WebPushException as e:
-        raise HTTPException(status_code=502, detail=f"Push failed: {str(e)}")
+    result = await push_dispatcher.send(
+        push_token,
+        {
+            "title": "MFA Test",
+            "body": "Push notification is working!",
+        },
+        user_id=user_id,
+    )
+    if not result.ok:
+        raise HTTPException(status_code=502, detail=f"Push failed: {result.status or ''} {result.error or ''}".strip())
 
     return {"status": "sent"}
 
@@ -189,6 +187,7 @@ async def save_reminder_settings(
     else:
         email = current_user.get("email", "")
         db.table("users").insert({"id": user_id, "email": email, "settings": settings}).execute()
+    invalidate_user(user_id)
 
     return {
         "reminder_enabled": settings["reminder_enabled"],
@@ -14,7 +14,11 @@ from app.parsers.csv_parser import parse_csv
 from app.parsers.ics_parser import parse_ics
 from app.services.schedule_db import save_schedule, get_schedule, delete_schedule
 from app.services.calendar_sync import (
+    content_hash,
     fetch_ics_content,
+    get_schedule_hash,
+    set_schedule_hash,
+    reset_feed_hash,
     sync_calendar,
     should_sync,
     get_calendar_source,
@@ -59,7 +63,7 @@ async def upload_ics(
 
     # DB에 저장 (스레드에서 실행하여 이벤트 루프 블로킹 방지)
     loop = asyncio.get_running_loop()
-    await loop.run_in_executor(None, partial(save_schedule, current_user["id"], current_user["email"], pairings))
+    await loop.run_in_executor(None, partial(_save_uploaded, current_user["id"], current_user["email"], content, pairings))
 
     return ScheduleResponse(
         pairings=pairings,
@@ -67,6 +71,17 @@ async def upload_ics(
     )
 
 
+def _save_uploaded(user_id: str, email: str, content: bytes, pairings: list) -> None:
+    """업로드한 ICS를 저장한다. 현재 스케줄과 같은 파일이면 저장을 생략한다."""
+    digest = content_hash(content)
+    if get_schedule_hash(user_id) == digest:
+        return
+    save_schedule(user_id, email, pairings)
+    set_schedule_hash(user_id, digest)
+    # 업로드가 피드 내용을 덮어썼으므로 다음 피드 동기화는 hash와 무관하게 반영
+    reset_feed_hash(user_id)
+
+
 @router.post("/upload/csv", response_model=list[FlightLegCSV])
 async def upload_csv(
     file: UploadFile = File(...),
@@ -133,7 +148,7 @@ async def put_calendar_url(
 
     # URL 유효성 검증: fetch 시도
     try:
-        await fetch_ics_content(body.ics_url)
+        fetched = await fetch_ics_content(body.ics_url)
     except Exception:
         raise HTTPException(status_code=400, detail="Failed to fetch ICS URL. Please check the URL is correct.")
 
@@ -142,7 +157,7 @@ async def put_calendar_url(
 
     # 즉시 동기화
     try:
-        await sync_calendar(user_id, email, body.ics_url)
+        await sync_calendar(user_id, email, body.ics_url, source={}, fetched=fetched)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"URL saved but sync failed: {e}")
 
@@ -191,7 +206,7 @@ async def sync_now(
         raise HTTPException(status_code=404, detail="No calendar URL registered")
 
     try:
-        await sync_calendar(user_id, email, source["ics_url"])
+        await sync_calendar(user_id, email, source["ics_url"], source=source)
     except Exception as e:
         raise HTTPException(status_code=422, detail=f"Sync failed: {e}")
 
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 
 from app.dependencies.auth import get_current_user
 from app.db.supabase import get_supabase
+from app.services import session_cache
 
 router = APIRouter()
 
@@ -71,6 +72,9 @@ async def register_session(
         }, on_conflict="user_id,device_id") \
         .execute()
 
+    # 다른 기기 세션이 정리되었을 수 있으므로 유저 캐시 전체 무효화
+    session_cache.invalidate(user_id)
+
     return {"status": "ok"}
 
 
@@ -79,16 +83,11 @@ async def heartbeat_session(
     current_user: dict = Depends(get_current_user),
     x_device_id: Optional[str] = Header(None, alias="X-Device-ID"),
 ):
-    """last_activity 갱신."""
+    """last_activity 갱신. DB 반영은 session_cache가 주기적으로 일괄 처리한다."""
     if not x_device_id:
         raise HTTPException(status_code=400, detail="X-Device-ID header required")
 
-    db = get_supabase()
-    db.table("user_sessions") \
-        .update({"last_activity": datetime.now(timezone.utc).isoformat()}) \
-        .eq("user_id", current_user["id"]) \
-        .eq("device_id", x_device_id) \
-        .execute()
+    await session_cache.touch(current_user["id"], x_device_id)
 
     return {"status": "ok"}
 
@@ -108,5 +107,6 @@ async def logout_session(
         .eq("user_id", current_user["id"]) \
         .eq("device_id", x_device_id) \
         .execute()
+    session_cache.invalidate(current_user["id"], x_device_id)
 
     return {"status": "ok"}
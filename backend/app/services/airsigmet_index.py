@@ -0,0 +1,123 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/airsigmet_index.py
+
+"""
+SIGMET/AIRMET 공간 인덱스
+
+AWC airsigmet 피드를 갱신 시점에 한 번 shapely 폴리곤으로 만들어 STRtree에 넣고,
+경로 조회는 대권(great-circle) 항로 양옆 corridor_nm 폭의 corridor 폴리곤과의
+실제 교차 여부로 판정한다. (꼭짓점만 보던 바운딩 박스 검사는 박스를 가로지르는
+큰 폴리곤을 놓치고 박스 모서리의 무관한 폴리곤을 포함했다)
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+import shapely
+from pyproj import Geod, Transformer
+from shapely.affinity import translate
+from shapely.geometry import LineString, Point, Polygon, box
+from shapely.ops import transform
+from shapely.strtree import STRtree
+
+NM_TO_M = 1852.0
+SEGMENT_M = 50 * NM_TO_M  # 대권 경로 샘플 간격
+
+_GEOD = Geod(ellps="WGS84")
+_WORLD = box(-180, -90, 180, 90)
+
+
+def _unwrap(lon, lon_ref: float):
+    """경도를 [lon_ref-180, lon_ref+180) 범위로 옮긴다. (±180을 넘는 도형을 이어진 좌표로)"""
+    return (np.asarray(lon) - lon_ref + 180) % 360 - 180 + lon_ref
+
+
+def _wrap(geom: shapely.Geometry) -> shapely.Geometry:
+    """[-180, 180]을 벗어난 geometry를 ±180에서 잘라 [-180, 180] 범위의 조각들로 만든다."""
+    min_lon, _, max_lon, _ = geom.bounds
+    if min_lon >= -180 and max_lon <= 180:
+        return geom
+    parts = [translate(geom, xoff=off).intersection(_WORLD) for off in (-360, 0, 360)]
+    return shapely.union_all([p for p in parts if not p.is_empty])
+
+
+def _geometry(coords: list[dict]) -> shapely.Geometry | None:
+    """AWC coords([{lat, lon}, ...]) → shapely geometry (lon, lat 순서). 날짜변경선을 넘으면 ±180에서 분할."""
+    points = [
+        (c["lon"], c["lat"])
+        for c in coords or []
+        if c.get("lat") is not None and c.get("lon") is not None
+    ]
+    if not points:
+        return None
+    if len(points) == 1:
+        return Point(points[0])
+    lon_ref = points[0][0]
+    points = [(float(_unwrap(lon, lon_ref)), lat) for lon, lat in points]
+    if len(points) == 2:
+        return _wrap(LineString(points))
+    geom = Polygon(points)
+    if not geom.is_valid:
+        geom = shapely.make_valid(geom)
+    return _wrap(geom)
+
+
+@lru_cache(maxsize=256)
+def route_corridor(lat1: float, lon1: float, lat2: float, lon2: float, width_nm: float) -> shapely.Geometry:
+    """두 지점 사이 대권 경로 양옆으로 width_nm 만큼 넓힌 corridor 폴리곤 (lon/lat).
+
+    날짜변경선을 넘는 경로는 ±180에서 나눈 MultiPolygon이 된다.
+    """
+    _, _, dist = _GEOD.inv(lon1, lat1, lon2, lat2)
+    # 경로 중점 기준 azimuthal equidistant 평면에서 미터 단위로 buffer
+    # (같은 공항이면 출발 지점 기준 원형 buffer)
+    if dist > 0:
+        n_mid = int(dist // SEGMENT_M)  # SEGMENT_M보다 짧은 구간은 중간점 없이 직선
+        mid = _GEOD.npts(lon1, lat1, lon2, lat2, n_mid) if n_mid > 0 else []
+        line = LineString([(lon1, lat1), *mid, (lon2, lat2)])
+        lon_mid, lat_mid = _GEOD.npts(lon1, lat1, lon2, lat2, 1)[0]
+    else:
+        line = Point(lon1, lat1)
+        lon_mid, lat_mid = lon1, lat1
+    aeqd = Transformer.from_pipeline(f"+proj=aeqd +lat_0={lat_mid} +lon_0={lon_mid} +ellps=WGS84 +units=m")
+
+    corridor = transform(aeqd.transform, line).buffer(width_nm * NM_TO_M)
+    # 역변환 경도는 ±180에서 튀므로 경로 중점 기준으로 이어 붙인 뒤 [-180, 180]으로 분할
+    def inverse(x, y):
+        lon, lat = aeqd.transform(x, y, direction="INVERSE")
+        return _unwrap(lon, lon_mid), lat
+
+    return _wrap(transform(inverse, corridor))
+
+
+class AirsigmetIndex:
+    """파싱된 SIGMET/AIRMET 목록과 geometry STRtree."""
+
+    def __init__(self, items: list[dict]):
+        self.items = items
+        geoms: list[shapely.Geometry] = []
+        self._item_idx: list[int] = []
+        for i, item in enumerate(items):
+            geom = _geometry(item.get("coords", []))
+            if geom is None:
+                continue
+            geoms.append(geom)
+            self._item_idx.append(i)
+        shapely.prepare(geoms)
+        self._tree = STRtree(geoms)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def query(self, geom: shapely.Geometry) -> list[dict]:
+        """geom과 교차하는 항목 (피드 순서 유지)."""
+        hits = self._tree.query(geom, predicate="intersects")
+        return [self.items[self._item_idx[h]] for h in sorted(hits)]
+
+    def in_bbox(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> list[dict]:
+        return self.query(box(min_lon, min_lat, max_lon, max_lat))
+
+    def along_route(self, lat1: float, lon1: float, lat2: float, lon2: float, width_nm: float) -> list[dict]:
+        return self.query(route_corridor(lat1, lon1, lat2, lon2, width_nm))
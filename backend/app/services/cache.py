@@ -0,0 +1,244 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/cache.py
+
+"""
+인메모리 LRU/TTL 캐시
+
+namespace별로 TTL과 최대 크기(항목 수, 근사 바이트)를 지정한다.
+stale_ttl을 주면 TTL이 지난 뒤에도 그 기간 동안 stale 항목을 반환할 수 있다 (stale-while-revalidate).
+용량 초과 시 가장 오래 사용되지 않은 항목부터 제거하고,
+백그라운드 sweeper가 만료 항목을 주기적으로 정리한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 60  # 초
+
+
+def _approx_size(value: Any) -> int:
+    """JSON 형태 값(dict/list/str/숫자)의 대략적인 메모리 크기(바이트)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _approx_size(k) + _approx_size(v)
+    elif isinstance(value, (list, tuple, set)):
+        for v in value:
+            size += _approx_size(v)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "fresh_until", "expires_at", "size")
+
+    def __init__(self, value: Any, stored_at: float, fresh_until: float, expires_at: float, size: int):
+        self.value = value
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until  # 이 시각까지 fresh
+        self.expires_at = expires_at  # 이 시각까지 stale로 보관 (이후 삭제)
+        self.size = size
+
+
+class CacheEntry:
+    """get_entry() 결과: 값 + 저장 시각 + stale 여부"""
+
+    __slots__ = ("value", "stored_at", "stale")
+
+    def __init__(self, value: Any, stored_at: float, stale: bool):
+        self.value = value
+        self.stored_at = stored_at
+        self.stale = stale
+
+
+class TTLCache:
+    """크기 제한이 있는 LRU + TTL 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: float,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        stale_ttl: float = 0,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any | None:
+        """fresh 항목만 반환한다."""
+        entry = self.get_entry(key, allow_stale=False)
+        return entry.value if entry else None
+
+    def get_entry(self, key: str, allow_stale: bool = True) -> CacheEntry | None:
+        """항목을 반환한다. allow_stale이면 TTL이 지났어도 stale 기간 내 항목을 stale=True로 반환한다."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            stale = entry.fresh_until <= now
+            if stale and not allow_stale:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return CacheEntry(entry.value, entry.stored_at, stale)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, stored_at: Optional[float] = None) -> None:
+        """stored_at을 주면 그 시각에 조회된 값으로 보고 TTL/stale 기간을 계산한다 (영구 저장소에서 복원 시)."""
+        now = stored_at if stored_at is not None else time.time()
+        size = _approx_size(value) if self.max_bytes else 0
+        fresh_until = now + (ttl if ttl is not None else self.ttl)
+        entry = _Entry(value, now, fresh_until, fresh_until + self.stale_ttl, size)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = entry
+            self._bytes += size
+            self._evict_over_capacity()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def values(self) -> list[Any]:
+        """만료되지 않은 항목 값의 스냅샷 (통계용 — hit/miss에 반영하지 않음)."""
+        now = time.time()
+        with self._lock:
+            return [e.value for e in self._data.values() if e.expires_at > now]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """만료된 항목을 모두 제거하고 제거한 개수를 반환한다."""
+        now = time.time()
+        with self._lock:
+            expired = [k for k, e in self._data.items() if e.expires_at <= now]
+            for k in expired:
+                self._remove(k)
+            self.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> dict:
+        served = self.hits + self.stale_hits
+        total = served + self.misses
+        return {
+            "namespace": self.namespace,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes if self.max_bytes else None,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round(served / total, 3) if total else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+
+    def _evict_over_capacity(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+
+# ─────────── namespace 레지스트리 ───────────
+
+_caches: dict[str, TTLCache] = {}
+_task: asyncio.Task | None = None
+
+
+def get_cache(
+    namespace: str,
+    ttl: float,
+    max_entries: int = 1024,
+    max_bytes: Optional[int] = None,
+    stale_ttl: float = 0,
+) -> TTLCache:
+    """namespace 캐시를 반환한다. 없으면 생성하여 sweeper 대상에 등록한다."""
+    cache = _caches.get(namespace)
+    if cache is None:
+        cache = TTLCache(namespace, ttl, max_entries=max_entries, max_bytes=max_bytes, stale_ttl=stale_ttl)
+        _caches[namespace] = cache
+    return cache
+
+
+def cache_stats() -> list[dict]:
+    """모든 namespace의 캐시 통계를 반환한다."""
+    return [c.stats() for c in _caches.values()]
+
+
+async def _sweep_loop() -> None:
+    """만료 항목을 주기적으로 정리하는 루프."""
+    while True:
+        try:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            for cache in list(_caches.values()):
+                cache.purge_expired()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error("Cache sweeper error: %s", e)
+
+
+def start_cache_sweeper() -> None:
+    """백그라운드 캐시 sweeper를 시작한다."""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_sweep_loop())
+        logger.info("Cache sweeper started")
+
+
+def stop_cache_sweeper() -> None:
+    """백그라운드 캐시 sweeper를 중지한다."""
+    global _task
+    if _task and not _task.done():
+        _task.cancel()
+        logger.info("Cache sweeper stopped")
+    _task = None
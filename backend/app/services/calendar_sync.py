@@ -2,17 +2,19 @@
 # Path: /Users/hodduk/Documents/git/mfa/backend/app/services/calendar_sync.py
 
 import asyncio
+import hashlib
 import ipaddress
 import socket
+from concurrent.futures import Executor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from functools import partial
 from typing import Optional
 from urllib.parse import urlparse
 
-import httpx
-
 from app.db.supabase import get_supabase
 from app.parsers.ics_parser import parse_ics
+from app.services.http_client import get_client
 from app.services.schedule_db import save_schedule
 
 
@@ -52,34 +54,126 @@ def _validate_url(url: str) -> None:
             raise ValueError(f"URL resolves to a private/reserved IP: {ip}")
 
 
-async def fetch_ics_content(ics_url: str) -> bytes:
-    """ICS URL에서 캘린더 데이터를 가져온다."""
+@dataclass
+class IcsFetch:
+    """ICS fetch 결과. not_modified이면 content는 None (304 응답)."""
+    content: Optional[bytes]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
+def content_hash(content: bytes) -> str:
+    """ICS 원본 바이트의 SHA-256 digest."""
+    return hashlib.sha256(content).hexdigest()
+
+
+async def fetch_ics_content(
+    ics_url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> IcsFetch:
+    """ICS URL에서 캘린더 데이터를 가져온다. etag/last_modified가 있으면 conditional GET."""
     _validate_url(ics_url)
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.get(ics_url)
-        resp.raise_for_status()
-        return resp.content
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    resp = await get_client("calendar").get(ics_url, headers=headers)
+    if resp.status_code == 304:
+        return IcsFetch(content=None, etag=etag, last_modified=last_modified, not_modified=True)
+    resp.raise_for_status()
+    return IcsFetch(
+        content=resp.content,
+        etag=resp.headers.get("ETag"),
+        last_modified=resp.headers.get("Last-Modified"),
+    )
+
+
+def _sync_blocking(user_id: str, email: str, fetched: IcsFetch, previous_hash: Optional[str]) -> Optional[int]:
+    """동기 함수: ICS 파싱 + DB 저장 (스레드에서 실행됨).
+
+    304이거나 내용 hash가 이전과 같으면 파싱/저장을 생략하고 None을 반환한다.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    db = get_supabase()
 
+    digest = None if fetched.not_modified else content_hash(fetched.content)
+    if fetched.not_modified or digest == previous_hash:
+        db.table("calendar_sources").update({
+            "last_synced_at": now,
+            "etag": fetched.etag,
+            "last_modified": fetched.last_modified,
+        }).eq("user_id", user_id).execute()
+        return None
 
-def _sync_blocking(user_id: str, email: str, content: bytes) -> int:
-    """동기 함수: ICS 파싱 + DB 저장 (스레드에서 실행됨)."""
-    pairings = parse_ics(content)
+    pairings = parse_ics(fetched.content)
     save_schedule(user_id, email, pairings)
 
-    db = get_supabase()
     db.table("calendar_sources").update({
-        "last_synced_at": datetime.now(timezone.utc).isoformat(),
+        "last_synced_at": now,
+        "content_hash": digest,
+        "etag": fetched.etag,
+        "last_modified": fetched.last_modified,
     }).eq("user_id", user_id).execute()
+    set_schedule_hash(user_id, digest)
 
     return len(pairings)
 
 
-async def sync_calendar(user_id: str, email: str, ics_url: str) -> int:
-    """ICS URL fetch → 파싱 → DB 저장 → last_synced_at 업데이트. 이벤트 루프를 블로킹하지 않음."""
-    content = await fetch_ics_content(ics_url)
+async def sync_calendar(
+    user_id: str,
+    email: str,
+    ics_url: str,
+    source: Optional[dict] = None,
+    fetched: Optional[IcsFetch] = None,
+    executor: Optional[Executor] = None,
+) -> Optional[int]:
+    """ICS URL fetch → 파싱 → DB 저장 → last_synced_at 업데이트. 이벤트 루프를 블로킹하지 않음.
+
+    source(calendar_sources 레코드)의 etag/last_modified/content_hash로 변경 여부를 판단하며,
+    피드가 바뀌지 않았으면 None을 반환한다. 이미 받아온 fetched가 있으면 다시 요청하지 않는다.
+    executor를 주면 DB 조회/파싱/저장을 해당 스레드 풀에서 실행한다.
+    """
     loop = asyncio.get_running_loop()
-    count = await loop.run_in_executor(None, partial(_sync_blocking, user_id, email, content))
-    return count
+    if source is None:
+        source = await loop.run_in_executor(executor, partial(get_calendar_source, user_id)) or {}
+    if fetched is None:
+        fetched = await fetch_ics_content(
+            ics_url,
+            etag=source.get("etag"),
+            last_modified=source.get("last_modified"),
+        )
+    return await loop.run_in_executor(
+        executor, partial(_sync_blocking, user_id, email, fetched, source.get("content_hash"))
+    )
+
+
+def get_schedule_hash(user_id: str) -> Optional[str]:
+    """현재 저장된 스케줄의 원본 ICS hash를 조회한다."""
+    db = get_supabase()
+    result = db.table("users").select("schedule_hash").eq("id", user_id).execute()
+    if result.data:
+        return result.data[0].get("schedule_hash")
+    return None
+
+
+def set_schedule_hash(user_id: str, digest: Optional[str]) -> None:
+    """스케줄 원본 ICS hash를 기록한다."""
+    db = get_supabase()
+    db.table("users").update({"schedule_hash": digest}).eq("id", user_id).execute()
+
+
+def reset_feed_hash(user_id: str) -> None:
+    """피드 hash/validator를 초기화하여 다음 동기화에서 피드를 다시 반영하도록 한다."""
+    db = get_supabase()
+    db.table("calendar_sources").update({
+        "content_hash": None,
+        "etag": None,
+        "last_modified": None,
+    }).eq("user_id", user_id).execute()
 
 
 def get_calendar_source(user_id: str) -> Optional[dict]:
@@ -98,6 +192,9 @@ def save_calendar_url(user_id: str, ics_url: str) -> None:
         "user_id": user_id,
         "ics_url": ics_url,
         "sync_enabled": True,
+        "content_hash": None,
+        "etag": None,
+        "last_modified": None,
     }, on_conflict="user_id").execute()
 
 
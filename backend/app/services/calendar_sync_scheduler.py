@@ -0,0 +1,138 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/calendar_sync_scheduler.py
+
+"""
+캘린더 백그라운드 동기화 워커
+
+sync_enabled이고 마지막 동기화가 SYNC_INTERVAL_SECONDS보다 오래된 calendar_sources를 주기적으로 스캔하여
+사용자가 앱을 열기 전에 스케줄을 최신으로 유지한다.
+동시 동기화 수는 semaphore로 제한하고, 시작 시점에 jitter를 주어 피드 서버에 요청이 몰리지 않게 한다.
+파싱/DB 저장은 전용 스레드 풀에서 실행한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from app.db.supabase import get_supabase
+from app.services.calendar_sync import SYNC_INTERVAL_SECONDS, sync_calendar
+
+logger = logging.getLogger(__name__)
+
+_task: asyncio.Task | None = None
+SCAN_INTERVAL = 300  # 초
+MAX_CONCURRENT = 4  # 동시 동기화 수
+MAX_JITTER = 30  # 동기화 시작 지연 최대값 (초)
+MAX_BACKOFF = 6 * 3600  # 연속 실패 시 재시도 간격 상한 (초)
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT, thread_name_prefix="calendar-sync")
+# user_id → (연속 실패 횟수, 다음 재시도 가능 시각 epoch)
+_failures: dict[str, tuple[int, float]] = {}
+# user_id → 동기화 latency/결과 통계
+_stats: dict[str, dict] = {}
+
+
+def _due_sources() -> list[dict]:
+    """동기화 대상 calendar_sources를 조회한다. (동기 — to_thread에서 호출)"""
+    db = get_supabase()
+    cutoff = (datetime.now(timezone.utc) - timedelta(seconds=SYNC_INTERVAL_SECONDS)).isoformat()
+    result = (
+        db.table("calendar_sources")
+        .select("user_id, ics_url, last_synced_at, content_hash, etag, last_modified, users(email)")
+        .eq("sync_enabled", True)
+        .or_(f"last_synced_at.is.null,last_synced_at.lt.{cutoff}")
+        .execute()
+    )
+    now = time.time()
+    return [
+        s for s in (result.data or [])
+        if _failures.get(s["user_id"], (0, 0.0))[1] <= now
+    ]
+
+
+async def _sync_one(sem: asyncio.Semaphore, source: dict) -> None:
+    user_id = source["user_id"]
+    email = (source.get("users") or {}).get("email") or ""
+
+    await asyncio.sleep(random.uniform(0, MAX_JITTER))
+    async with sem:
+        started = time.monotonic()
+        try:
+            count = await sync_calendar(user_id, email, source["ics_url"], source=source, executor=_executor)
+        except Exception as e:
+            failures = _failures.get(user_id, (0, 0.0))[0] + 1
+            delay = min(SYNC_INTERVAL_SECONDS * 2 ** (failures - 1), MAX_BACKOFF)
+            _failures[user_id] = (failures, time.time() + delay)
+            _record(user_id, started, "error")
+            logger.warning("Calendar sync failed for user %s (%d in a row): %s", user_id, failures, e)
+        else:
+            _failures.pop(user_id, None)
+            _record(user_id, started, "unchanged" if count is None else "synced")
+
+
+def _record(user_id: str, started: float, status: str) -> None:
+    elapsed_ms = (time.monotonic() - started) * 1000
+    s = _stats.setdefault(user_id, {"runs": 0, "failures": 0, "total_ms": 0.0})
+    s["runs"] += 1
+    s["total_ms"] += elapsed_ms
+    s["last_ms"] = round(elapsed_ms, 1)
+    s["last_status"] = status
+    s["last_run_at"] = datetime.now(timezone.utc).isoformat()
+    if status == "error":
+        s["failures"] += 1
+
+
+def sync_stats() -> dict:
+    """동기화 latency 요약을 반환한다. (유저 id 등 유저별 통계는 노출하지 않는다)"""
+    latencies = sorted(s["last_ms"] for s in _stats.values())
+
+    def pct(p: float) -> float | None:
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        "users": len(_stats),
+        "backoff_users": len(_failures),
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "max_ms": latencies[-1] if latencies else None,
+    }
+
+
+async def _run_loop() -> None:
+    """asyncio 태스크로 실행되는 메인 루프."""
+    sem = asyncio.Semaphore(MAX_CONCURRENT)
+    while True:
+        try:
+            sources = await asyncio.to_thread(_due_sources)
+            if sources:
+                logger.info("Calendar sync: %d sources due", len(sources))
+                await asyncio.gather(*(_sync_one(sem, s) for s in sources))
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error("Calendar sync loop error: %s", e)
+        await asyncio.sleep(SCAN_INTERVAL)
+
+
+def start_calendar_sync_scheduler() -> None:
+    """백그라운드 캘린더 동기화를 시작한다."""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run_loop())
+        logger.info("Calendar sync scheduler started")
+
+
+def stop_calendar_sync_scheduler() -> None:
+    """백그라운드 캘린더 동기화를 중지한다."""
+    global _task
+    if _task and not _task.done():
+        _task.cancel()
+        logger.info("Calendar sync scheduler stopped")
+    _task = None
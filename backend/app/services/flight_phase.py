@@ -11,6 +11,8 @@
 from __future__ import annotations
 
 import math
+import sys
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from enum import Enum
@@ -81,7 +83,7 @@ def haversine_nm(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
 
 # ─────────── 비행 상태 데이터 ───────────
 
-@dataclass
+@dataclass(slots=True)
 class FlightState:
     time: int  # Unix timestamp
     lat: float
@@ -95,24 +97,85 @@ class FlightState:
     dist_from_dep: float  # nm
 
 
+# ─────────── 히스토리 ring buffer ───────────
+
+HISTORY_SECONDS = 600  # 히스토리 유지 기간 (10분)
+HISTORY_CAPACITY = 64  # 히스토리 최대 샘플 수 (OpenSky 10초 해상도 기준 10분 60개)
+HOLDING_WINDOW = 300  # 홀딩 감지 구간 (5분)
+# 홀딩 판단에 필요한 최소 데이터: 구간 안 샘플이 이 시간 이상에 걸쳐 있고 이 개수 이상 (60초 폴링 기준 5개)
+HOLDING_MIN_SPAN = 240
+HOLDING_MIN_SAMPLES = 5
+DESCENT_MIN_SAMPLES = 3  # 연속 하강 판단에 쓰는 최소 샘플 수 (구간이 짧으면 앞으로 넓힌다)
+
+
 # ─────────── 비행 단계 추정기 ───────────
 
 class FlightPhaseEstimator:
-    """비행 단계 추정기 — ADS-B 데이터 기반"""
+    """비행 단계 추정기 — ADS-B 데이터 기반
+
+    최근 HISTORY_SECONDS의 샘플을 필드별 고정 크기 array(HISTORY_CAPACITY칸) ring buffer에 보관한다.
+    판단 메서드는 최근 구간을 뒤에서부터 훑기만 하고 상태를 바꾸지 않는다.
+    """
+
+    __slots__ = (
+        "total_dist", "max_alt",
+        "_time", "_lat", "_lon", "_alt", "_vr", "_track", "_dist",
+        "_start", "_count",
+    )
 
     def __init__(self, total_distance: float):
         self.total_dist = total_distance
-        self.history: list[FlightState] = []
         self.max_alt: float = 0
 
+        cap = HISTORY_CAPACITY
+        self._time = array("q", bytes(8 * cap))
+        self._lat = array("f", bytes(4 * cap))
+        self._lon = array("f", bytes(4 * cap))
+        self._alt = array("f", bytes(4 * cap))
+        self._vr = array("f", bytes(4 * cap))
+        self._track = array("f", bytes(4 * cap))
+        self._dist = array("f", bytes(4 * cap))
+        self._start = 0  # 가장 오래된 샘플의 버퍼 위치
+        self._count = 0  # 히스토리 샘플 수
+
+    def __len__(self) -> int:
+        """히스토리 샘플 수"""
+        return self._count
+
+    def memory_bytes(self) -> int:
+        """추정기 1개가 차지하는 대략적인 메모리 (바이트)"""
+        columns = (self._time, self._lat, self._lon, self._alt, self._vr, self._track, self._dist)
+        return sys.getsizeof(self) + sum(sys.getsizeof(c) for c in columns)
+
+    def _pos(self, k: int) -> int:
+        """k번째(0 = 가장 오래된) 샘플의 버퍼 위치"""
+        return (self._start + k) % HISTORY_CAPACITY
+
     def update(self, state: FlightState) -> None:
-        """새 상태 데이터 추가 (10분 버퍼 유지)"""
-        self.history.append(state)
+        """새 상태 데이터 추가 (10분 버퍼 유지). 이전 샘플보다 오래된 보고는 히스토리에 넣지 않는다."""
         self.max_alt = max(self.max_alt, state.altitude)
 
+        if self._count and state.time < self._time[self._pos(self._count - 1)]:
+            return
+        if self._count == HISTORY_CAPACITY:
+            self._start = self._pos(1)
+            self._count -= 1
+
+        i = self._pos(self._count)
+        self._time[i] = state.time
+        self._lat[i] = state.lat
+        self._lon[i] = state.lon
+        self._alt[i] = state.altitude
+        self._vr[i] = state.vertical_rate
+        self._track[i] = state.true_track
+        self._dist[i] = state.dist_to_arr
+        self._count += 1
+
         # 최근 10분치만 유지
-        cutoff = state.time - 600
-        self.history = [s for s in self.history if s.time > cutoff]
+        cutoff = state.time - HISTORY_SECONDS
+        while self._time[self._start] <= cutoff:
+            self._start = self._pos(1)
+            self._count -= 1
 
     def estimate(self, state: FlightState) -> Phase:
         """현재 비행 단계를 추정"""
@@ -189,68 +252,75 @@ class FlightPhaseEstimator:
 
     # ── 히스토리 기반 보조 판단 ──
 
+    def _recent(self, column: array, n: int) -> list[float]:
+        """마지막 n개 샘플의 column 값 (오래된 순)"""
+        return [column[self._pos(k)] for k in range(self._count - n, self._count)]
+
+    def _window_size(self, duration: int) -> int:
+        """마지막 샘플 기준 최근 duration초 (time > 마지막 time - duration) 구간의 샘플 수"""
+        cutoff = self._time[self._pos(self._count - 1)] - duration
+        n = 0
+        while n < self._count and self._time[self._pos(self._count - 1 - n)] > cutoff:
+            n += 1
+        return n
+
     def _is_continuous_descent(self, min_duration: int) -> bool:
-        if not self.history:
-            return False
-        recent = [
-            s
-            for s in self.history
-            if s.time > self.history[-1].time - min_duration
-        ]
-        if len(recent) < 3:
+        """최근 min_duration초 동안 계속 하강 중인지.
+
+        샘플 간격이 길어(폴링 60초 등) 구간 안 샘플이 DESCENT_MIN_SAMPLES개 미만이면
+        최근 DESCENT_MIN_SAMPLES개 샘플로 판단한다.
+        """
+        if self._count < DESCENT_MIN_SAMPLES:
             return False
-        return all(s.vertical_rate < -200 for s in recent)
+        n = max(self._window_size(min_duration), DESCENT_MIN_SAMPLES)
+        return all(vr < -200 for vr in self._recent(self._vr, n))
 
     def _was_descending_recently(self) -> bool:
-        if len(self.history) < 5:
+        if self._count < 5:
             return False
-        prev = self.history[-5:-1]
-        return any(s.vertical_rate < -500 for s in prev)
+        prev = self._recent(self._vr, 5)[:-1]
+        return any(vr < -500 for vr in prev)
 
     def _is_level_after_descent(self) -> bool:
-        if len(self.history) < 8:
+        if self._count < 8:
             return False
-        older = self.history[-8:-4]
-        recent = self.history[-3:]
-        was_descending = any(s.vertical_rate < -500 for s in older)
-        now_level = all(abs(s.vertical_rate) < 300 for s in recent)
+        vrs = self._recent(self._vr, 8)
+        was_descending = any(vr < -500 for vr in vrs[:4])
+        now_level = all(abs(vr) < 300 for vr in vrs[-3:])
         return was_descending and now_level
 
     def _is_holding(self) -> bool:
-        """홀딩 패턴 감지 (최소 5분 데이터 필요)"""
-        if len(self.history) < 10:
+        """홀딩 패턴 감지 (최근 5분 구간에 HOLDING_MIN_SPAN초 이상의 데이터 필요)"""
+        if self._count < HOLDING_MIN_SAMPLES:
             return False
 
-        recent = [
-            s for s in self.history if s.time > self.history[-1].time - 300
-        ]
-        if len(recent) < 10:
+        n = self._window_size(HOLDING_WINDOW)
+        times = self._recent(self._time, n)
+        if n < HOLDING_MIN_SAMPLES or times[-1] - times[0] < HOLDING_MIN_SPAN:
             return False
 
         # 고도 변화 적음 (< 300ft)
-        alts = [s.altitude for s in recent]
+        alts = self._recent(self._alt, n)
         if max(alts) - min(alts) > 300:
             return False
 
         # 헤딩 누적 변화 300°+
-        total_heading_change = 0.0
-        for i in range(1, len(recent)):
-            diff = recent[i].true_track - recent[i - 1].true_track
-            diff = (diff + 180) % 360 - 180
-            total_heading_change += abs(diff)
+        tracks = self._recent(self._track, n)
+        total_heading_change = sum(
+            abs((tracks[i] - tracks[i - 1] + 180) % 360 - 180) for i in range(1, n)
+        )
         if total_heading_change < 300:
             return False
 
         # 위치가 좁은 범위 (< ~10nm)
-        lats = [s.lat for s in recent]
-        lons = [s.lon for s in recent]
+        lats = self._recent(self._lat, n)
+        lons = self._recent(self._lon, n)
         if max(lats) - min(lats) > 0.15 or max(lons) - min(lons) > 0.15:
             return False
 
         # 도착 공항에 가까워지지 않음
-        first_dist = recent[0].dist_to_arr
-        last_dist = recent[-1].dist_to_arr
-        if first_dist - last_dist > 5:
+        dists = self._recent(self._dist, n)
+        if dists[0] - dists[-1] > 5:
             return False
 
         return True
@@ -0,0 +1,105 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/flight_stream.py
+
+"""
+Inbound 항공기 실시간 추적 스트림 (SSE)
+
+같은 조회 조건(tail/편명/도착 공항/스케줄 컨텍스트)의 구독자는 producer 태스크 하나를 공유한다.
+producer는 OpenSky poller 주기마다(poller가 없으면 STREAM_INTERVAL마다) track_inbound 결과를
+모든 구독자 큐에 넣고, 마지막 구독자가 떠나면 종료한다.
+브라우저 탭 수와 관계없이 항공기당 조회는 poller 주기당 1회다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+from app.services.flight_tracker import track_inbound, wait_for_next_poll
+
+logger = logging.getLogger(__name__)
+
+STREAM_INTERVAL = 60  # poller가 없을 때 갱신 주기 (초)
+KEEPALIVE_INTERVAL = 15  # 프록시 idle timeout 방지용 주석 전송 주기 (초)
+
+StreamKey = tuple[tuple[str, Optional[str]], ...]
+
+# 조회 조건 → 구독자 큐 (최신 값 1개만 보관)
+_subscribers: dict[StreamKey, set[asyncio.Queue]] = {}
+_producers: dict[StreamKey, asyncio.Task] = {}
+_latest: dict[StreamKey, dict] = {}
+
+
+def stream_stats() -> dict:
+    return {
+        "streams": len(_producers),
+        "subscribers": sum(len(s) for s in _subscribers.values()),
+    }
+
+
+async def event_stream(params: dict) -> AsyncIterator[str]:
+    """track_inbound 인자(params)에 대한 SSE 이벤트 스트림. 연결이 끊기면 구독을 해제한다."""
+    key: StreamKey = tuple(sorted(params.items()))
+    queue = _subscribe(key, params)
+    try:
+        while True:
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: track\ndata: {json.dumps(data)}\n\n"
+    finally:
+        _unsubscribe(key, queue)
+
+
+def _subscribe(key: StreamKey, params: dict) -> asyncio.Queue:
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    _subscribers.setdefault(key, set()).add(queue)
+    if key in _latest:
+        queue.put_nowait(_latest[key])
+    task = _producers.get(key)
+    if task is None or task.done():
+        _producers[key] = asyncio.get_running_loop().create_task(_produce(key, params))
+    return queue
+
+
+def _unsubscribe(key: StreamKey, queue: asyncio.Queue) -> None:
+    subscribers = _subscribers.get(key)
+    if subscribers is None:
+        return
+    subscribers.discard(queue)
+    if not subscribers:
+        del _subscribers[key]
+        _latest.pop(key, None)
+        task = _producers.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+
+def _offer(queue: asyncio.Queue, data: dict) -> None:
+    """느린 구독자는 이전 값을 버리고 최신 값만 받는다."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(data)
+
+
+async def _produce(key: StreamKey, params: dict) -> None:
+    """구독자가 남아 있는 동안 조회 결과를 fan-out 한다."""
+    while _subscribers.get(key):
+        try:
+            data = await track_inbound(**params)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Flight stream update failed for %s: %s", dict(key), e)
+            data = {"available": False, "reason": "error"}
+
+        if data != _latest.get(key):
+            _latest[key] = data
+            for queue in _subscribers.get(key, ()):
+                _offer(queue, data)
+
+        await wait_for_next_poll(STREAM_INTERVAL)
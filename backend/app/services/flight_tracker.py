@@ -3,15 +3,18 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import math
 import os
 import time
 from datetime import datetime, timezone, timedelta
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 import httpx
 
 from app.services.flight_phase import (
+    HISTORY_CAPACITY,
     FlightPhaseEstimator,
     FlightState,
     Phase,
@@ -19,51 +22,67 @@ from app.services.flight_phase import (
     calculate_hybrid_eta,
     should_simplify_display,
 )
+from app.db.supabase import get_supabase, run_db
+from app.services.cache import get_cache
+from app.services.provider_gateway import ProviderUnavailable, get_gateway, provider_health
+from app.services.singleflight import SingleFlight
 
-_USER_AGENT = "MFA-MyFlightAssistant/0.1"
+logger = logging.getLogger(__name__)
 
 # 인메모리 캐시 (TTL 5분) — weather.py 패턴
-_cache: dict[str, tuple[float, Any]] = {}
 _CACHE_TTL = 300  # 5분
+_cache = get_cache("flight", ttl=_CACHE_TTL, max_entries=1000)
 
-# 항공기별 FlightPhaseEstimator 인스턴스 (icao24 키)
-_estimators: dict[str, tuple[float, FlightPhaseEstimator]] = {}
+# provider별 "데이터 없음" 응답 (같은 항공기를 짧은 시간 안에 다시 조회하지 않아 quota 절약)
+NEGATIVE_TTL = 120  # 2분
+_negative = get_cache("flight_negative", ttl=NEGATIVE_TTL, max_entries=2000)
+
+# 동시 캐시 미스 병합 (OpenSky → FlightLabs → AviationStack 순차 시도 포함)
+# provider당 요청 timeout 8초 × 3 < 50초, circuit이 열린 provider는 호출 없이 건너뛴다
+_inflight = SingleFlight(timeout=50)
+
+# 항공기·구간별 FlightPhaseEstimator 인스턴스 (_estimator_key — 같은 항공기도 출발/도착 컨텍스트별로 따로 둔다)
+# 마지막 사용 후 30분 유지, 최대 대수 초과 시 LRU 삭제 — 만료 정리는 캐시 sweeper가 주기적으로 수행
 _ESTIMATOR_TTL = 1800  # 30분 미사용 시 삭제
+_MAX_ESTIMATORS = 2000
+_estimators = get_cache("flight_estimator", ttl=_ESTIMATOR_TTL, max_entries=_MAX_ESTIMATORS)
 
 
 def _get_cached(key: str) -> Any | None:
-    if key in _cache:
-        ts, data = _cache[key]
-        if time.time() - ts < _CACHE_TTL:
-            return data
-        del _cache[key]
-    return None
+    return _cache.get(key)
 
 
 def _set_cache(key: str, data: Any) -> None:
-    _cache[key] = (time.time(), data)
+    _cache.set(key, data)
 
 
-def _get_estimator(icao24: str, total_distance: float) -> FlightPhaseEstimator:
-    """항공기별 FlightPhaseEstimator 인스턴스를 반환한다. 없으면 생성."""
-    now = time.time()
-    if icao24 in _estimators:
-        ts, est = _estimators[icao24]
-        # total_distance가 크게 바뀌면 새로 생성 (다른 비행)
-        if abs(est.total_dist - total_distance) < 50:
-            _estimators[icao24] = (now, est)
-            return est
-    est = FlightPhaseEstimator(total_distance)
-    _estimators[icao24] = (now, est)
+def _estimator_key(icao24: str, origin: str | None, destination: str | None) -> str:
+    return f"{icao24}:{origin or ''}:{destination or ''}"
+
+
+def _get_estimator(key: str, total_distance: float) -> FlightPhaseEstimator:
+    """항공기·구간별 FlightPhaseEstimator 인스턴스를 반환한다. 없으면 생성."""
+    est = _estimators.get(key)
+    # total_distance가 크게 바뀌면 새로 생성 (다른 비행)
+    if est is None or abs(est.total_dist - total_distance) >= 50:
+        est = FlightPhaseEstimator(total_distance)
+    # 다시 저장하여 TTL을 마지막 사용 시각 기준으로 연장
+    _estimators.set(key, est)
     return est
 
 
-def _cleanup_estimators() -> None:
-    """오래된 estimator 인스턴스를 정리한다."""
-    now = time.time()
-    expired = [k for k, (ts, _) in _estimators.items() if now - ts > _ESTIMATOR_TTL]
-    for k in expired:
-        del _estimators[k]
+def estimator_stats() -> dict:
+    """추적 중인 항공기 수와 estimator 메모리 사용량을 반환한다."""
+    estimators = _estimators.values()
+    total_bytes = sum(e.memory_bytes() for e in estimators)
+    return {
+        "aircraft": len(estimators),
+        "max_aircraft": _MAX_ESTIMATORS,
+        "ttl": _ESTIMATOR_TTL,
+        "history_capacity": HISTORY_CAPACITY,
+        "bytes": total_bytes,
+        "avg_bytes": round(total_bytes / len(estimators)) if estimators else None,
+    }
 
 
 def _get_flightlabs_key() -> str | None:
@@ -158,7 +177,7 @@ def _estimate_eta_minutes(distance_nm: float, speed_kts: float, altitude_ft: flo
 
 
 def get_tracker_status() -> dict:
-    """설정된 provider 목록을 반환한다."""
+    """설정된 provider 목록과 provider별 상태(circuit/남은 quota)를 반환한다."""
     fl = bool(_get_flightlabs_key())
     av = bool(_get_aviationstack_key())
     return {
@@ -166,6 +185,7 @@ def get_tracker_status() -> dict:
         "flightlabs": fl,
         "aviationstack": av,
         "any_available": True,
+        "health": provider_health(),
     }
 
 
@@ -182,8 +202,26 @@ async def track_inbound(
     if not tail_number and not flight_number:
         return {"available": False, "reason": "no_identifier"}
 
-    # 주기적으로 오래된 estimator 정리
-    _cleanup_estimators()
+    # 스케줄 컨텍스트 (하이브리드 ETA용)
+    schedule_ctx = {
+        "origin": origin,
+        "scheduled_dep": scheduled_dep,
+        "scheduled_arr": scheduled_arr,
+    }
+
+    # poller 실행 중이면 OpenSky는 공유 스냅샷에서 읽는다 (다음 폴링부터 이 tail도 포함)
+    opensky_polled = False
+    if tail_number and provider in (None, "opensky") and _poll_task is not None:
+        icao24 = _n_to_icao24(tail_number)
+        if icao24:
+            _watch(icao24, tail_number, destination, schedule_ctx)
+            state = _states.get(icao24)
+            if state is not None:
+                return _normalize_opensky(state, tail_number, destination, schedule_ctx, update_estimator=False)
+            # 직전 폴링에 포함됐는데 state가 없으면 OpenSky 개별 조회는 생략
+            opensky_polled = icao24 in _covered
+            if opensky_polled and provider == "opensky":
+                return {"available": False, "reason": "no_data", "provider": "opensky"}
 
     # 캐시 키 — 스케줄 컨텍스트는 캐시 키에 포함하지 않음 (동일 항공기)
     cache_key = f"flight:{tail_number or ''}:{flight_number or ''}:{provider or 'auto'}:{destination or ''}"
@@ -191,80 +229,130 @@ async def track_inbound(
     if cached is not None:
         return cached
 
-    # 스케줄 컨텍스트 (하이브리드 ETA용)
-    schedule_ctx = {
-        "origin": origin,
-        "scheduled_dep": scheduled_dep,
-        "scheduled_arr": scheduled_arr,
-    }
+    # 같은 항공기를 동시에 조회하는 요청은 upstream 호출 하나를 공유한다
+    return await _inflight.do(
+        cache_key,
+        lambda: _track_uncached(
+            cache_key, tail_number, flight_number, provider, destination, schedule_ctx, opensky_polled,
+        ),
+    )
+
+
+async def _query(
+    provider: str, ident: str, fetch: Callable[[], Awaitable[Any]]
+) -> tuple[Any, Optional[str]]:
+    """provider를 조회한다. (결과, 실패 사유) — 사유는 no_data 또는 ProviderUnavailable 사유.
+
+    데이터 없음이 확인된 조회는 NEGATIVE_TTL 동안 다시 호출하지 않는다.
+    """
+    neg_key = f"{provider}:{ident}"
+    if _negative.get(neg_key):
+        return None, "no_data"
+    try:
+        result = await fetch()
+    except ProviderUnavailable as e:
+        return None, e.reason
+    if result is None:
+        _negative.set(neg_key, True)
+        return None, "no_data"
+    return result, None
+
+
+async def _track_uncached(
+    cache_key: str,
+    tail_number: str | None,
+    flight_number: str | None,
+    provider: str | None,
+    destination: str | None,
+    schedule_ctx: dict,
+    opensky_polled: bool = False,
+) -> dict:
+    """provider를 조회하여 정규화된 결과를 캐시한다. opensky_polled면 OpenSky 개별 조회를 건너뛴다."""
+    flight_ident = f"{tail_number or ''}:{flight_number or ''}"
 
     # provider 지정 시
     if provider == "opensky":
         if not tail_number:
             return {"available": False, "reason": "opensky_requires_tail_number", "provider": "opensky"}
-        result = await _fetch_opensky(tail_number)
+        result, reason = await _query("opensky", tail_number, lambda: _fetch_opensky(tail_number))
         if result:
             normalized = _normalize_opensky(result, tail_number, destination, schedule_ctx)
             _set_cache(cache_key, normalized)
             return normalized
-        return {"available": False, "reason": "no_data", "provider": "opensky"}
+        return {"available": False, "reason": reason, "provider": "opensky"}
 
     if provider == "flightlabs":
-        result = await _fetch_flightlabs(tail_number, flight_number)
+        result, reason = await _query(
+            "flightlabs", flight_ident, lambda: _fetch_flightlabs(tail_number, flight_number)
+        )
         if result:
             normalized = _normalize_flight(result, "flightlabs")
             _set_cache(cache_key, normalized)
             return normalized
-        return {"available": False, "reason": "no_data", "provider": "flightlabs"}
+        return {"available": False, "reason": reason, "provider": "flightlabs"}
 
     if provider == "aviationstack":
         if not flight_number:
             return {"available": False, "reason": "aviationstack_requires_flight_number", "provider": "aviationstack"}
-        result = await _fetch_aviationstack(flight_number)
+        result, reason = await _query(
+            "aviationstack", flight_number, lambda: _fetch_aviationstack(flight_number)
+        )
         if result:
             normalized = _normalize_flight(result, "aviationstack")
             _set_cache(cache_key, normalized)
             return normalized
-        return {"available": False, "reason": "no_data", "provider": "aviationstack"}
+        return {"available": False, "reason": reason, "provider": "aviationstack"}
 
     # 자동: OpenSky 우선 (tail_number 있을 때) → FlightLabs → AviationStack
-    if tail_number:
-        result = await _fetch_opensky(tail_number)
+    # rate limit/circuit open인 provider는 호출 없이 바로 다음 provider로 넘어간다
+    unavailable: list[str] = []
+    if tail_number and not opensky_polled:
+        result, reason = await _query("opensky", tail_number, lambda: _fetch_opensky(tail_number))
         if result:
             normalized = _normalize_opensky(result, tail_number, destination, schedule_ctx)
             _set_cache(cache_key, normalized)
             return normalized
+        if reason != "no_data":
+            unavailable.append("opensky")
 
     if _get_flightlabs_key():
-        result = await _fetch_flightlabs(tail_number, flight_number)
+        result, reason = await _query(
+            "flightlabs", flight_ident, lambda: _fetch_flightlabs(tail_number, flight_number)
+        )
         if result:
             normalized = _normalize_flight(result, "flightlabs")
             _set_cache(cache_key, normalized)
             return normalized
+        if reason != "no_data":
+            unavailable.append("flightlabs")
 
     if _get_aviationstack_key() and flight_number:
-        result = await _fetch_aviationstack(flight_number)
+        result, reason = await _query(
+            "aviationstack", flight_number, lambda: _fetch_aviationstack(flight_number)
+        )
         if result:
             normalized = _normalize_flight(result, "aviationstack")
             _set_cache(cache_key, normalized)
             return normalized
+        if reason != "no_data":
+            unavailable.append("aviationstack")
 
+    if unavailable:
+        return {"available": False, "reason": "provider_unavailable", "unavailable": unavailable}
     return {"available": False, "reason": "no_data"}
 
 
 async def _fetch_opensky(tail_number: str) -> Optional[list]:
-    """OpenSky Network API로 항공기 위치를 조회한다. N-number → ICAO24 변환 후 호출."""
+    """OpenSky Network API로 항공기 위치를 조회한다. N-number → ICAO24 변환 후 호출.
+
+    데이터가 없으면 None, 게이트웨이가 호출을 막거나 요청이 실패하면 ProviderUnavailable.
+    """
     icao24 = _n_to_icao24(tail_number)
     if not icao24:
         return None
 
+    resp = await get_gateway("opensky").get(OPENSKY_STATES_URL, params={"icao24": icao24})
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                "https://opensky-network.org/api/states/all",
-                params={"icao24": icao24},
-                headers={"User-Agent": _USER_AGENT},
-            )
         if resp.status_code != 200:
             return None
         data = resp.json()
@@ -281,8 +369,12 @@ def _normalize_opensky(
     tail_number: str,
     destination: Optional[str],
     schedule_ctx: Optional[dict] = None,
+    update_estimator: bool = True,
 ) -> dict:
-    """OpenSky state vector를 통일된 형식으로 정규화한다. 비행 단계 추정 포함."""
+    """OpenSky state vector를 통일된 형식으로 정규화한다. 비행 단계 추정 포함.
+
+    update_estimator=False면 estimator 히스토리에 샘플을 넣지 않는다 (poller가 이미 넣은 state를 읽을 때).
+    """
     from app.services.airport import get_coordinates
 
     callsign = (state[1] or "").strip()
@@ -346,7 +438,7 @@ def _normalize_opensky(
         and distance_nm is not None
     ):
         td = total_distance or (distance_nm + (dist_from_dep or 0))
-        estimator = _get_estimator(icao24, td)
+        estimator = _get_estimator(_estimator_key(icao24, origin_code, destination), td)
 
         flight_state = FlightState(
             time=time_position or int(time.time()),
@@ -361,7 +453,8 @@ def _normalize_opensky(
             dist_from_dep=dist_from_dep or 0.0,
         )
 
-        estimator.update(flight_state)
+        if update_estimator:
+            estimator.update(flight_state)
         phase = estimator.estimate(flight_state)
         progress = round(estimator.get_progress(flight_state) * 100, 1)
 
@@ -447,6 +540,221 @@ def _normalize_opensky(
     }
 
 
+# ─────────── OpenSky 배치 poller ───────────
+
+OPENSKY_STATES_URL = "https://opensky-network.org/api/states/all"
+# 익명 OpenSky는 일일 credit이 적으므로 주기를 길게 잡는다 (인증 계정이면 줄여도 됨)
+POLL_INTERVAL = int(os.getenv("OPENSKY_POLL_INTERVAL", "60"))  # 초
+WATCH_TTL = 1800  # 마지막 track 요청 후 이 시간 동안 계속 폴링
+SCHEDULE_SCAN_INTERVAL = 600  # 오늘 스케줄 tail 목록 재조회 주기 (초)
+# 스케줄 레그의 tail은 이 구간에만 폴링한다: 출발 3시간 전(inbound 비행 포함) ~ 도착 30분 후
+PRE_DEPARTURE_WINDOW = 3 * 3600
+POST_ARRIVAL_WINDOW = 1800
+_POLL_BATCH_SIZE = 100  # 요청 1회당 icao24 수 (URL 길이 제한)
+# poller가 쓸 수 있는 OpenSky quota 비율 (나머지는 poller 밖 개별 조회용)
+_POLL_QUOTA_SHARE = 0.8
+
+_poll_task: asyncio.Task | None = None
+# track 요청으로 등록된 항공기·구간: estimator 키 → (icao24, tail_number, destination 포함 스케줄 컨텍스트, 만료 epoch)
+# 같은 항공기를 다른 출발/도착 컨텍스트로 보는 요청은 각자 estimator를 갖는다
+_watched: dict[str, tuple[str, str, dict, float]] = {}
+# 오늘 전후 flight_legs의 tail: icao24 → 폴링 구간 [(시작 epoch, 끝 epoch), ...]
+_scheduled_windows: dict[str, list[tuple[float, float]]] = {}
+# 마지막 폴링 스냅샷: icao24 → state vector, 그리고 그 폴링에 포함됐던 icao24
+_states: dict[str, list] = {}
+_covered: set[str] = set()
+# estimator 키별 마지막으로 넣은 state의 time_position (같은 state 중복 투입 방지)
+_fed_times: dict[str, int] = {}
+_poll_stats = {"polls": 0, "errors": 0, "requests": 0, "tracked": 0, "airborne": 0, "last_poll_at": None}
+# 폴링 1회가 끝날 때마다 set 후 교체 (스트림 구독자가 새 스냅샷 시점에 맞춰 깨어남)
+_poll_done: asyncio.Event | None = None
+
+
+def _watch(icao24: str, tail_number: str, destination: str | None, schedule_ctx: dict) -> None:
+    key = _estimator_key(icao24, schedule_ctx.get("origin"), destination)
+    _watched[key] = (icao24, tail_number, {**schedule_ctx, "destination": destination}, time.time() + WATCH_TTL)
+
+
+def _tracked_icao24s(now: float) -> set[str]:
+    """이번 폴링 대상: track 요청 중인 항공기 + 폴링 구간 안에 있는 스케줄 레그의 tail."""
+    scheduled = {
+        icao24
+        for icao24, windows in _scheduled_windows.items()
+        if any(start <= now <= end for start, end in windows)
+    }
+    return {icao24 for icao24, _, _, _ in _watched.values()} | scheduled
+
+
+def poller_stats() -> dict:
+    """OpenSky poller 상태를 반환한다."""
+    return {**_poll_stats, "running": _poll_task is not None, "interval": _poll_interval()}
+
+
+async def wait_for_next_poll(timeout: float) -> None:
+    """다음 폴링이 끝날 때까지 최대 timeout초 대기한다. poller가 없으면 timeout초 대기."""
+    global _poll_done
+    if _poll_task is None:
+        await asyncio.sleep(timeout)
+        return
+    if _poll_done is None:
+        _poll_done = asyncio.Event()
+    try:
+        await asyncio.wait_for(_poll_done.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+def _notify_poll_done() -> None:
+    global _poll_done
+    if _poll_done is not None:
+        _poll_done.set()
+        _poll_done = None
+
+
+def _load_scheduled_windows() -> dict[str, list[tuple[float, float]]]:
+    """오늘(UTC 기준 전후 1일) 레그의 tail_number를 icao24로 변환하고 레그별 폴링 구간을 모은다.
+
+    depart_utc/arrive_utc가 없는 레그는 구간을 정할 수 없으므로 제외한다. (동기 — run_db에서 호출)
+    """
+    today = datetime.now(timezone.utc).date()
+    rows = (
+        get_supabase()
+        .table("flight_legs")
+        .select("tail_number, depart_utc, arrive_utc")
+        .gte("flight_date", (today - timedelta(days=1)).isoformat())
+        .lte("flight_date", (today + timedelta(days=1)).isoformat())
+        .not_.is_("tail_number", "null")
+        .execute()
+        .data
+        or []
+    )
+    windows: dict[str, list[tuple[float, float]]] = {}
+    for r in rows:
+        icao24 = _n_to_icao24(r["tail_number"].strip().upper()) if r.get("tail_number") else None
+        dep = _parse_iso(r["depart_utc"]) if r.get("depart_utc") else None
+        arr = _parse_iso(r["arrive_utc"]) if r.get("arrive_utc") else None
+        if not icao24 or not dep or not arr:
+            continue
+        windows.setdefault(icao24, []).append(
+            (dep.timestamp() - PRE_DEPARTURE_WINDOW, arr.timestamp() + POST_ARRIVAL_WINDOW)
+        )
+    return windows
+
+
+async def _fetch_opensky_states(icao24s: list[str]) -> list[list] | None:
+    """icao24 목록을 한 번의 states/all 요청으로 조회한다. 실패 시 None."""
+    _poll_stats["requests"] += 1
+    try:
+        resp = await get_gateway("opensky").get(
+            OPENSKY_STATES_URL,
+            params=[("icao24", icao24) for icao24 in icao24s],
+        )
+    except ProviderUnavailable as e:
+        logger.warning("OpenSky batch request skipped: %s", e.reason)
+        return None
+    if resp.status_code != 200:
+        logger.warning("OpenSky batch request failed: status=%d", resp.status_code)
+        return None
+    return resp.json().get("states") or []
+
+
+async def _poll_once() -> None:
+    """추적 대상 전체를 배치로 조회하여 스냅샷을 교체하고 estimator에 새 state를 넣는다."""
+    global _states, _covered
+    now = time.time()
+    for key in [k for k, (_, _, _, expires_at) in _watched.items() if expires_at <= now]:
+        del _watched[key]
+
+    icao24s = sorted(_tracked_icao24s(now))
+    _poll_stats["tracked"] = len(icao24s)
+    chunks = [icao24s[i:i + _POLL_BATCH_SIZE] for i in range(0, len(icao24s), _POLL_BATCH_SIZE)]
+    responses = await asyncio.gather(*(_fetch_opensky_states(chunk) for chunk in chunks))
+
+    states: dict[str, list] = {}
+    covered: set[str] = set()
+    for chunk, vectors in zip(chunks, responses):
+        if vectors is None:
+            continue
+        covered.update(chunk)
+        for sv in vectors:
+            states[(sv[0] or "").strip().lower()] = sv
+    _states, _covered = states, covered
+    _poll_stats["polls"] += 1
+    _poll_stats["airborne"] = len(states)
+    _poll_stats["last_poll_at"] = datetime.now(timezone.utc).isoformat()
+
+    # 요청 컨텍스트(도착 공항 등)가 있는 항공기·구간의 estimator만 갱신한다
+    for key, (icao24, tail_number, ctx, _) in _watched.items():
+        sv = states.get(icao24)
+        time_position = sv[3] if sv is not None else None
+        if time_position is None or _fed_times.get(key) == time_position:
+            continue
+        _normalize_opensky(sv, tail_number, ctx["destination"], ctx)
+        _fed_times[key] = time_position
+    for key in _fed_times.keys() - _watched.keys():
+        del _fed_times[key]
+    _notify_poll_done()
+
+
+def _poll_interval() -> float:
+    """폴링 주기. 추적 대상이 많아 요청 수가 늘면 OpenSky quota(token bucket) 안에 들도록 늘린다."""
+    tracked = len(_tracked_icao24s(time.time()))
+    requests_per_poll = max(1, math.ceil(tracked / _POLL_BATCH_SIZE))
+    return max(POLL_INTERVAL, requests_per_poll / (get_gateway("opensky").bucket.rate * _POLL_QUOTA_SHARE))
+
+
+async def _run_loop() -> None:
+    """asyncio 태스크로 실행되는 메인 루프."""
+    global _scheduled_windows, _states, _covered
+    next_scan = 0.0
+    while True:
+        try:
+            if time.time() >= next_scan:
+                next_scan = time.time() + SCHEDULE_SCAN_INTERVAL
+                try:
+                    _scheduled_windows = await run_db(_load_scheduled_windows)
+                except Exception as e:
+                    logger.warning("Scheduled tail scan failed: %s", e)
+            if _watched or _tracked_icao24s(time.time()):
+                await _poll_once()
+            else:
+                _states, _covered = {}, set()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            _poll_stats["errors"] += 1
+            logger.error("OpenSky poller error: %s", e)
+        await asyncio.sleep(_poll_interval())
+
+
+def start_opensky_poller() -> None:
+    """OpenSky 배치 poller를 시작한다."""
+    global _poll_task
+    if _poll_task is None or _poll_task.done():
+        _poll_task = asyncio.get_running_loop().create_task(_run_loop())
+        logger.info("OpenSky poller started (interval %ds)", POLL_INTERVAL)
+
+
+def stop_opensky_poller() -> None:
+    """OpenSky 배치 poller를 중지한다."""
+    global _poll_task
+    if _poll_task and not _poll_task.done():
+        _poll_task.cancel()
+        logger.info("OpenSky poller stopped")
+    _poll_task = None
+
+
+def _body_error(resp: httpx.Response) -> Optional[str]:
+    """FlightLabs/AviationStack은 quota 초과/키 오류도 200 + error 객체로 응답한다."""
+    try:
+        data = resp.json()
+    except ValueError:
+        return None
+    if isinstance(data, dict) and data.get("error"):
+        return str(data["error"])
+    return None
+
+
 async def _fetch_flightlabs(
     tail_number: str | None = None,
     flight_number: str | None = None,
@@ -462,13 +770,12 @@ async def _fetch_flightlabs(
     if flight_number:
         params["flight_iata"] = flight_number
 
+    resp = await get_gateway("flightlabs").get(
+        "https://app.goflightlabs.com/advanced-real-time-flights",
+        params=params,
+        body_error=_body_error,
+    )
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                "https://app.goflightlabs.com/advanced-real-time-flights",
-                params=params,
-                headers={"User-Agent": _USER_AGENT},
-            )
         if resp.status_code != 200:
             return None
         data = resp.json()
@@ -490,13 +797,12 @@ async def _fetch_aviationstack(flight_number: str) -> dict | None:
     if not key:
         return None
 
+    resp = await get_gateway("aviationstack").get(
+        "https://api.aviationstack.com/v1/flights",
+        params={"access_key": key, "flight_iata": flight_number},
+        body_error=_body_error,
+    )
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                "https://api.aviationstack.com/v1/flights",
-                params={"access_key": key, "flight_iata": flight_number},
-                headers={"User-Agent": _USER_AGENT},
-            )
         if resp.status_code != 200:
             return None
         data = resp.json()
@@ -0,0 +1,108 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/http_client.py
+
+"""
+외부 API용 공유 httpx.AsyncClient 레지스트리
+
+provider별로 커넥션 풀(keep-alive)을 유지하여 매 요청마다
+TCP/TLS 핸드셰이크를 반복하지 않도록 한다.
+main.lifespan에서 시작/종료하며, lifespan 밖(서버리스 등)에서는 최초 사용 시 생성된다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "MFA-MyFlightAssistant/0.1"
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# provider별 설정: timeout(초), HTTP/2 지원 여부, 호스트당 최대 커넥션 수
+_PROVIDERS: dict[str, dict] = {
+    "awc":           {"timeout": 10.0, "http2": True,  "max_connections": 20},
+    "avwx":          {"timeout": 15.0, "http2": True,  "max_connections": 10},
+    "faa":           {"timeout": 15.0, "http2": False, "max_connections": 10},
+    "opensky":       {"timeout": 8.0,  "http2": False, "max_connections": 5},
+    "flightlabs":    {"timeout": 8.0,  "http2": False, "max_connections": 5},
+    "aviationstack": {"timeout": 8.0,  "http2": False, "max_connections": 5},
+    "calendar":      {"timeout": 30.0, "http2": False, "max_connections": 20},
+    "supabase":      {"timeout": 5.0,  "http2": True,  "max_connections": 5},
+    "webpush":       {"timeout": 10.0, "http2": True,  "max_connections": 50},
+}
+_KEEPALIVE_EXPIRY = 60.0
+
+_clients: dict[str, httpx.AsyncClient] = {}
+_client_loops: dict[str, asyncio.AbstractEventLoop] = {}
+
+
+def _create_client(provider: str) -> httpx.AsyncClient:
+    conf = _PROVIDERS[provider]
+    limits = httpx.Limits(
+        max_connections=conf["max_connections"],
+        max_keepalive_connections=conf["max_connections"],
+        keepalive_expiry=_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        timeout=conf["timeout"],
+        limits=limits,
+        http2=conf["http2"] and _HTTP2_AVAILABLE,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """provider용 공유 클라이언트를 반환한다. 없거나 다른 이벤트 루프에서 생성된 경우 새로 만든다."""
+    if provider not in _PROVIDERS:
+        raise KeyError(f"Unknown HTTP provider: {provider}")
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(provider)
+    if client is None or client.is_closed or _client_loops.get(provider) is not loop:
+        if client is not None and not client.is_closed:
+            _discard_client(provider, client, _client_loops.get(provider))
+        client = _create_client(provider)
+        _clients[provider] = client
+        _client_loops[provider] = loop
+    return client
+
+
+def _discard_client(provider: str, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """다른 이벤트 루프에서 만든 클라이언트를 버린다. 그 루프가 살아 있으면 그 루프에서 닫는다.
+
+    커넥션은 만든 루프에 묶여 있어 현재 루프에서는 닫을 수 없다.
+    이미 닫힌 루프의 클라이언트는 닫을 방법이 없으므로 로그만 남긴다.
+    """
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        logger.info("Closing %s HTTP client from previous event loop", provider)
+    else:
+        logger.warning("Dropping %s HTTP client bound to a stopped event loop (connections not closed)", provider)
+
+
+async def start_http_clients() -> None:
+    """모든 provider 클라이언트를 미리 생성한다."""
+    for provider in _PROVIDERS:
+        get_client(provider)
+    logger.info("HTTP clients started (http2=%s)", _HTTP2_AVAILABLE)
+
+
+async def close_http_clients() -> None:
+    """모든 공유 클라이언트를 닫는다."""
+    clients = list(_clients.values())
+    _clients.clear()
+    _client_loops.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning("Failed to close HTTP client: %s", e)
+    logger.info("HTTP clients closed")
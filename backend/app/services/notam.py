@@ -3,26 +3,36 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
 import re
 import time
 from typing import Any
 
-import httpx
-
+from app.services import notam_store
 from app.services.airport import iata_to_icao
+from app.services.cache import get_cache
+from app.services.http_client import get_client
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 # FAA NOTAM API (v1)
 NOTAM_BASE = "https://external-api.faa.gov/notamapi/v1/notams"
 # AVWX API
 AVWX_BASE = "https://avwx.rest/api/notam"
-_USER_AGENT = "MFA-MyFlightAssistant/0.1"
 _FAA_API_KEY = os.getenv("FAA_NOTAM_API_KEY", "")
 _AVWX_API_KEY = os.getenv("AVWX_API_KEY", "")
 
-# 인메모리 캐시 (TTL 10분)
-_cache: dict[str, tuple[float, Any]] = {}
+# 인메모리 캐시 (TTL 10분, 이후 1시간까지 stale 응답 + 백그라운드 갱신)
 _CACHE_TTL = 600
+_STALE_TTL = 3600
+_cache = get_cache("notam", ttl=_CACHE_TTL, max_entries=1000, stale_ttl=_STALE_TTL)
+
+# 동시 캐시 미스 병합 (AVWX → FAA 순차 시도까지 포함)
+_inflight = SingleFlight(timeout=35)
+_refresh_tasks: set[asyncio.Task] = set()
 
 # 중요 키워드 (최상단 배치)
 CRITICAL_KEYWORDS = [
@@ -48,59 +58,117 @@ KEYWORD_CATEGORIES = {
     "service": ["SVC", "SERVICE", "FUEL", "TWR", "ATIS", "CTAF"],
 }
 
-
-def _get_cached(key: str) -> Any | None:
-    if key in _cache:
-        ts, data = _cache[key]
-        if time.time() - ts < _CACHE_TTL:
-            return data
-        del _cache[key]
-    return None
+# 전체 키워드를 하나의 정규식으로 합쳐 NOTAM당 한 번만 스캔한다
+_ALL_KEYWORDS = list(dict.fromkeys(
+    CRITICAL_KEYWORDS + [kw for kws in KEYWORD_CATEGORIES.values() for kw in kws]
+))
+_KEYWORD_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(kw) for kw in sorted(_ALL_KEYWORDS, key=len, reverse=True)) + r")\b"
+)
+# 활주로/유도로 폐쇄
+_CLOSURE_RE = re.compile(r"\b(RWY|RY|RUNWAY|TWY|TAXIWAY).*\b(CLSD|CLOSED)\b")
+# ILS/접근 불가
+_APPROACH_OUT_RE = re.compile(r"\b(ILS|LOC|GS|APCH).*\b(CLSD|CLOSED|U/S|UNSERVICEABLE|OTS|OUT OF SERVICE)\b")
 
 
 def _set_cache(key: str, data: Any) -> None:
-    _cache[key] = (time.time(), data)
+    _cache.set(key, data)
 
 
 async def fetch_notams(station: str) -> list[dict]:
     """공항의 NOTAM을 조회한다. AVWX → FAA → AWC 순으로 시도."""
+    entry = await fetch_notams_entry(station)
+    return entry["notams"]
+
+
+async def fetch_notams_entry(station: str) -> dict:
+    """NOTAM 목록과 조회 시각(fetched_at), stale 여부를 함께 반환한다.
+
+    stale 캐시는 즉시 반환하고 백그라운드에서 갱신한다.
+    인메모리 캐시가 비어 있으면(재시작 직후) 영구 저장소의 NOTAM으로 먼저 응답한다.
+    """
     icao = _resolve_icao(station)
     if not icao:
-        return []
+        return {"notams": [], "fetched_at": None, "stale": False}
 
     cache_key = f"notam:{icao}"
-    cached = _get_cached(cache_key)
-    if cached is not None:
-        return cached
-
+    entry = _cache.get_entry(cache_key)
+    if entry is not None:
+        if entry.stale:
+            _refresh_in_background(_inflight.do(cache_key, lambda: _fetch_and_cache(icao, cache_key)))
+        return {"notams": entry.value, "fetched_at": entry.stored_at, "stale": entry.stale}
+
+    stored = await asyncio.to_thread(notam_store.load, icao)
+    if stored is not None:
+        notams, fetched_at = stored
+        if notams and time.time() - fetched_at < _CACHE_TTL + _STALE_TTL:
+            notams = _sort_notams(notams)
+            _cache.set(cache_key, notams, stored_at=fetched_at)
+            stale = time.time() - fetched_at >= _CACHE_TTL
+            if stale:
+                _refresh_in_background(_inflight.do(cache_key, lambda: _fetch_and_cache(icao, cache_key)))
+            return {"notams": notams, "fetched_at": fetched_at, "stale": stale}
+
+    notams = await _inflight.do(cache_key, lambda: _fetch_and_cache(icao, cache_key))
+    return {"notams": notams, "fetched_at": time.time() if notams else None, "stale": False}
+
+
+def _refresh_in_background(coro) -> None:
+    """stale 항목 갱신을 응답과 분리하여 실행한다. 실패는 로그만 남긴다."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _refresh_tasks.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _refresh_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning("Background NOTAM refresh failed: %s", t.exception())
+
+    task.add_done_callback(_done)
+
+
+async def _fetch_and_cache(icao: str, cache_key: str) -> list[dict]:
+    """provider를 순서대로 시도하고 결과를 분류/저장/캐시한다."""
     # 1순위: AVWX API (키가 있을 때)
     if _AVWX_API_KEY:
         result = await _fetch_notams_avwx(icao)
         if result:
-            _set_cache(cache_key, result)
-            return result
+            return await _store_result(icao, cache_key, result, "avwx")
 
     # 2순위: FAA API (키가 있을 때)
     if _FAA_API_KEY:
         result = await _fetch_notams_faa(icao)
         if result:
-            _set_cache(cache_key, result)
-            return result
+            return await _store_result(icao, cache_key, result, "faa")
 
     return []
 
 
+async def _store_result(icao: str, cache_key: str, notams: list[dict], source: str) -> list[dict]:
+    notams = _sort_notams(await asyncio.to_thread(_classify_and_save, icao, notams, source))
+    _set_cache(cache_key, notams)
+    return notams
+
+
+def _classify_and_save(icao: str, notams: list[dict], source: str) -> list[dict]:
+    """새로 생겼거나 본문이 바뀐 NOTAM만 분류하고, 나머지는 저장된 분류를 재사용한다."""
+    known = notam_store.known_classifications(icao)
+    for n in notams:
+        prev = known.get(notam_store.notam_key(n))
+        if prev and prev[0] == notam_store.text_hash(n["text"]):
+            n.update({k: prev[1][k] for k in ("keywords", "category", "is_critical")})
+        else:
+            n.update(classify_notam(n["text"]))
+    notam_store.save(icao, notams, source)
+    return notams
+
+
 async def _fetch_notams_avwx(icao: str) -> list[dict]:
     """AVWX API로 NOTAM을 조회한다."""
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                f"{AVWX_BASE}/{icao}",
-                headers={
-                    "Authorization": f"BEARER {_AVWX_API_KEY}",
-                    "User-Agent": _USER_AGENT,
-                },
-            )
+        resp = await get_client("avwx").get(
+            f"{AVWX_BASE}/{icao}",
+            headers={"Authorization": f"BEARER {_AVWX_API_KEY}"},
+        )
 
         if resp.status_code != 200:
             return []
@@ -109,9 +177,7 @@ async def _fetch_notams_avwx(icao: str) -> list[dict]:
         if not isinstance(data, list):
             return []
 
-        notams = [_parse_avwx_notam(item) for item in data]
-        notams = _sort_notams(notams)
-        return notams
+        return [_parse_avwx_notam(item) for item in data]
     except Exception:
         return []
 
@@ -119,36 +185,30 @@ async def _fetch_notams_avwx(icao: str) -> list[dict]:
 async def _fetch_notams_faa(icao: str) -> list[dict]:
     """FAA API로 NOTAM을 조회한다."""
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(
-                NOTAM_BASE,
-                params={
-                    "icaoLocation": icao,
-                    "notamType": "N",
-                    "sortBy": "effectiveStartDate",
-                    "sortOrder": "DESC",
-                    "pageSize": 50,
-                },
-                headers={
-                    "User-Agent": _USER_AGENT,
-                    "client_id": _FAA_API_KEY,
-                },
-            )
+        resp = await get_client("faa").get(
+            NOTAM_BASE,
+            params={
+                "icaoLocation": icao,
+                "notamType": "N",
+                "sortBy": "effectiveStartDate",
+                "sortOrder": "DESC",
+                "pageSize": 50,
+            },
+            headers={"client_id": _FAA_API_KEY},
+        )
 
         if resp.status_code != 200:
             return []
 
         data = resp.json()
         items = data.get("items", [])
-        notams = [_parse_notam(item) for item in items]
-        notams = _sort_notams(notams)
-        return notams
+        return [_parse_notam(item) for item in items]
     except Exception:
         return []
 
 
 def _parse_notam(item: dict) -> dict:
-    """FAA NOTAM API 응답을 정규화한다."""
+    """FAA NOTAM API 응답을 정규화한다. (분류는 _classify_and_save에서)"""
     properties = item.get("properties", item)
     text = properties.get("coreNOTAMData", {}).get("notam", {}).get("text", "")
     classification = properties.get("coreNOTAMData", {}).get("notam", {}).get("classification", "")
@@ -159,9 +219,6 @@ def _parse_notam(item: dict) -> dict:
         "classification": classification,
         "effective_start": properties.get("coreNOTAMData", {}).get("notam", {}).get("effectiveStart", ""),
         "effective_end": properties.get("coreNOTAMData", {}).get("notam", {}).get("effectiveEnd", ""),
-        "keywords": _extract_keywords(text),
-        "category": _categorize_notam(text),
-        "is_critical": _is_critical(text),
     }
 
 
@@ -175,42 +232,27 @@ def _parse_avwx_notam(item: dict) -> dict:
         "classification": item.get("type", ""),
         "effective_start": item.get("startTime", ""),
         "effective_end": item.get("endTime", ""),
-        "keywords": _extract_keywords(text or raw),
-        "category": _categorize_notam(text or raw),
-        "is_critical": _is_critical(text or raw),
     }
 
 
-def _extract_keywords(text: str) -> list[str]:
-    """NOTAM 텍스트에서 키워드를 추출한다."""
-    text_upper = text.upper()
-    found = []
-    for kw in CRITICAL_KEYWORDS:
-        if re.search(rf"\b{kw}\b", text_upper):
-            found.append(kw)
-    return found
-
-
-def _categorize_notam(text: str) -> str:
-    """NOTAM의 카테고리를 판정한다."""
-    text_upper = text.upper()
-    for category, keywords in KEYWORD_CATEGORIES.items():
-        for kw in keywords:
-            if re.search(rf"\b{kw}\b", text_upper):
-                return category
-    return "other"
-
+def classify_notam(text: str) -> dict:
+    """NOTAM 텍스트의 키워드/카테고리/중요 여부를 한 번에 판정한다.
 
-def _is_critical(text: str) -> bool:
-    """NOTAM이 중요(RWY/TWY 폐쇄 등)인지 판정한다."""
+    keywords: CRITICAL_KEYWORDS 중 포함된 단어 (정의 순서)
+    category: KEYWORD_CATEGORIES 순서상 첫 번째로 매칭된 카테고리 (없으면 "other")
+    is_critical: 활주로/유도로 폐쇄 또는 ILS/접근 불가
+    """
     text_upper = text.upper()
-    # 활주로/유도로 폐쇄
-    if re.search(r"\b(RWY|RY|RUNWAY|TWY|TAXIWAY).*\b(CLSD|CLOSED)\b", text_upper):
-        return True
-    # ILS/접근 불가
-    if re.search(r"\b(ILS|LOC|GS|APCH).*\b(CLSD|CLOSED|U/S|UNSERVICEABLE|OTS|OUT OF SERVICE)\b", text_upper):
-        return True
-    return False
+    found = set(_KEYWORD_RE.findall(text_upper))
+    category = next(
+        (c for c, kws in KEYWORD_CATEGORIES.items() if not found.isdisjoint(kws)),
+        "other",
+    )
+    return {
+        "keywords": [kw for kw in CRITICAL_KEYWORDS if kw in found],
+        "category": category,
+        "is_critical": bool(_CLOSURE_RE.search(text_upper) or _APPROACH_OUT_RE.search(text_upper)),
+    }
 
 
 def _sort_notams(notams: list[dict]) -> list[dict]:
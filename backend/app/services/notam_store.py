@@ -0,0 +1,157 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/notam_store.py
+
+"""
+NOTAM 영구 저장소 (SQLite)
+
+공항별 NOTAM을 NOTAM id(없으면 원문 hash) 기준으로 로컬 파일에 보관하여
+워커 재시작/서버리스 cold start 후에도 upstream 재조회 없이 응답할 수 있게 한다.
+- 분류 결과(keywords/category/is_critical)와 원문 hash를 함께 저장하여 바뀐 NOTAM만 재분류
+- effective_end가 지난 NOTAM은 저장 시 자동 삭제
+- 공항별 마지막 조회 시각/provider 기록
+NOTAM_STORE_PATH를 설정하지 않으면 저장소를 쓰지 않는다. (임시 디렉터리는 cold start 때 비워지므로
+영구 저장소가 될 수 없다 — 서버리스라면 영구 볼륨 경로를 지정한다)
+모든 함수는 블로킹이므로 이벤트 루프에서는 asyncio.to_thread로 호출한다.
+저장소 오류는 로그만 남기고 NOTAM 조회 자체는 막지 않는다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+NOTAM_STORE_PATH = os.getenv("NOTAM_STORE_PATH", "")  # 빈 값이면 저장소 비활성
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notams (
+    airport TEXT NOT NULL,
+    id TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    effective_end REAL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (airport, id)
+);
+CREATE INDEX IF NOT EXISTS idx_notams_effective_end ON notams(effective_end);
+CREATE TABLE IF NOT EXISTS airport_fetches (
+    airport TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    source TEXT,
+    notam_count INTEGER NOT NULL
+);
+"""
+
+_initialized = False
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(NOTAM_STORE_PATH, timeout=5)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def notam_key(notam: dict) -> str:
+    """저장 키. provider id가 없으면 원문 hash로 대신한다 (빠뜨리면 cold start 후 목록 일부만 남는다)."""
+    return notam.get("id") or f"text:{text_hash(notam.get('text', ''))}"
+
+
+def _parse_end(value: Any) -> Optional[float]:
+    """effective_end → epoch. PERM/알 수 없는 형식이면 None (만료 삭제 대상 아님)."""
+    if isinstance(value, dict):  # AVWX Timestamp {"repr", "dt"}
+        value = value.get("dt")
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def load(icao: str) -> Optional[tuple[list[dict], float]]:
+    """저장된 (만료되지 않은) NOTAM 목록과 마지막 조회 시각. 조회 기록이 없으면 None."""
+    if not NOTAM_STORE_PATH:
+        return None
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "SELECT fetched_at FROM airport_fetches WHERE airport = ?", (icao,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = conn.execute(
+                "SELECT data FROM notams WHERE airport = ? AND (effective_end IS NULL OR effective_end > ?)",
+                (icao, time.time()),
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("NOTAM store read failed for %s: %s", icao, e)
+        return None
+    return [json.loads(r[0]) for r in rows], row[0]
+
+
+def known_classifications(icao: str) -> dict[str, tuple[str, dict]]:
+    """공항의 저장된 NOTAM 키(notam_key) → (원문 hash, 저장된 NOTAM)."""
+    if not NOTAM_STORE_PATH:
+        return {}
+    try:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, text_hash, data FROM notams WHERE airport = ?", (icao,)
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("NOTAM store read failed for %s: %s", icao, e)
+        return {}
+    return {r[0]: (r[1], json.loads(r[2])) for r in rows}
+
+
+def save(icao: str, notams: list[dict], source: str) -> None:
+    """공항의 NOTAM 목록을 저장한다. 목록에서 빠진 NOTAM과 만료된 NOTAM은 삭제한다."""
+    if not NOTAM_STORE_PATH:
+        return
+    now = time.time()
+    rows = [
+        (icao, notam_key(n), text_hash(n.get("text", "")), _parse_end(n.get("effective_end")), json.dumps(n))
+        for n in notams
+    ]
+    try:
+        conn = _connect()
+        try:
+            with conn:
+                ids = [r[1] for r in rows]
+                conn.execute(
+                    f"DELETE FROM notams WHERE airport = ? AND id NOT IN ({','.join('?' * len(ids))})",
+                    (icao, *ids),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO notams (airport, id, text_hash, effective_end, data) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO airport_fetches (airport, fetched_at, source, notam_count) VALUES (?, ?, ?, ?)",
+                    (icao, now, source, len(notams)),
+                )
+                conn.execute("DELETE FROM notams WHERE effective_end IS NOT NULL AND effective_end <= ?", (now,))
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning("NOTAM store write failed for %s: %s", icao, e)
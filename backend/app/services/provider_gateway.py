@@ -0,0 +1,227 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/provider_gateway.py
+
+"""
+flight tracker provider 게이트웨이 (rate limit + circuit breaker)
+
+provider(OpenSky/FlightLabs/AviationStack)별로
+- token bucket: 요금제 quota("요청 수/기간")에 맞춰 토큰을 채우고, 토큰이 없으면 호출하지 않는다
+- circuit breaker: 연속 실패(네트워크 오류/timeout/429/5xx/401/403/오류 본문) 시 cooldown 동안 호출을 건너뛰고,
+  cooldown 후 1건만 시험 호출(half-open)하여 성공하면 복구한다. 연속으로 열리면 cooldown을 2배씩 늘린다.
+호출하지 않거나 실패한 경우 ProviderUnavailable을 던지므로, 호출자는 "데이터 없음"과 구분할 수 있다.
+상태는 워커 프로세스별 인메모리다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+import httpx
+
+from app.services.http_client import get_client
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = 3  # 연속 실패 횟수 → circuit open
+BASE_COOLDOWN = 30.0  # 초
+MAX_COOLDOWN = 900.0  # 초
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "month": 30 * 86400}
+
+# provider별 기본 quota와 burst (quota는 {PROVIDER}_RATE_LIMIT 환경 변수로 덮어쓴다)
+_PROVIDERS: dict[str, dict] = {
+    "opensky":       {"quota": "4000/day", "burst": 20},
+    "flightlabs":    {"quota": "1000/month", "burst": 5},
+    "aviationstack": {"quota": "100/month", "burst": 3},  # 무료 요금제
+}
+
+
+class ProviderUnavailable(Exception):
+    """provider를 호출하지 않았거나(rate limit/circuit open) 호출이 실패했다."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider}: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+def _parse_quota(quota: str) -> tuple[float, float]:
+    """"100/month" → (요청 수, 기간 초)."""
+    count, _, period = quota.partition("/")
+    return float(count), float(_PERIODS[period.strip().lower()])
+
+
+class TokenBucket:
+    """capacity까지 쌓이고 초당 rate만큼 채워지는 토큰 버킷."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (cooldown 경과) → half_open → 성공 시 closed / 실패 시 open."""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD):
+        self.failure_threshold = failure_threshold
+        self.failures = 0
+        self.opened = 0  # 연속으로 열린 횟수 (cooldown 배수)
+        self.open_until = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until or self._probing else "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open":
+            self._probing = True  # 시험 호출은 1건만
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """시험 호출을 하지 못했을 때 다음 호출이 시험할 수 있게 한다."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self._probing = False
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold or retry_after:
+            cooldown = min(BASE_COOLDOWN * 2 ** self.opened, MAX_COOLDOWN)
+            if retry_after:
+                cooldown = min(max(cooldown, retry_after), MAX_COOLDOWN)
+            self.opened += 1
+            self.open_until = time.monotonic() + cooldown
+            self._probing = False
+
+    def cooldown_remaining(self) -> float:
+        return max(0.0, self.open_until - time.monotonic())
+
+
+class ProviderGateway:
+    """provider 하나의 HTTP 호출을 token bucket + circuit breaker로 감싼다."""
+
+    def __init__(self, provider: str, quota: str, burst: int):
+        count, period = _parse_quota(quota)
+        self.provider = provider
+        self.quota = quota
+        self.bucket = TokenBucket(rate=count / period, capacity=min(burst, count))
+        self.breaker = CircuitBreaker()
+        self._stats = {"calls": 0, "failures": 0, "rate_limited": 0, "circuit_open": 0}
+        self._last_error: Optional[str] = None
+
+    async def get(
+        self,
+        url: str,
+        params=None,
+        body_error: Optional[Callable[[httpx.Response], Optional[str]]] = None,
+    ) -> httpx.Response:
+        """GET 요청. 응답이 2xx/4xx(401/403/429 제외)면 반환, 그 외에는 ProviderUnavailable.
+
+        body_error는 200 응답 본문의 오류(quota 초과 등)를 찾아 메시지를 반환한다.
+        오류가 있으면 성공이 아니라 실패로 기록한다.
+        """
+        if not self.breaker.allow():
+            self._stats["circuit_open"] += 1
+            raise ProviderUnavailable(self.provider, "circuit_open")
+        if not self.bucket.try_acquire():
+            self._stats["rate_limited"] += 1
+            self.breaker.release_probe()
+            raise ProviderUnavailable(self.provider, "rate_limited")
+
+        self._stats["calls"] += 1
+        try:
+            resp = await get_client(self.provider).get(url, params=params)
+        except httpx.HTTPError as e:
+            self._fail(type(e).__name__)
+            raise ProviderUnavailable(self.provider, "request_failed") from e
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+
+        if resp.status_code == 429 or resp.status_code >= 500 or resp.status_code in (401, 403):
+            retry_after = resp.headers.get("Retry-After")
+            self._fail(f"status {resp.status_code}", float(retry_after) if retry_after and retry_after.isdigit() else None)
+            raise ProviderUnavailable(self.provider, f"status_{resp.status_code}")
+
+        error = body_error(resp) if body_error is not None and resp.status_code == 200 else None
+        if error:
+            self._fail(error)
+            raise ProviderUnavailable(self.provider, "error_response")
+
+        self.breaker.record_success()
+        return resp
+
+    def _fail(self, error: str, retry_after: Optional[float] = None) -> None:
+        was_open = self.breaker.state != "closed"
+        self._stats["failures"] += 1
+        self._last_error = error
+        self.breaker.record_failure(retry_after)
+        if self.breaker.state == "open" and not was_open:
+            logger.warning(
+                "%s circuit opened for %.0fs (%s)", self.provider, self.breaker.cooldown_remaining(), error
+            )
+
+    def health(self) -> dict:
+        return {
+            "provider": self.provider,
+            "state": self.breaker.state,
+            "cooldown_remaining": round(self.breaker.cooldown_remaining(), 1),
+            "consecutive_failures": self.breaker.failures,
+            "quota": self.quota,
+            "tokens": round(self.bucket.tokens, 2),
+            "last_error": self._last_error,
+            **self._stats,
+        }
+
+
+_gateways: dict[str, ProviderGateway] = {}
+
+
+def get_gateway(provider: str) -> ProviderGateway:
+    """provider 게이트웨이를 반환한다. 없으면 quota 설정으로 생성."""
+    gateway = _gateways.get(provider)
+    if gateway is None:
+        conf = _PROVIDERS[provider]
+        quota = os.getenv(f"{provider.upper()}_RATE_LIMIT", conf["quota"])
+        gateway = ProviderGateway(provider, quota, conf["burst"])
+        _gateways[provider] = gateway
+    return gateway
+
+
+def provider_health() -> list[dict]:
+    """모든 provider의 circuit 상태/남은 토큰/호출 통계."""
+    return [get_gateway(p).health() for p in _PROVIDERS]
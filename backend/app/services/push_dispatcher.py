@@ -0,0 +1,226 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/push_dispatcher.py
+
+"""
+Web Push 비동기 발송 디스패처
+
+asyncio 큐 + 고정 크기 워커 풀로 push를 동시에 발송한다.
+- 암호화(aes128gcm)는 pywebpush WebPusher.encode, 전송은 공유 httpx 클라이언트("webpush")
+- VAPID JWT는 push 서비스 origin별로 만료 전까지 재사용
+- 429/5xx/네트워크 오류는 backoff 후 재시도
+- 404/410(구독 만료) 응답 시 users.push_token을 자동으로 비운다
+lifespan 밖(서버리스 등)에서는 큐 없이 호출한 코루틴에서 바로 발송한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Union
+from urllib.parse import urlparse
+
+import httpx
+from pywebpush import Vapid, WebPusher
+
+from app.config import VAPID_PRIVATE_KEY, VAPID_CLAIM_EMAIL
+from app.db.supabase import get_supabase
+from app.services.http_client import get_client
+
+logger = logging.getLogger(__name__)
+
+WORKERS = 32  # 동시 발송 수
+QUEUE_MAX = 5000
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0  # 초 (1, 2, 4 ...)
+MAX_BACKOFF = 30.0
+VAPID_EXPIRY = 12 * 3600  # VAPID JWT 유효 시간 (초)
+VAPID_REFRESH_MARGIN = 600  # 만료 10분 전에 재발급
+
+_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+_vapid: Vapid | None = None
+# origin → (Authorization 헤더, 만료 epoch)
+_vapid_headers: dict[str, tuple[str, float]] = {}
+_stats = {"sent": 0, "failed": 0, "expired": 0, "retries": 0}
+
+
+@dataclass
+class PushResult:
+    ok: bool
+    status: Optional[int] = None
+    expired: bool = False  # 404/410 — 구독 만료 (토큰 삭제됨)
+    error: Optional[str] = None
+
+
+async def send(
+    subscription: Union[str, dict],
+    payload: dict,
+    user_id: Optional[str] = None,
+    ttl: int = 0,
+) -> PushResult:
+    """push 1건을 발송하고 결과를 반환한다. 예외를 던지지 않는다.
+
+    subscription은 users.push_token(JSON 문자열) 또는 subscription dict.
+    user_id를 주면 구독 만료 시 해당 유저의 push_token을 비운다.
+    """
+    if _queue is None or not _workers:
+        return await _deliver(subscription, payload, user_id, ttl)
+
+    fut = asyncio.get_running_loop().create_future()
+    await _queue.put((subscription, payload, user_id, ttl, fut))
+    return await fut
+
+
+async def send_many(messages: list[tuple[Union[str, dict], dict, Optional[str]]]) -> list[PushResult]:
+    """(subscription, payload, user_id) 목록을 동시에 발송한다. 결과는 입력 순서와 같다."""
+    return await asyncio.gather(*(send(sub, payload, user_id) for sub, payload, user_id in messages))
+
+
+def dispatcher_stats() -> dict:
+    return {
+        **_stats,
+        "queued": _queue.qsize() if _queue is not None else 0,
+        "workers": len(_workers),
+        "vapid_origins": len(_vapid_headers),
+    }
+
+
+def _get_vapid() -> Vapid:
+    global _vapid
+    if _vapid is None:
+        _vapid = Vapid.from_string(private_key=VAPID_PRIVATE_KEY)
+    return _vapid
+
+
+def _vapid_header(endpoint: str) -> str:
+    """push 서비스 origin용 VAPID Authorization 헤더. 만료 전까지 캐시된 값을 재사용한다."""
+    url = urlparse(endpoint)
+    origin = f"{url.scheme}://{url.netloc}"
+    now = time.time()
+    cached = _vapid_headers.get(origin)
+    if cached and cached[1] - VAPID_REFRESH_MARGIN > now:
+        return cached[0]
+
+    exp = int(now) + VAPID_EXPIRY
+    header = _get_vapid().sign({"sub": VAPID_CLAIM_EMAIL, "aud": origin, "exp": exp})["Authorization"]
+    _vapid_headers[origin] = (header, exp)
+    return header
+
+
+async def _deliver(
+    subscription: Union[str, dict],
+    payload: dict,
+    user_id: Optional[str],
+    ttl: int,
+) -> PushResult:
+    try:
+        sub = json.loads(subscription) if isinstance(subscription, str) else subscription
+        endpoint = sub["endpoint"]
+        body = WebPusher(sub).encode(json.dumps(payload).encode(), "aes128gcm")["body"]
+        headers = {
+            "Authorization": _vapid_header(endpoint),
+            "Content-Encoding": "aes128gcm",
+            "TTL": str(ttl),
+        }
+    except Exception as e:
+        _stats["failed"] += 1
+        logger.warning("Invalid push subscription for user %s: %s", user_id, e)
+        return PushResult(ok=False, error=str(e))
+
+    result = PushResult(ok=False)
+    for attempt in range(MAX_RETRIES + 1):
+        delay = min(BACKOFF_BASE * 2 ** attempt, MAX_BACKOFF)
+        try:
+            resp = await get_client("webpush").post(endpoint, content=body, headers=headers)
+        except httpx.HTTPError as e:
+            result = PushResult(ok=False, error=str(e) or type(e).__name__)
+        else:
+            if resp.status_code < 300:
+                _stats["sent"] += 1
+                return PushResult(ok=True, status=resp.status_code)
+            if resp.status_code in (404, 410):
+                _stats["expired"] += 1
+                if user_id:
+                    await asyncio.to_thread(_clear_token, user_id, subscription)
+                return PushResult(ok=False, status=resp.status_code, expired=True, error=resp.text)
+            result = PushResult(ok=False, status=resp.status_code, error=resp.text)
+            if resp.status_code != 429 and resp.status_code < 500:
+                break
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                delay = min(float(retry_after), MAX_BACKOFF)
+
+        if attempt < MAX_RETRIES:
+            _stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    _stats["failed"] += 1
+    logger.warning("Push failed for user %s: status=%s %s", user_id, result.status, result.error)
+    return result
+
+
+def _clear_token(user_id: str, subscription: Union[str, dict]) -> None:
+    """만료된 구독을 삭제한다. 그 사이 새 구독으로 바뀌었으면 건드리지 않는다."""
+    query = get_supabase().table("users").update({"push_token": None}).eq("id", user_id)
+    if isinstance(subscription, str):
+        query = query.eq("push_token", subscription)
+    query.execute()
+    logger.info("Cleared expired push subscription: user=%s", user_id)
+
+
+async def _worker() -> None:
+    while True:
+        subscription, payload, user_id, ttl, fut = await _queue.get()
+        try:
+            result = await _deliver(subscription, payload, user_id, ttl)
+            if not fut.done():
+                fut.set_result(result)
+        except asyncio.CancelledError:
+            if not fut.done():
+                fut.cancel()
+            raise
+        except Exception as e:
+            logger.error("Push worker error: %s", e)
+            if not fut.done():
+                fut.set_result(PushResult(ok=False, error=str(e)))
+        finally:
+            _queue.task_done()
+
+
+def start_push_dispatcher() -> None:
+    """push 발송 워커 풀을 시작한다."""
+    global _queue
+    if not VAPID_PRIVATE_KEY:
+        logger.warning("VAPID_PRIVATE_KEY not set — push dispatcher disabled")
+        return
+    if _workers:
+        return
+    loop = asyncio.get_running_loop()
+    _queue = asyncio.Queue(maxsize=QUEUE_MAX)
+    _workers.extend(loop.create_task(_worker()) for _ in range(WORKERS))
+    logger.info("Push dispatcher started (%d workers)", WORKERS)
+
+
+async def stop_push_dispatcher(timeout: float = 10.0) -> None:
+    """대기 중인 push를 최대 timeout초 동안 마저 보내고 워커를 중지한다."""
+    global _queue
+    if not _workers:
+        return
+    try:
+        await asyncio.wait_for(_queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Push dispatcher stopped with %d queued", _queue.qsize())
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    # 큐에 남은 요청의 호출자가 무한 대기하지 않도록 취소
+    while not _queue.empty():
+        *_, fut = _queue.get_nowait()
+        if not fut.done():
+            fut.cancel()
+    _queue = None
+    logger.info("Push dispatcher stopped")
@@ -1,185 +1,252 @@
 # Tag: core
 # Path: /Users/hodduk/Documents/git/mfa/backend/app/services/reminder_scheduler.py
 
+"""
+Report time 리마인더 엔진
+
+앞으로 LOOKAHEAD_SECONDS 안에 발송될 리마인더(fire_at, user, day_summary, minutes)를
+min-heap에 올려두고 가장 이른 항목의 fire_at까지 정확히 sleep 한다.
+스케줄 저장(save_schedule)이나 리마인더 설정/구독 변경 시 invalidate_user()로
+해당 유저의 항목만 다시 읽어 heap을 갱신하고, RESYNC_INTERVAL마다 전체를 재구성한다.
+"""
+
 from __future__ import annotations
 
 import asyncio
-import json
+import heapq
+import itertools
 import logging
-from datetime import datetime, timezone
-
-from pywebpush import webpush, WebPushException
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-from app.config import VAPID_PRIVATE_KEY, VAPID_CLAIM_EMAIL
+from app.config import VAPID_PRIVATE_KEY
 from app.db.supabase import get_supabase
+from app.services import push_dispatcher
 
 logger = logging.getLogger(__name__)
 
 _task: asyncio.Task | None = None
-CHECK_INTERVAL = 60  # 초
-TOLERANCE_SECONDS = 120  # ±2분 허용 오차
+_loop: asyncio.AbstractEventLoop | None = None
+_wake: asyncio.Event | None = None
 
+TOLERANCE_SECONDS = 120  # fire_at이 이만큼 지난 항목까지는 늦게라도 발송
+LOOKAHEAD_SECONDS = 6 * 3600  # heap에 올려둘 범위
+RESYNC_INTERVAL = 1800  # 전체 재구성 주기 (다른 프로세스의 변경 반영)
+RETRY_DELAY = 30  # push 실패 시 재시도 지연 (초)
 
-def _check_and_send() -> None:
-    """리마인더 대상을 조회하고 push 알림을 발송한다. (동기 — to_thread에서 호출)"""
-    db = get_supabase()
-    now = datetime.now(timezone.utc)
+# heap 항목: (fire_at epoch, seq, user_id, generation, row)
+_heap: list[tuple[float, int, str, int, dict]] = []
+_seq = itertools.count()
+# user_id → generation. invalidate 시 증가하여 이전 항목을 무효화 (lazy deletion)
+_generations: dict[str, int] = {}
+_dirty_users: set[str] = set()
 
-    # 1) push_token이 있고 settings가 있는 유저 조회
-    users_result = (
-        db.table("users")
-        .select("id, push_token, settings")
-        .not_.is_("push_token", "null")
-        .execute()
-    )
 
-    if not users_result.data:
+def invalidate_user(user_id: str) -> None:
+    """유저의 스케줄/리마인더 설정이 바뀌었음을 알린다. 어느 스레드에서 호출해도 안전하다."""
+    if _loop is None or _loop.is_closed():
         return
+    try:
+        _loop.call_soon_threadsafe(_mark_dirty, user_id)
+    except RuntimeError:
+        pass  # 루프 종료 중
 
-    for user in users_result.data:
-        settings = user.get("settings") or {}
-        if not settings.get("reminder_enabled"):
-            continue
 
-        reminder_minutes_list = settings.get("reminder_minutes", [])
-        if not reminder_minutes_list:
-            continue
+def _mark_dirty(user_id: str) -> None:
+    _dirty_users.add(user_id)
+    if _wake is not None:
+        _wake.set()
 
-        push_token = user["push_token"]
-        user_id = user["id"]
 
-        # 해당 유저의 pairing ID 목록
-        pairing_ids_result = (
-            db.table("pairings")
-            .select("id")
-            .eq("user_id", user_id)
-            .execute()
-        )
-        user_pairing_ids = {p["id"] for p in (pairing_ids_result.data or [])}
-        if not user_pairing_ids:
+def _load_due(user_id: Optional[str] = None) -> list[dict]:
+    """지금부터 LOOKAHEAD_SECONDS 안에 발송될 미발송 리마인더를 조회한다. (동기 — to_thread에서 호출)"""
+    now = datetime.now(timezone.utc)
+    params = {
+        "p_from": (now - timedelta(seconds=TOLERANCE_SECONDS)).isoformat(),
+        "p_to": (now + timedelta(seconds=LOOKAHEAD_SECONDS)).isoformat(),
+    }
+    if user_id:
+        params["p_user_id"] = user_id
+    return get_supabase().rpc("due_reminders", params).execute().data or []
+
+
+def _push_rows(rows: list[dict]) -> None:
+    for r in rows:
+        fire_at = datetime.fromisoformat(r["fire_at"].replace("Z", "+00:00")).timestamp()
+        user_id = r["user_id"]
+        heapq.heappush(_heap, (fire_at, next(_seq), user_id, _generations.get(user_id, 0), r))
+
+
+async def _reload_all() -> None:
+    global _heap
+    # 조회 중 들어온 invalidate는 다음 루프에서 다시 반영되도록 먼저 비운다
+    _dirty_users.clear()
+    rows = await asyncio.to_thread(_load_due)
+    _heap = []
+    _generations.clear()
+    _push_rows(rows)
+    logger.info("Reminder heap rebuilt: %d upcoming", len(_heap))
+
+
+async def _reload_users() -> None:
+    users = list(_dirty_users)
+    _dirty_users.clear()
+    for user_id in users:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
+        try:
+            rows = await asyncio.to_thread(_load_due, user_id)
+        except Exception as e:
+            logger.error("Reminder reload failed for user %s: %s", user_id, e)
+            _dirty_users.add(user_id)
             continue
-
-        # 2) report_time_utc가 있는 day_summaries 조회 (윈도우 내)
-        max_minutes = max(reminder_minutes_list)
-        # 윈도우: now - tolerance ~ now + max_minutes + tolerance
-        window_start = datetime.fromtimestamp(
-            now.timestamp() - max_minutes * 60 - TOLERANCE_SECONDS, tz=timezone.utc
+        _push_rows(rows)
+
+
+def _pop_due(now: float) -> list[dict]:
+    due: list[dict] = []
+    while _heap and _heap[0][0] <= now:
+        _, _, user_id, gen, row = heapq.heappop(_heap)
+        if gen == _generations.get(user_id, 0):
+            due.append(row)
+    return due
+
+
+def _claim(due: list[dict]) -> dict[tuple, int]:
+    """notification_log 선점 (1 request). 새로 기록된 행만 (user, day, minutes) → log id로 반환한다."""
+    claimed = get_supabase().table("notification_log").upsert(
+        [
+            {
+                "user_id": r["user_id"],
+                "day_summary_id": r["day_summary_id"],
+                "reminder_minutes": r["reminder_minutes"],
+            }
+            for r in due
+        ],
+        on_conflict="user_id,day_summary_id,reminder_minutes",
+        ignore_duplicates=True,
+    ).execute().data or []
+    return {
+        (c["user_id"], c["day_summary_id"], c["reminder_minutes"]): c["id"]
+        for c in claimed
+    }
+
+
+def _release(log_ids: list[int]) -> None:
+    get_supabase().table("notification_log").delete().in_("id", log_ids).execute()
+
+
+async def _send_due(due: list[dict]) -> list[dict]:
+    """due 리마인더를 선점 후 동시에 발송한다. 재시도할 실패 항목을 반환한다."""
+    claimed_ids = await asyncio.to_thread(_claim, due)
+    # 다른 워커가 이미 선점한 항목은 제외
+    rows = [
+        (r, claimed_ids[key])
+        for r in due
+        if (key := (r["user_id"], r["day_summary_id"], r["reminder_minutes"])) in claimed_ids
+    ]
+    if not rows:
+        return []
+
+    results = await push_dispatcher.send_many([
+        (
+            r["push_token"],
+            {
+                "title": f"Report in {_format_lead_time(r['reminder_minutes'])}",
+                "body": f"{r.get('flight_date') or '?'} Report: {r.get('report_time') or '?'}L",
+            },
+            r["user_id"],
         )
-        window_end = datetime.fromtimestamp(
-            now.timestamp() + max_minutes * 60 + TOLERANCE_SECONDS, tz=timezone.utc
-        )
-
-        days_result = (
-            db.table("day_summaries")
-            .select("id, flight_date, report_time, report_time_utc, pairing_id")
-            .not_.is_("report_time_utc", "null")
-            .gte("report_time_utc", window_start.isoformat())
-            .lte("report_time_utc", window_end.isoformat())
-            .execute()
-        )
-
-        if not days_result.data:
-            continue
-
-        for day in days_result.data:
-            if day["pairing_id"] not in user_pairing_ids:
-                continue
-
-            report_utc_str = day["report_time_utc"]
-            # ISO 파싱: "2026-02-10T16:35:00Z" 또는 "2026-02-10T16:35:00+00:00"
-            report_utc = datetime.fromisoformat(report_utc_str.replace("Z", "+00:00"))
-            day_summary_id = day["id"]
-
-            for reminder_minutes in reminder_minutes_list:
-                # 리마인더 발송 시점 = report_time_utc - reminder_minutes
-                target_time = datetime.fromtimestamp(
-                    report_utc.timestamp() - reminder_minutes * 60, tz=timezone.utc
-                )
-                diff = abs((now - target_time).total_seconds())
-
-                if diff > TOLERANCE_SECONDS:
-                    continue
-
-                # 3) notification_log 확인 (중복 방지)
-                log_result = (
-                    db.table("notification_log")
-                    .select("id")
-                    .eq("user_id", user_id)
-                    .eq("day_summary_id", day_summary_id)
-                    .eq("reminder_minutes", reminder_minutes)
-                    .execute()
-                )
-
-                if log_result.data:
-                    continue
-
-                # 4) push 발송
-                report_local = day.get("report_time") or "?"
-                flight_date = day.get("flight_date") or "?"
-
-                if reminder_minutes >= 60:
-                    hours = reminder_minutes // 60
-                    mins = reminder_minutes % 60
-                    time_str = f"{hours}h{mins}m" if mins else f"{hours}h"
-                else:
-                    time_str = f"{reminder_minutes}m"
-
-                try:
-                    subscription_info = json.loads(push_token)
-                    webpush(
-                        subscription_info=subscription_info,
-                        data=json.dumps({
-                            "title": f"Report in {time_str}",
-                            "body": f"{flight_date} Report: {report_local}L",
-                        }),
-                        vapid_private_key=VAPID_PRIVATE_KEY,
-                        vapid_claims={"sub": VAPID_CLAIM_EMAIL},
-                    )
-
-                    # 5) notification_log 기록
-                    db.table("notification_log").insert({
-                        "user_id": user_id,
-                        "day_summary_id": day_summary_id,
-                        "reminder_minutes": reminder_minutes,
-                    }).execute()
-
-                    logger.info(
-                        "Reminder sent: user=%s day=%s minutes=%d",
-                        user_id, day_summary_id, reminder_minutes,
-                    )
-                except WebPushException as e:
-                    logger.warning("Push failed for user %s: %s", user_id, e)
-                except Exception as e:
-                    logger.error("Unexpected error sending reminder: %s", e)
+        for r, _ in rows
+    ])
+
+    failed: list[dict] = []
+    failed_log_ids: list[int] = []
+    for (r, log_id), result in zip(rows, results):
+        if result.ok:
+            logger.info(
+                "Reminder sent: user=%s day=%s minutes=%d",
+                r["user_id"], r["day_summary_id"], r["reminder_minutes"],
+            )
+        elif not result.expired:
+            # 구독 만료는 재시도 의미 없음 — 선점 유지
+            failed.append(r)
+            failed_log_ids.append(log_id)
+
+    # 실패분은 선점 해제
+    if failed_log_ids:
+        await asyncio.to_thread(_release, failed_log_ids)
+    return failed
+
+
+def _schedule_retries(failed: list[dict], now: float) -> None:
+    """허용 오차 안에서 재시도할 수 있는 실패 항목을 RETRY_DELAY 뒤로 다시 올린다."""
+    for r in failed:
+        fire_at = datetime.fromisoformat(r["fire_at"].replace("Z", "+00:00")).timestamp()
+        retry_at = now + RETRY_DELAY
+        if retry_at <= fire_at + TOLERANCE_SECONDS:
+            user_id = r["user_id"]
+            heapq.heappush(_heap, (retry_at, next(_seq), user_id, _generations.get(user_id, 0), r))
+
+
+def _format_lead_time(reminder_minutes: int) -> str:
+    """리마인더 선행 시간 표기 (예: 90 → "1h30m", 30 → "30m")."""
+    if reminder_minutes >= 60:
+        hours = reminder_minutes // 60
+        mins = reminder_minutes % 60
+        return f"{hours}h{mins}m" if mins else f"{hours}h"
+    return f"{reminder_minutes}m"
 
 
 async def _run_loop() -> None:
-    """asyncio 태스크로 실행되는 메인 루프."""
+    """asyncio 태스크로 실행되는 메인 루프. 다음 발송 시각 또는 invalidate 신호까지 sleep 한다."""
+    next_resync = 0.0
     while True:
         try:
-            await asyncio.to_thread(_check_and_send)
+            _wake.clear()
+            if time.time() >= next_resync:
+                await _reload_all()
+                next_resync = time.time() + RESYNC_INTERVAL
+            elif _dirty_users:
+                await _reload_users()
+
+            now = time.time()
+            due = _pop_due(now)
+            if due:
+                failed = await _send_due(due)
+                _schedule_retries(failed, time.time())
+                continue
+
+            deadline = min(_heap[0][0], next_resync) if _heap else next_resync
+            try:
+                await asyncio.wait_for(_wake.wait(), timeout=max(0.0, deadline - time.time()))
+            except asyncio.TimeoutError:
+                pass
         except asyncio.CancelledError:
             break
         except Exception as e:
             logger.error("Scheduler loop error: %s", e)
-        await asyncio.sleep(CHECK_INTERVAL)
+            await asyncio.sleep(RETRY_DELAY)
 
 
 def start_scheduler() -> None:
     """백그라운드 스케줄러를 시작한다."""
-    global _task
+    global _task, _loop, _wake
     if not VAPID_PRIVATE_KEY:
         logger.warning("VAPID_PRIVATE_KEY not set — reminder scheduler disabled")
         return
     if _task is None or _task.done():
-        _task = asyncio.get_running_loop().create_task(_run_loop())
+        _loop = asyncio.get_running_loop()
+        _wake = asyncio.Event()
+        _task = _loop.create_task(_run_loop())
         logger.info("Reminder scheduler started")
 
 
 def stop_scheduler() -> None:
     """백그라운드 스케줄러를 중지한다."""
-    global _task
+    global _task, _loop
     if _task and not _task.done():
         _task.cancel()
         logger.info("Reminder scheduler stopped")
     _task = None
+    _loop = None
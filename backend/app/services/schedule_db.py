@@ -1,7 +1,7 @@
 # Tag: core
 # Path: /Users/hodduk/Documents/git/mfa/backend/app/services/schedule_db.py
 
-from datetime import date
+from datetime import date, datetime, timezone
 from typing import Optional
 
 from app.db.supabase import get_supabase
@@ -13,114 +13,298 @@ from app.models.schemas import (
     Layover,
     ScheduleResponse,
 )
+from app.services.reminder_scheduler import invalidate_user
+
+
+# 비교 대상 컬럼 (자연키 제외)
+_PAIRING_FIELDS = ("summary", "event_type", "end_utc", "total_block", "total_credit", "tafb")
+_DAY_FIELDS = ("report_time", "report_time_utc", "day_block", "day_credit", "duty_time")
+_LAYOVER_FIELDS = ("hotel_name", "hotel_phone", "layover_duration", "release_time")
+_LEG_FIELDS = (
+    "flight_number", "ac_type", "tail_number", "origin", "destination",
+    "depart_local", "arrive_local", "depart_utc", "arrive_utc",
+    "block_time", "credit_time", "is_deadhead",
+)
+# DB 왕복 시 표기가 바뀌는 timestamp 컬럼 (예: "Z" → "+00:00")
+_TIMESTAMP_FIELDS = {"start_utc", "end_utc", "report_time_utc"}
 
 
 def save_schedule(user_id: str, email: str, pairings: list[Pairing]) -> None:
-    """기존 스케줄 삭제 후 새 스케줄을 DB에 저장한다. (배치 insert 최적화)"""
+    """새 스케줄을 기존 DB 데이터와 비교하여 변경된 행만 insert/update/delete 한다.
+
+    자연키(pairing_id + start_utc, flight_date, flight_date + leg_number)로 행을 매칭하므로
+    변경되지 않은 행의 id가 유지되고, 이를 참조하는 로그 테이블도 보존된다.
+    변경 사항이 없으면 조회 1회 외에 쓰기 요청을 보내지 않는다.
+    """
     db = get_supabase()
 
-    # 1) users upsert + 기존 데이터 삭제 (2 requests)
-    db.table("users").upsert({"id": user_id, "email": email}, on_conflict="id").execute()
-    db.table("pairings").delete().eq("user_id", user_id).execute()
+    # 1) 기존 스케줄 조회 (1 request)
+    existing = (
+        db.table("pairings")
+        .select("*, day_summaries(*), layovers(*), flight_legs(*, crew_assignments(*))")
+        .eq("user_id", user_id)
+        .execute()
+    ).data or []
 
-    if not pairings:
-        return
+    # 2) diff 계산
+    diff = _ScheduleDiff()
+    db_pairings = _group_by(existing, lambda r: (r["pairing_id"], _norm("start_utc", r["start_utc"])))
+    new_pairings: list[Pairing] = []
 
-    # 2) pairings 배치 insert (1 request)
-    pairing_inserts = [
-        {
-            "user_id": user_id,
-            "pairing_id": p.pairing_id,
-            "summary": p.summary,
-            "event_type": p.event_type,
-            "start_utc": p.start_utc.isoformat(),
-            "end_utc": p.end_utc.isoformat(),
-            "total_block": p.total_block,
-            "total_credit": p.total_credit,
-            "tafb": p.tafb,
-        }
-        for p in pairings
-    ]
-    pairing_result = db.table("pairings").insert(pairing_inserts).execute()
-    db_pairing_ids = [r["id"] for r in pairing_result.data]
-
-    # 3) day_summaries + layovers 배치 수집 후 insert (최대 2 requests)
-    day_inserts: list[dict] = []
-    layover_inserts: list[dict] = []
-    # leg 데이터도 함께 수집 (crew 정보 별도 보관)
-    leg_inserts: list[dict] = []
-    leg_crews: list[list] = []  # leg_inserts와 동일 인덱스
-
-    for i, p in enumerate(pairings):
-        db_pid = db_pairing_ids[i]
+    for p in pairings:
+        row = _pairing_row(user_id, p)
+        match = _pop_match(db_pairings, (p.pairing_id, _norm("start_utc", p.start_utc)))
+        if match is None:
+            new_pairings.append(p)
+            continue
+        if _changed(_PAIRING_FIELDS, row, match):
+            diff.pairing_updates.append({**row, "id": match["id"]})
+        diff.merge_children(match, p)
+
+    diff.pairing_deletes = [r["id"] for rows in db_pairings.values() for r in rows]
+
+    # 3) 변경분만 반영
+    if new_pairings and not existing:
+        # public.users에 유저가 없으면 pairings FK 위반 → 최초 저장 시에만 upsert
+        db.table("users").upsert({"id": user_id, "email": email}, on_conflict="id").execute()
+    diff.apply(db, user_id, new_pairings)
+    invalidate_user(user_id)
+
+
+class _ScheduleDiff:
+    """save_schedule의 테이블별 insert/update/delete 목록"""
+
+    def __init__(self):
+        self.pairing_updates: list[dict] = []
+        self.pairing_deletes: list[str] = []
+        self.day_inserts: list[dict] = []
+        self.day_updates: list[dict] = []
+        self.day_deletes: list[str] = []
+        self.layover_inserts: list[dict] = []
+        self.layover_updates: list[dict] = []
+        self.layover_deletes: list[str] = []
+        self.leg_inserts: list[dict] = []
+        self.leg_crews: list[list[CrewMember]] = []  # leg_inserts와 동일 인덱스
+        self.leg_updates: list[dict] = []
+        self.leg_deletes: list[str] = []
+        self.crew_inserts: list[dict] = []
+        self.crew_replace_leg_ids: list[str] = []
+
+    def merge_children(self, db_pairing: dict, p: Pairing) -> None:
+        """매칭된 pairing의 하위 행(day/layover/leg/crew)을 비교한다."""
+        db_pid = db_pairing["id"]
+        db_days = _group_by(db_pairing.get("day_summaries", []), lambda r: r["flight_date"])
+        db_layovers = _group_by(db_pairing.get("layovers", []), lambda r: r["flight_date"])
+        db_legs = _group_by(
+            db_pairing.get("flight_legs", []),
+            lambda r: (r["flight_date"], r["leg_number"]),
+        )
+
+        for day in p.days:
+            row = _day_row(db_pid, day)
+            match = _pop_match(db_days, row["flight_date"])
+            if match is None:
+                self.day_inserts.append(row)
+            elif _changed(_DAY_FIELDS, row, match):
+                self.day_updates.append({**row, "id": match["id"]})
+
+            if day.layover:
+                row = _layover_row(db_pid, day.layover)
+                match = _pop_match(db_layovers, row["flight_date"])
+                if match is None:
+                    self.layover_inserts.append(row)
+                elif _changed(_LAYOVER_FIELDS, row, match):
+                    self.layover_updates.append({**row, "id": match["id"]})
+
+            for leg in day.legs:
+                row = _leg_row(db_pid, leg)
+                match = _pop_match(db_legs, (row["flight_date"], row["leg_number"]))
+                if match is None:
+                    self.leg_inserts.append(row)
+                    self.leg_crews.append(leg.crew)
+                    continue
+                if _changed(_LEG_FIELDS, row, match):
+                    self.leg_updates.append({**row, "id": match["id"]})
+                new_crew = _crew_rows(match["id"], leg.crew)
+                if _crew_key(new_crew) != _crew_key(match.get("crew_assignments", [])):
+                    self.crew_replace_leg_ids.append(match["id"])
+                    self.crew_inserts.extend(new_crew)
+
+        self.day_deletes.extend(r["id"] for rows in db_days.values() for r in rows)
+        self.layover_deletes.extend(r["id"] for rows in db_layovers.values() for r in rows)
+        self.leg_deletes.extend(r["id"] for rows in db_legs.values() for r in rows)
+
+    def add_new_pairing(self, db_pid: str, p: Pairing) -> None:
+        """새로 insert된 pairing의 하위 행을 모두 insert 대상으로 추가한다."""
         for day in p.days:
-            day_inserts.append({
-                "pairing_id": db_pid,
-                "flight_date": day.flight_date.isoformat(),
-                "report_time": day.report_time,
-                "report_time_utc": day.report_time_utc,
-                "day_block": day.day_block,
-                "day_credit": day.day_credit,
-                "duty_time": day.duty_time,
-            })
+            self.day_inserts.append(_day_row(db_pid, day))
             if day.layover:
-                layover_inserts.append({
-                    "pairing_id": db_pid,
-                    "hotel_name": day.layover.hotel_name,
-                    "hotel_phone": day.layover.hotel_phone,
-                    "layover_duration": day.layover.layover_duration,
-                    "release_time": day.layover.release_time,
-                    "flight_date": day.layover.flight_date.isoformat(),
-                })
+                self.layover_inserts.append(_layover_row(db_pid, day.layover))
             for leg in day.legs:
-                leg_inserts.append({
-                    "pairing_id": db_pid,
-                    "leg_number": leg.leg_number,
-                    "flight_number": leg.flight_number,
-                    "ac_type": leg.ac_type,
-                    "tail_number": leg.tail_number,
-                    "origin": leg.origin,
-                    "destination": leg.destination,
-                    "depart_local": leg.depart_local,
-                    "arrive_local": leg.arrive_local,
-                    "depart_utc": leg.depart_utc,
-                    "arrive_utc": leg.arrive_utc,
-                    "block_time": leg.block_time,
-                    "credit_time": leg.credit_time,
-                    "is_deadhead": leg.is_deadhead,
-                    "flight_date": leg.flight_date.isoformat(),
-                })
-                leg_crews.append(leg.crew)
-
-    if day_inserts:
-        db.table("day_summaries").insert(day_inserts).execute()
-    if layover_inserts:
-        db.table("layovers").insert(layover_inserts).execute()
-
-    # 4) flight_legs 배치 insert (1 request)
-    if leg_inserts:
-        leg_result = db.table("flight_legs").insert(leg_inserts).execute()
-        db_leg_ids = [r["id"] for r in leg_result.data]
-
-        # 5) crew_assignments 배치 insert (1 request)
-        crew_inserts: list[dict] = []
-        for j, crews in enumerate(leg_crews):
-            db_leg_id = db_leg_ids[j]
-            for crew in crews:
-                crew_inserts.append({
-                    "flight_leg_id": db_leg_id,
-                    "position": crew.position,
-                    "employee_id": crew.employee_id,
-                    "name": crew.name,
-                })
-        if crew_inserts:
-            db.table("crew_assignments").insert(crew_inserts).execute()
+                self.leg_inserts.append(_leg_row(db_pid, leg))
+                self.leg_crews.append(leg.crew)
+
+    def apply(self, db, user_id: str, new_pairings: list[Pairing]) -> None:
+        # 삭제 (pairing 삭제는 CASCADE로 하위 테이블 정리)
+        for table, ids in (
+            ("pairings", self.pairing_deletes),
+            ("day_summaries", self.day_deletes),
+            ("layovers", self.layover_deletes),
+            ("flight_legs", self.leg_deletes),
+        ):
+            if ids:
+                db.table(table).delete().in_("id", ids).execute()
+        if self.crew_replace_leg_ids:
+            db.table("crew_assignments").delete().in_("flight_leg_id", self.crew_replace_leg_ids).execute()
+
+        # 수정 (id 기준 배치 upsert)
+        for table, rows in (
+            ("pairings", self.pairing_updates),
+            ("day_summaries", self.day_updates),
+            ("layovers", self.layover_updates),
+            ("flight_legs", self.leg_updates),
+        ):
+            if rows:
+                db.table(table).upsert(rows, on_conflict="id").execute()
+
+        # 신규 pairing insert 후 하위 행 수집
+        if new_pairings:
+            result = db.table("pairings").insert([_pairing_row(user_id, p) for p in new_pairings]).execute()
+            for r, p in zip(result.data, new_pairings):
+                self.add_new_pairing(r["id"], p)
+
+        if self.day_inserts:
+            db.table("day_summaries").insert(self.day_inserts).execute()
+        if self.layover_inserts:
+            db.table("layovers").insert(self.layover_inserts).execute()
+        if self.leg_inserts:
+            leg_result = db.table("flight_legs").insert(self.leg_inserts).execute()
+            for r, crews in zip(leg_result.data, self.leg_crews):
+                self.crew_inserts.extend(_crew_rows(r["id"], crews))
+        if self.crew_inserts:
+            db.table("crew_assignments").insert(self.crew_inserts).execute()
+
+
+def _pairing_row(user_id: str, p: Pairing) -> dict:
+    return {
+        "user_id": user_id,
+        "pairing_id": p.pairing_id,
+        "summary": p.summary,
+        "event_type": p.event_type,
+        "start_utc": p.start_utc.isoformat(),
+        "end_utc": p.end_utc.isoformat(),
+        "total_block": p.total_block,
+        "total_credit": p.total_credit,
+        "tafb": p.tafb,
+    }
+
+
+def _day_row(db_pid: str, day: DayDetail) -> dict:
+    return {
+        "pairing_id": db_pid,
+        "flight_date": day.flight_date.isoformat(),
+        "report_time": day.report_time,
+        "report_time_utc": day.report_time_utc,
+        "day_block": day.day_block,
+        "day_credit": day.day_credit,
+        "duty_time": day.duty_time,
+    }
+
+
+def _layover_row(db_pid: str, layover: Layover) -> dict:
+    return {
+        "pairing_id": db_pid,
+        "hotel_name": layover.hotel_name,
+        "hotel_phone": layover.hotel_phone,
+        "layover_duration": layover.layover_duration,
+        "release_time": layover.release_time,
+        "flight_date": layover.flight_date.isoformat(),
+    }
+
+
+def _leg_row(db_pid: str, leg: FlightLeg) -> dict:
+    return {
+        "pairing_id": db_pid,
+        "leg_number": leg.leg_number,
+        "flight_number": leg.flight_number,
+        "ac_type": leg.ac_type,
+        "tail_number": leg.tail_number,
+        "origin": leg.origin,
+        "destination": leg.destination,
+        "depart_local": leg.depart_local,
+        "arrive_local": leg.arrive_local,
+        "depart_utc": leg.depart_utc,
+        "arrive_utc": leg.arrive_utc,
+        "block_time": leg.block_time,
+        "credit_time": leg.credit_time,
+        "is_deadhead": leg.is_deadhead,
+        "flight_date": leg.flight_date.isoformat(),
+    }
+
+
+def _crew_rows(db_leg_id: str, crews: list[CrewMember]) -> list[dict]:
+    return [
+        {
+            "flight_leg_id": db_leg_id,
+            "position": crew.position,
+            "employee_id": crew.employee_id,
+            "name": crew.name,
+        }
+        for crew in crews
+    ]
+
+
+def _crew_key(rows: list[dict]) -> list[tuple]:
+    return sorted((r["position"], r.get("employee_id") or "", r.get("name") or "") for r in rows)
+
+
+def _norm(field: str, value):
+    """비교용 값 정규화. timestamp 컬럼은 UTC ISO 문자열로 통일한다."""
+    if value is None or field not in _TIMESTAMP_FIELDS:
+        return value
+    try:
+        dt = value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def _changed(fields: tuple[str, ...], new_row: dict, db_row: dict) -> bool:
+    return any(_norm(f, new_row.get(f)) != _norm(f, db_row.get(f)) for f in fields)
+
+
+def _group_by(rows: list[dict], key_fn) -> dict:
+    groups: dict = {}
+    for r in rows:
+        groups.setdefault(key_fn(r), []).append(r)
+    return groups
+
+
+def _pop_match(groups: dict, key) -> Optional[dict]:
+    """자연키가 같은 DB 행을 하나 꺼낸다. (중복 키는 순서대로 매칭)"""
+    rows = groups.get(key)
+    if not rows:
+        return None
+    row = rows.pop(0)
+    if not rows:
+        del groups[key]
+    return row
 
 
 def delete_schedule(user_id: str) -> None:
     """사용자의 스케줄을 DB에서 삭제한다. (CASCADE로 하위 테이블 자동 삭제)"""
     db = get_supabase()
     db.table("pairings").delete().eq("user_id", user_id).execute()
+    # 원본 hash 초기화: 같은 ICS를 다시 올리거나 동기화해도 재저장되도록
+    db.table("users").update({"schedule_hash": None}).eq("id", user_id).execute()
+    db.table("calendar_sources").update({
+        "content_hash": None,
+        "etag": None,
+        "last_modified": None,
+    }).eq("user_id", user_id).execute()
+    invalidate_user(user_id)
 
 
 def get_schedule(user_id: str) -> Optional[ScheduleResponse]:
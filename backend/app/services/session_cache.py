@@ -0,0 +1,162 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/session_cache.py
+
+"""
+세션 유효성 인메모리 캐시 + write-behind heartbeat
+
+(user_id, device_id) → last_activity를 짧은 TTL 동안 프로세스 메모리에 보관하여
+인증 요청마다 user_sessions를 조회하지 않도록 한다.
+heartbeat는 메모리에 모았다가 주기적으로 한 번의 RPC(touch_user_sessions)로 반영한다.
+logout/register 시에는 해당 유저의 캐시를 즉시 무효화한다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.db.supabase import get_supabase
+
+logger = logging.getLogger(__name__)
+
+SESSION_TIMEOUT_MINUTES = 30
+CACHE_TTL = 60  # DB 재확인 주기 (초)
+FLUSH_INTERVAL = 15  # heartbeat flush 주기 (초)
+
+# (user_id, device_id 또는 None) → (last_activity epoch, DB 확인 시각 epoch)
+_sessions: dict[tuple[str, Optional[str]], tuple[float, float]] = {}
+# (user_id, device_id) → 아직 DB에 반영되지 않은 last_activity epoch
+_pending: dict[tuple[str, str], float] = {}
+_task: asyncio.Task | None = None
+
+
+async def is_session_active(user_id: str, device_id: Optional[str]) -> bool:
+    """활성 세션 여부. 캐시가 유효하면 메모리에서, 아니면 DB에서 확인한다.
+
+    device_id가 없으면 해당 유저의 아무 기기 세션이나 활성인지 확인한다.
+    """
+    key = (user_id, device_id)
+    now = time.time()
+    cutoff = now - SESSION_TIMEOUT_MINUTES * 60
+
+    cached = _sessions.get(key)
+    if cached and now - cached[1] < CACHE_TTL:
+        return cached[0] >= cutoff
+
+    last_activity = await asyncio.to_thread(_load_last_activity, user_id, device_id)
+    if last_activity is None:
+        _sessions.pop(key, None)
+        return False
+    last_activity = max(last_activity, _pending_activity(user_id, device_id))
+    _sessions[key] = (last_activity, now)
+    return last_activity >= cutoff
+
+
+async def touch(user_id: str, device_id: str) -> None:
+    """heartbeat 기록. 캐시를 갱신하고 DB 반영은 다음 flush로 미룬다."""
+    now = time.time()
+    _pending[(user_id, device_id)] = now
+    for key in ((user_id, device_id), (user_id, None)):
+        cached = _sessions.get(key)
+        if cached:
+            _sessions[key] = (now, cached[1])
+
+    # flush 루프가 없는 환경(서버리스 등)에서는 즉시 반영
+    if _task is None or _task.done():
+        await flush_heartbeats()
+
+
+def invalidate(user_id: str, device_id: Optional[str] = None) -> None:
+    """캐시 무효화. device_id가 없으면 해당 유저의 모든 세션 캐시를 제거한다.
+
+    이 경우 다른 기기의 아직 flush되지 않은 heartbeat는 남긴다.
+    버리면 그 기기의 last_activity가 실제보다 오래돼 보여 다음 register에서 정리될 수 있다.
+    (flush는 UPDATE만 하므로 정리된 세션이 되살아나지 않는다)
+    """
+    if device_id is None:
+        for key in [k for k in _sessions if k[0] == user_id]:
+            del _sessions[key]
+        return
+    _sessions.pop((user_id, device_id), None)
+    _sessions.pop((user_id, None), None)
+    _pending.pop((user_id, device_id), None)
+
+
+async def flush_heartbeats() -> None:
+    """모아둔 heartbeat를 한 번의 RPC로 user_sessions에 반영한다."""
+    if not _pending:
+        return
+    batch = dict(_pending)
+    _pending.clear()
+    rows = [
+        {
+            "user_id": user_id,
+            "device_id": device_id,
+            "last_activity": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+        }
+        for (user_id, device_id), ts in batch.items()
+    ]
+    try:
+        await asyncio.to_thread(_touch_sessions, rows)
+    except Exception as e:
+        logger.error("Heartbeat flush failed (%d sessions): %s", len(rows), e)
+        # 실패분은 다음 flush에서 재시도 (그 사이 들어온 최신 값 우선)
+        for key, ts in batch.items():
+            if _pending.get(key, 0) < ts:
+                _pending[key] = ts
+
+
+def _pending_activity(user_id: str, device_id: Optional[str]) -> float:
+    if device_id is not None:
+        return _pending.get((user_id, device_id), 0.0)
+    return max((ts for (uid, _), ts in _pending.items() if uid == user_id), default=0.0)
+
+
+def _load_last_activity(user_id: str, device_id: Optional[str]) -> float | None:
+    db = get_supabase()
+    query = db.table("user_sessions") \
+        .select("last_activity") \
+        .eq("user_id", user_id)
+    if device_id:
+        query = query.eq("device_id", device_id)
+    result = query.order("last_activity", desc=True).limit(1).execute()
+    if not result.data or not result.data[0].get("last_activity"):
+        return None
+    return datetime.fromisoformat(result.data[0]["last_activity"]).timestamp()
+
+
+def _touch_sessions(rows: list[dict]) -> None:
+    # UPDATE만 수행하므로 그 사이 logout/정리된 세션은 되살아나지 않는다
+    get_supabase().rpc("touch_user_sessions", {"p_sessions": rows}).execute()
+
+
+async def _run_loop() -> None:
+    while True:
+        try:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await flush_heartbeats()
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error("Session flush loop error: %s", e)
+
+
+def start_session_flusher() -> None:
+    """heartbeat flush 루프를 시작한다."""
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run_loop())
+        logger.info("Session heartbeat flusher started")
+
+
+async def stop_session_flusher() -> None:
+    """flush 루프를 중지하고 남은 heartbeat를 반영한다."""
+    global _task
+    if _task and not _task.done():
+        _task.cancel()
+        logger.info("Session heartbeat flusher stopped")
+    _task = None
+    await flush_heartbeats()
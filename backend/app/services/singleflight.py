@@ -0,0 +1,97 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/singleflight.py
+
+"""
+Single-flight 요청 병합
+
+캐시 미스가 동시에 여러 번 발생해도 같은 키에 대해서는 upstream 호출을 한 번만 수행하고,
+나머지 호출자는 진행 중인 결과(또는 예외)를 함께 기다린다.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+
+class SingleFlight:
+    """키별 in-flight future를 공유하는 asyncio 요청 병합기"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self._timeout = timeout
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """key에 대한 호출이 진행 중이면 그 결과를 기다리고, 없으면 fn()을 실행한다."""
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = self._new_future(key)
+            self._spawn([key], _single(key, fn))
+        # shield: 한 호출자가 취소되어도 공유 호출은 계속 진행
+        return await asyncio.shield(fut)
+
+    async def do_many(
+        self,
+        keys: Iterable[str],
+        fn: Callable[[list[str]], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """여러 키를 한 번에 처리한다. 이미 진행 중인 키는 기다리고, 나머지만 fn(keys)로 요청한다.
+
+        fn은 {key: value}를 반환해야 하며, 결과에 없는 키는 None으로 처리된다.
+        """
+        waiting: dict[str, asyncio.Future] = {}
+        mine: list[str] = []
+        for key in dict.fromkeys(keys):
+            fut = self._inflight.get(key)
+            if fut is None:
+                fut = self._new_future(key)
+                mine.append(key)
+            waiting[key] = fut
+
+        if mine:
+            self._spawn(mine, fn(mine))
+
+        results = await asyncio.gather(*(asyncio.shield(f) for f in waiting.values()))
+        return dict(zip(waiting.keys(), results))
+
+    def _new_future(self, key: str) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        # 기다리는 호출자가 모두 취소된 경우 "exception was never retrieved" 경고 방지
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        return fut
+
+    def _spawn(self, keys: list[str], coro: Awaitable[dict[str, Any]]) -> None:
+        # 태스크 참조를 보관하여 실행 중 GC되지 않도록 한다
+        task = asyncio.get_running_loop().create_task(self._run(keys, coro))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, keys: list[str], coro: Awaitable[dict[str, Any]]) -> None:
+        futures = [self._inflight[k] for k in keys]
+        try:
+            if self._timeout is not None:
+                values = await asyncio.wait_for(coro, self._timeout)
+            else:
+                values = await coro
+        except asyncio.CancelledError:
+            for fut in futures:
+                fut.cancel()
+            raise
+        except Exception as e:
+            for fut in futures:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            for key, fut in zip(keys, futures):
+                if not fut.done():
+                    fut.set_result(values.get(key))
+        finally:
+            for key, fut in zip(keys, futures):
+                if self._inflight.get(key) is fut:
+                    del self._inflight[key]
+
+
+async def _single(key: str, fn: Callable[[], Awaitable[Any]]) -> dict[str, Any]:
+    return {key: await fn()}
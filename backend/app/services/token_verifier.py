@@ -0,0 +1,97 @@
+# Tag: core
+# Path: /Users/hodduk/Documents/git/mfa/backend/app/services/token_verifier.py
+
+"""
+Supabase access token 로컬 검증
+
+HS256 토큰은 프로젝트 JWT secret(SUPABASE_JWT_SECRET)으로,
+비대칭(ES256/RS256) 토큰은 캐시된 JWKS 공개키로 서명/만료/audience를 검증한다.
+로컬 검증이 불가능한 경우(secret 미설정, 알 수 없는 kid 등)에는 None을 반환하여
+호출자가 Supabase Auth 원격 조회로 fallback 하도록 한다.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Optional
+
+import jwt
+
+from app.config import SUPABASE_JWT_SECRET, SUPABASE_URL
+from app.services.http_client import get_client
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+_AUDIENCE = "authenticated"
+_ASYMMETRIC_ALGS = {"ES256", "RS256"}
+
+# JWKS 캐시 (kid → 공개키)
+_JWKS_TTL = 600  # 10분
+_JWKS_MIN_REFETCH = 60  # 알 수 없는 kid로 인한 재조회 최소 간격 (초)
+_jwks: dict[str, Any] = {}
+_jwks_fetched_at = 0.0
+_inflight = SingleFlight(timeout=10)
+
+
+async def verify_access_token(token: str) -> Optional[dict]:
+    """토큰을 로컬에서 검증하고 claims를 반환한다.
+
+    서명/만료/audience가 잘못된 토큰은 jwt.PyJWTError를 발생시키고,
+    로컬에서 판단할 수 없으면 None을 반환한다.
+    """
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+
+    if alg == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            return None
+        key: Any = SUPABASE_JWT_SECRET
+    elif alg in _ASYMMETRIC_ALGS:
+        key = await _get_signing_key(header.get("kid"))
+        if key is None:
+            return None
+    else:
+        return None
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=_AUDIENCE,
+        options={"require": ["exp", "sub"]},
+    )
+
+
+async def _get_signing_key(kid: Optional[str]) -> Any | None:
+    """kid에 해당하는 JWKS 공개키를 반환한다. 캐시가 만료되었거나 kid가 없으면 재조회."""
+    now = time.time()
+    expired = now - _jwks_fetched_at > _JWKS_TTL
+    unknown = kid not in _jwks and now - _jwks_fetched_at > _JWKS_MIN_REFETCH
+    if expired or unknown:
+        try:
+            await _inflight.do("jwks", _refresh_jwks)
+        except Exception as e:
+            logger.warning("Failed to fetch JWKS: %s", e)
+    return _jwks.get(kid)
+
+
+async def _refresh_jwks() -> None:
+    global _jwks, _jwks_fetched_at
+    if not SUPABASE_URL:
+        return
+    resp = await get_client("supabase").get(f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+    resp.raise_for_status()
+
+    keys: dict[str, Any] = {}
+    for jwk in resp.json().get("keys", []):
+        kid = jwk.get("kid")
+        if not kid:
+            continue
+        try:
+            keys[kid] = jwt.PyJWK(jwk).key
+        except jwt.PyJWTError as e:
+            logger.warning("Skipping unsupported JWK %s: %s", kid, e)
+    _jwks = keys
+    _jwks_fetched_at = time.time()
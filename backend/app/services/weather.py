@@ -3,137 +3,242 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import time
 from datetime import datetime, timezone
 from typing import Any
 
-import httpx
-
 from app.services.airport import iata_to_icao
+from app.services.airsigmet_index import AirsigmetIndex
+from app.services.cache import CacheEntry, get_cache
+from app.services.http_client import get_client
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 AWC_BASE = "https://aviationweather.gov/api/data"
-_USER_AGENT = "MFA-MyFlightAssistant/0.1"
 
-# 간단한 인메모리 캐시 (TTL 5분)
-_cache: dict[str, tuple[float, Any]] = {}
+# 인메모리 캐시 (TTL 5분) — 제품별 namespace
 _CACHE_TTL = 300  # 5분
+# fresh 기간 이후 stale로 응답하며 백그라운드 갱신하는 기간
+_STALE_TTL = 1800  # 30분
+_caches = {
+    "metar": get_cache("metar", ttl=_CACHE_TTL, max_entries=2000, stale_ttl=_STALE_TTL),
+    "taf": get_cache("taf", ttl=_CACHE_TTL, max_entries=2000, stale_ttl=_STALE_TTL),
+    # 전국 피드 전체를 파싱해 담은 공유 스냅샷(공간 인덱스) 1개 — 경로/박스 조회는 메모리 내 필터
+    "airsigmet": get_cache("airsigmet", ttl=_CACHE_TTL, max_entries=1, stale_ttl=_STALE_TTL),
+}
+
+_AIRSIGMET_KEY = "airsigmet:snapshot"
+# 경로 SIGMET/AIRMET 조회 시 항로 양옆 폭 (NM)
+ROUTE_CORRIDOR_NM = 50.0
 
 
 def _get_cached(key: str) -> Any | None:
-    if key in _cache:
-        ts, data = _cache[key]
-        if time.time() - ts < _CACHE_TTL:
-            return data
-        del _cache[key]
-    return None
+    return _caches[key.split(":", 1)[0]].get(key)
 
 
-def _set_cache(key: str, data: Any) -> None:
-    _cache[key] = (time.time(), data)
+def _get_cached_entry(key: str) -> CacheEntry | None:
+    return _caches[key.split(":", 1)[0]].get_entry(key)
 
 
-async def fetch_metar(station: str, hours: int = 2) -> dict | None:
-    """METAR 데이터를 조회한다. station은 IATA 또는 ICAO 코드."""
-    icao = _resolve_icao(station)
-    if not icao:
-        return None
+def _set_cache(key: str, data: Any) -> None:
+    _caches[key.split(":", 1)[0]].set(key, data)
 
-    cache_key = f"metar:{icao}"
-    cached = _get_cached(cache_key)
-    if cached is not None:
-        return cached
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(
-            f"{AWC_BASE}/metar",
-            params={"ids": icao, "format": "json", "hours": hours},
-            headers={"User-Agent": _USER_AGENT},
-        )
+# 동시 캐시 미스 병합 (키별 upstream 호출 1회)
+_inflight = SingleFlight(timeout=20)
+# stale 응답 후 실행 중인 백그라운드 갱신 태스크
+_refresh_tasks: set[asyncio.Task] = set()
 
-    if resp.status_code == 204:
-        return None
-    if resp.status_code != 200:
-        return None
+# AWC ids 파라미터 한 번에 넣을 최대 공항 수
+_BATCH_SIZE = 50
 
-    data = resp.json()
-    if not data:
-        return None
 
-    # 최신 METAR 가져오기
-    latest = data[0] if isinstance(data, list) else data
-    result = _parse_metar(latest)
-    _set_cache(cache_key, result)
-    return result
+async def fetch_metar(station: str, hours: int = 2) -> dict | None:
+    """METAR 데이터를 조회한다. station은 IATA 또는 ICAO 코드."""
+    results = await fetch_metars([station], hours=hours)
+    return results.get(station)
 
 
 async def fetch_taf(station: str) -> dict | None:
     """TAF 데이터를 조회한다."""
-    icao = _resolve_icao(station)
-    if not icao:
-        return None
+    results = await fetch_tafs([station])
+    return results.get(station)
 
-    cache_key = f"taf:{icao}"
-    cached = _get_cached(cache_key)
-    if cached is not None:
-        return cached
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(
-            f"{AWC_BASE}/taf",
-            params={"ids": icao, "format": "json"},
-            headers={"User-Agent": _USER_AGENT},
-        )
+async def fetch_metars(stations: list[str], hours: int = 2) -> dict[str, dict | None]:
+    """여러 공항의 METAR를 한 번에 조회한다. {station: METAR | None}을 반환한다."""
+    return await _fetch_batch("metar", stations, {"hours": hours}, _parse_metar, "obsTime")
 
-    if resp.status_code == 204:
-        return None
-    if resp.status_code != 200:
-        return None
 
-    data = resp.json()
-    if not data:
-        return None
+async def fetch_tafs(stations: list[str]) -> dict[str, dict | None]:
+    """여러 공항의 TAF를 한 번에 조회한다. {station: TAF | None}을 반환한다."""
+    return await _fetch_batch("taf", stations, {}, _parse_taf, "issueTime")
 
-    latest = data[0] if isinstance(data, list) else data
-    result = _parse_taf(latest)
-    _set_cache(cache_key, result)
-    return result
 
+async def _fetch_batch(
+    product: str,
+    stations: list[str],
+    params: dict,
+    parser,
+    order_field: str,
+) -> dict[str, dict | None]:
+    """캐시 히트는 바로 반환하고, 미스만 모아 AWC에 ids 목록으로 요청한다.
 
-async def fetch_airsigmet(
-    min_lat: float = 24.0,
-    max_lat: float = 50.0,
-    min_lon: float = -125.0,
-    max_lon: float = -66.0,
-) -> list[dict]:
-    """SIGMET/AIRMET 데이터를 조회하고 바운딩 박스로 필터링한다."""
-    cache_key = f"airsigmet:{min_lat}:{max_lat}:{min_lon}:{max_lon}"
-    cached = _get_cached(cache_key)
-    if cached is not None:
-        return cached
-
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(
-            f"{AWC_BASE}/airsigmet",
-            params={"format": "json"},
-            headers={"User-Agent": _USER_AGENT},
+    결과는 공항별로 `{product}:{icao}` 키에 캐시한다.
+    stale 항목은 즉시 반환(stale=True)하고 백그라운드에서 갱신한다.
+    """
+    icao_map = {station: _resolve_icao(station) for station in stations}
+
+    found: dict[str, dict] = {}
+    misses: list[str] = []
+    stale_keys: list[str] = []
+    for icao in dict.fromkeys(i for i in icao_map.values() if i):
+        key = f"{product}:{icao}"
+        entry = _get_cached_entry(key)
+        if entry is None:
+            misses.append(icao)
+            continue
+        found[icao] = {**entry.value, "stale": entry.stale}
+        if entry.stale:
+            stale_keys.append(key)
+
+    async def fetch_misses(keys: list[str]) -> dict[str, dict]:
+        icaos = [k.split(":", 1)[1] for k in keys]
+        chunks = [icaos[i:i + _BATCH_SIZE] for i in range(0, len(icaos), _BATCH_SIZE)]
+        responses = await asyncio.gather(
+            *(_fetch_awc_latest(product, chunk, params, order_field) for chunk in chunks)
         )
+        fetched: dict[str, dict] = {}
+        for latest_by_icao in responses:
+            for icao, raw in latest_by_icao.items():
+                key = f"{product}:{icao}"
+                fetched[key] = parser(raw)
+                _set_cache(key, fetched[key])
+        return fetched
+
+    if stale_keys:
+        _refresh_in_background(_inflight.do_many(stale_keys, fetch_misses))
+
+    if misses:
+        # 같은 공항을 이미 요청 중인 호출이 있으면 그 결과를 함께 기다린다
+        fetched = await _inflight.do_many([f"{product}:{icao}" for icao in misses], fetch_misses)
+        for key, result in fetched.items():
+            if result is not None:
+                found[key.split(":", 1)[1]] = {**result, "stale": False}
+
+    return {station: found.get(icao) if icao else None for station, icao in icao_map.items()}
+
+
+def _refresh_in_background(coro) -> None:
+    """stale 항목 갱신을 응답과 분리하여 실행한다. 실패는 로그만 남긴다."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _refresh_tasks.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _refresh_tasks.discard(t)
+        if not t.cancelled() and t.exception() is not None:
+            logger.warning("Background weather refresh failed: %s", t.exception())
+
+    task.add_done_callback(_done)
+
+
+async def _fetch_awc_latest(
+    product: str,
+    icaos: list[str],
+    params: dict,
+    order_field: str,
+) -> dict[str, dict]:
+    """AWC /metar, /taf를 ids 목록으로 호출하고 공항별 최신 항목만 남긴다."""
+    resp = await get_client("awc").get(
+        f"{AWC_BASE}/{product}",
+        params={"ids": ",".join(icaos), "format": "json", **params},
+    )
 
     if resp.status_code != 200:
-        return []
+        return {}
 
     data = resp.json()
+    if not data:
+        return {}
     if not isinstance(data, list):
-        return []
+        data = [data]
 
-    parsed = []
+    latest: dict[str, dict] = {}
     for item in data:
-        coords = item.get("coords", [])
-        if not _is_in_bounds(coords, min_lat, max_lat, min_lon, max_lon):
+        icao = (item.get("icaoId") or "").upper()
+        if not icao:
+            continue
+        prev = latest.get(icao)
+        if prev is None:
+            latest[icao] = item
             continue
-        parsed.append(_parse_airsigmet(item))
+        # 같은 공항이 여러 건이면 order_field 기준 최신 항목 사용
+        item_ts, prev_ts = item.get(order_field), prev.get(order_field)
+        if item_ts is not None and prev_ts is not None and item_ts > prev_ts:
+            latest[icao] = item
+    return latest
+
+
+async def fetch_airsigmet_route(
+    lat1: float,
+    lon1: float,
+    lat2: float,
+    lon2: float,
+    corridor_nm: float = ROUTE_CORRIDOR_NM,
+) -> list[dict]:
+    """두 지점 사이 대권 경로 corridor와 실제로 겹치는 SIGMET/AIRMET을 조회한다."""
+    snapshot = await _get_airsigmet_snapshot()
+    return snapshot.along_route(lat1, lon1, lat2, lon2, corridor_nm)
+
+
+async def fetch_airsigmet_routes(
+    routes: list[tuple[float, float, float, float]],
+    corridor_nm: float = ROUTE_CORRIDOR_NM,
+) -> list[list[dict]]:
+    """여러 구간 (lat1, lon1, lat2, lon2)의 corridor SIGMET/AIRMET을 같은 스냅샷 하나로 조회한다."""
+    snapshot = await _get_airsigmet_snapshot()
+    return [snapshot.along_route(*route, corridor_nm) for route in routes]
+
+
+async def _get_airsigmet_snapshot() -> AirsigmetIndex:
+    """전국 피드 스냅샷. TTL당 upstream 요청 1회 — stale이면 즉시 반환하고 백그라운드에서 다시 만든다."""
+    entry = _get_cached_entry(_AIRSIGMET_KEY)
+    if entry is not None:
+        if entry.stale:
+            _refresh_in_background(_inflight.do(_AIRSIGMET_KEY, _build_airsigmet_snapshot))
+        return entry.value
+    return await _inflight.do(_AIRSIGMET_KEY, _build_airsigmet_snapshot)
+
+
+async def _build_airsigmet_snapshot() -> AirsigmetIndex:
+    """피드를 받아 항목마다 _parse_airsigmet을 한 번씩 적용하고 공간 인덱스를 만든다."""
+    data = await _download_airsigmet()
+    if data is None:
+        return AirsigmetIndex([])
+    snapshot = AirsigmetIndex([_parse_airsigmet(item) for item in data])
+    _set_cache(_AIRSIGMET_KEY, snapshot)
+    return snapshot
+
+
+async def _download_airsigmet() -> list[dict] | None:
+    """AWC 전국 SIGMET/AIRMET 피드 원본. 실패 시 None."""
+    # 전국 피드라 응답이 크므로 timeout을 늘린다
+    resp = await get_client("awc").get(
+        f"{AWC_BASE}/airsigmet",
+        params={"format": "json"},
+        timeout=15,
+    )
 
-    _set_cache(cache_key, parsed)
-    return parsed
+    if resp.status_code != 200:
+        return None
+
+    data = resp.json()
+    if not isinstance(data, list):
+        return None
+    return data
 
 
 _SEVERITY_MAP: dict[int, str] = {
@@ -197,26 +302,6 @@ def _format_altitude(val) -> str:
     return f"{val}ft"
 
 
-def _is_in_bounds(
-    coords: list[dict],
-    min_lat: float,
-    max_lat: float,
-    min_lon: float,
-    max_lon: float,
-) -> bool:
-    """SIGMET/AIRMET 폴리곤이 바운딩 박스와 겹치는지 확인한다."""
-    if not coords:
-        return False
-    for c in coords:
-        lat = c.get("lat")
-        lon = c.get("lon")
-        if lat is None or lon is None:
-            continue
-        if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
-            return True
-    return False
-
-
 def _resolve_icao(station: str) -> str | None:
     """IATA 또는 ICAO 코드를 ICAO로 변환한다."""
     station = station.upper().strip()
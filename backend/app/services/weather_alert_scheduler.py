@@ -4,17 +4,14 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-import time
 from datetime import datetime, timezone
 
-from pywebpush import webpush, WebPushException
-
-from app.config import VAPID_PRIVATE_KEY, VAPID_CLAIM_EMAIL
-from app.db.supabase import get_supabase
+from app.config import VAPID_PRIVATE_KEY
+from app.db.supabase import get_supabase, run_db
+from app.services import push_dispatcher
 from app.services.airport import iata_to_icao
-from app.services.weather import fetch_metar
+from app.services.weather import fetch_metars
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +20,10 @@ CHECK_INTERVAL = 60  # 메인 루프 간격 (초)
 
 # 공항별 마지막 METAR 체크 시각 (in-memory)
 _last_check: dict[str, float] = {}
+# 공항별 마지막 평가 결과: icao → (METAR observation_time, [(condition_type, condition_value)])
+_airport_state: dict[str, tuple[str, list[tuple[str, str]]]] = {}
+# 이미 알림 처리된 조건: (user_id, flight_leg_id, airport) → {condition_type}
+_alerted: dict[tuple[str, str, str], set[str]] = {}
 
 
 def _get_check_interval(minutes_to_departure: float) -> int:
@@ -61,6 +62,17 @@ def _evaluate_conditions(metar: dict) -> list[tuple[str, str]]:
     return conditions
 
 
+def _conditions_for(icao: str, metar: dict) -> list[tuple[str, str]]:
+    """공항의 위험 조건. 같은 관측(observation_time)이면 이전 평가 결과를 재사용한다."""
+    obs_time = metar.get("observation_time") or ""
+    cached = _airport_state.get(icao)
+    if cached and obs_time and cached[0] == obs_time:
+        return cached[1]
+    conditions = _evaluate_conditions(metar)
+    _airport_state[icao] = (obs_time, conditions)
+    return conditions
+
+
 def _format_condition(ctype: str, cvalue: str) -> str:
     """조건 타입을 사람이 읽을 수 있는 설명으로 변환한다."""
     labels = {
@@ -74,75 +86,108 @@ def _format_condition(ctype: str, cvalue: str) -> str:
     return labels.get(ctype, ctype)
 
 
-def _check_and_send() -> None:
-    """공항 기준으로 METAR를 조회하고, 위험 조건 시 해당 유저들에게 push 알림을 발송한다."""
+def _load_enabled_users() -> dict[str, str]:
+    """weather_alerts_enabled + push_token 있는 유저 → push_token. (동기 — DB 스레드 풀에서 호출)"""
     db = get_supabase()
-    now = datetime.now(timezone.utc)
-    now_ts = now.timestamp()
-
-    # 1) weather_alerts_enabled + push_token 있는 유저 조회
     users_result = (
         db.table("users")
         .select("id, push_token, settings")
         .not_.is_("push_token", "null")
         .execute()
     )
-    if not users_result.data:
-        return
-
     enabled_users = {}
-    for u in users_result.data:
+    for u in users_result.data or []:
         settings = u.get("settings") or {}
         if not settings.get("weather_alerts_enabled", True):
             continue
         enabled_users[u["id"]] = u["push_token"]
+    return enabled_users
 
-    if not enabled_users:
-        return
 
-    user_ids = list(enabled_users.keys())
-
-    # 2) 해당 유저들의 3시간 이내 출발 flight_legs 조회
-    window_end = datetime.fromtimestamp(now_ts + 3 * 3600, tz=timezone.utc)
-
-    # pairing_id 목록 조회
+def _load_upcoming_legs(user_ids: list[str], now: datetime, window_end: datetime) -> list[dict]:
+    """유저들의 window 내 출발 flight_legs를 user_id와 함께 반환한다. (동기 — DB 스레드 풀에서 호출)"""
+    db = get_supabase()
     pairings_result = (
         db.table("pairings")
         .select("id, user_id")
         .in_("user_id", user_ids)
         .execute()
     )
-    if not pairings_result.data:
-        return
-
-    pairing_to_user: dict[str, str] = {}
-    pairing_ids: list[str] = []
-    for p in pairings_result.data:
-        pairing_to_user[p["id"]] = p["user_id"]
-        pairing_ids.append(p["id"])
-
-    if not pairing_ids:
-        return
+    pairing_to_user = {p["id"]: p["user_id"] for p in pairings_result.data or []}
+    if not pairing_to_user:
+        return []
 
     legs_result = (
         db.table("flight_legs")
         .select("id, pairing_id, flight_number, origin, destination, depart_utc")
-        .in_("pairing_id", pairing_ids)
+        .in_("pairing_id", list(pairing_to_user))
         .gte("depart_utc", now.isoformat())
         .lte("depart_utc", window_end.isoformat())
         .execute()
     )
-    if not legs_result.data:
+    legs = []
+    for leg in legs_result.data or []:
+        user_id = pairing_to_user.get(leg["pairing_id"])
+        if user_id:
+            legs.append({**leg, "user_id": user_id})
+    return legs
+
+
+def _claim_alerts(rows: list[dict]) -> set[tuple]:
+    """weather_alert_log에 일괄 기록 (ON CONFLICT DO NOTHING). 새로 기록된 알림 키만 반환한다."""
+    inserted = get_supabase().table("weather_alert_log").upsert(
+        rows,
+        on_conflict="user_id,flight_leg_id,airport,condition_type",
+        ignore_duplicates=True,
+    ).execute().data or []
+    return {(r["user_id"], r["flight_leg_id"], r["airport"], r["condition_type"]) for r in inserted}
+
+
+def _cleanup_log(cutoff: datetime) -> None:
+    try:
+        get_supabase().table("weather_alert_log").delete().lt("sent_at", cutoff.isoformat()).execute()
+    except Exception as e:
+        logger.warning("Failed to clean old weather_alert_log: %s", e)
+
+
+async def _check_and_send() -> None:
+    """공항 기준으로 METAR를 조회하고, 위험 조건 시 해당 유저들에게 push 알림을 발송한다.
+
+    DB 조회는 공유 DB 스레드 풀에서, METAR는 AWC 일괄 요청으로, push는 디스패처로 동시에 처리하므로
+    tick 소요 시간은 가장 느린 upstream 호출 하나에 가깝다.
+    """
+    now = datetime.now(timezone.utc)
+    now_ts = now.timestamp()
+    cleanup = asyncio.ensure_future(run_db(_cleanup_log, datetime.fromtimestamp(now_ts - 86400, tz=timezone.utc)))
+
+    try:
+        await _check_airports(now)
+    finally:
+        await cleanup
+        # 오래된 last_check 항목 정리 (1시간 이상 된 것)
+        stale = [k for k, v in _last_check.items() if now_ts - v > 3600]
+        for k in stale:
+            del _last_check[k]
+
+
+async def _check_airports(now: datetime) -> None:
+    now_ts = now.timestamp()
+
+    # 1) weather_alerts_enabled + push_token 있는 유저 조회
+    enabled_users = await run_db(_load_enabled_users)
+    if not enabled_users:
+        return
+
+    # 2) 해당 유저들의 3시간 이내 출발 flight_legs 조회
+    window_end = datetime.fromtimestamp(now_ts + 3 * 3600, tz=timezone.utc)
+    legs = await run_db(_load_upcoming_legs, list(enabled_users), now, window_end)
+    if not legs:
         return
 
     # 3) 공항 기준으로 그룹핑: airport_icao -> [(leg, user_id, minutes_to_dep)]
     airport_legs: dict[str, list[dict]] = {}
 
-    for leg in legs_result.data:
-        user_id = pairing_to_user.get(leg["pairing_id"])
-        if not user_id:
-            continue
-
+    for leg in legs:
         depart_str = leg["depart_utc"]
         depart_utc = datetime.fromisoformat(depart_str.replace("Z", "+00:00"))
         minutes_to_dep = (depart_utc.timestamp() - now_ts) / 60
@@ -159,125 +204,124 @@ def _check_and_send() -> None:
                 else:
                     continue
 
-            if icao not in airport_legs:
-                airport_legs[icao] = []
-            airport_legs[icao].append({
+            airport_legs.setdefault(icao, []).append({
                 "leg": leg,
-                "user_id": user_id,
+                "user_id": leg["user_id"],
                 "minutes_to_dep": minutes_to_dep,
                 "airport_iata": airport_iata,
             })
 
-    # 4) 공항별 체크 간격 판단 + METAR fetch + 위험 조건 판별
-    loop = asyncio.new_event_loop()
-    try:
-        for icao, leg_infos in airport_legs.items():
-            # 해당 공항 관련 leg 중 가장 가까운 출발 시간 기준으로 체크 간격 결정
-            min_minutes = min(info["minutes_to_dep"] for info in leg_infos)
-            interval = _get_check_interval(min_minutes)
-
-            last = _last_check.get(icao, 0)
-            if now_ts - last < interval:
-                continue
+    # 출발했거나 window를 벗어난 leg/공항의 상태 정리
+    active = {(info["user_id"], info["leg"]["id"], icao) for icao, infos in airport_legs.items() for info in infos}
+    for key in [k for k in _alerted if k not in active]:
+        del _alerted[key]
+    for icao in [k for k in _airport_state if k not in airport_legs]:
+        del _airport_state[icao]
+
+    # 4) 공항별 체크 간격 판단 → 체크할 공항만 모아 METAR 일괄 fetch
+    due_airports: list[str] = []
+    for icao, leg_infos in airport_legs.items():
+        # 해당 공항 관련 leg 중 가장 가까운 출발 시간 기준으로 체크 간격 결정
+        min_minutes = min(info["minutes_to_dep"] for info in leg_infos)
+        interval = _get_check_interval(min_minutes)
+
+        last = _last_check.get(icao, 0)
+        if now_ts - last < interval:
+            continue
+        due_airports.append(icao)
 
-            # METAR fetch (동기 컨텍스트에서 비동기 호출)
-            try:
-                metar = loop.run_until_complete(fetch_metar(icao))
-            except Exception as e:
-                logger.warning("Failed to fetch METAR for %s: %s", icao, e)
-                continue
+    if not due_airports:
+        return
+    try:
+        metars = await fetch_metars(due_airports)
+    except Exception as e:
+        logger.warning("Failed to fetch METARs for %s: %s", ",".join(due_airports), e)
+        return
 
-            _last_check[icao] = now_ts
+    # 5) 위험 조건 → 해당 공항의 leg/user 중 아직 알림받지 않은 조건만 후보로 수집
+    candidates: list[dict] = []
+    for icao in due_airports:
+        metar = metars.get(icao)
+        # stale METAR(백그라운드 갱신 중)는 이미 해소된 조건일 수 있으므로 판단하지 않고
+        # 체크 완료로도 기록하지 않아 다음 tick에 갱신된 값으로 다시 확인한다
+        if metar and metar.get("stale"):
+            continue
+        _last_check[icao] = now_ts
+        if not metar:
+            continue
 
-            if not metar:
-                continue
+        conditions = _conditions_for(icao, metar)
+        if not conditions:
+            continue
 
-            conditions = _evaluate_conditions(metar)
-            if not conditions:
+        for info in airport_legs[icao]:
+            if info["user_id"] not in enabled_users:
                 continue
-
-            # 5) 위험 조건 → 해당 공항의 모든 leg/user에 알림
-            for info in leg_infos:
-                leg = info["leg"]
-                user_id = info["user_id"]
-                push_token = enabled_users.get(user_id)
-                if not push_token:
+            done = _alerted.get((info["user_id"], info["leg"]["id"], icao), ())
+            for ctype, cvalue in conditions:
+                if ctype in done:
                     continue
+                candidates.append({"info": info, "airport": icao, "ctype": ctype, "cvalue": cvalue})
 
-                flight_number = leg.get("flight_number", "")
-                origin = leg.get("origin", "")
-                destination = leg.get("destination", "")
-                mins = int(info["minutes_to_dep"])
-                hours = mins // 60
-                remaining_mins = mins % 60
-
-                for ctype, cvalue in conditions:
-                    # 중복 방지: INSERT ON CONFLICT DO NOTHING
-                    try:
-                        insert_result = (
-                            db.table("weather_alert_log")
-                            .insert({
-                                "user_id": user_id,
-                                "flight_leg_id": leg["id"],
-                                "airport": icao,
-                                "condition_type": ctype,
-                                "condition_value": cvalue,
-                            })
-                            .execute()
-                        )
-                    except Exception:
-                        # UNIQUE 충돌 → 이미 알림 전송됨
-                        continue
-
-                    if not insert_result.data:
-                        continue
-
-                    # 푸쉬 발송
-                    desc = _format_condition(ctype, cvalue)
-                    try:
-                        subscription_info = json.loads(push_token)
-                        webpush(
-                            subscription_info=subscription_info,
-                            data=json.dumps({
-                                "title": f"Weather Alert: {icao}",
-                                "body": (
-                                    f"{desc}\n"
-                                    f"Flight {flight_number} {origin}\u2192{destination} "
-                                    f"departs in {hours}h{remaining_mins}m"
-                                ),
-                            }),
-                            vapid_private_key=VAPID_PRIVATE_KEY,
-                            vapid_claims={"sub": VAPID_CLAIM_EMAIL},
-                        )
-                        logger.info(
-                            "Weather alert sent: user=%s airport=%s condition=%s",
-                            user_id, icao, ctype,
-                        )
-                    except WebPushException as e:
-                        logger.warning("Push failed for user %s: %s", user_id, e)
-                    except Exception as e:
-                        logger.error("Unexpected error sending weather alert: %s", e)
-    finally:
-        loop.close()
+    if not candidates:
+        return
 
-    # 6) 24시간 이상 된 로그 정리
-    try:
-        cutoff = datetime.fromtimestamp(now_ts - 86400, tz=timezone.utc)
-        db.table("weather_alert_log").delete().lt("sent_at", cutoff.isoformat()).execute()
-    except Exception as e:
-        logger.warning("Failed to clean old weather_alert_log: %s", e)
+    # 6) 중복 방지: weather_alert_log 일괄 선점 후 새로 기록된 알림만 발송
+    claimed = await run_db(_claim_alerts, [
+        {
+            "user_id": c["info"]["user_id"],
+            "flight_leg_id": c["info"]["leg"]["id"],
+            "airport": c["airport"],
+            "condition_type": c["ctype"],
+            "condition_value": c["cvalue"],
+        }
+        for c in candidates
+    ])
+
+    pending: list[tuple[str, dict, str]] = []  # (push_token, payload, user_id)
+    sent: list[dict] = []
+    for c in candidates:
+        info = c["info"]
+        leg = info["leg"]
+        user_id = info["user_id"]
+        # 선점 실패(이미 DB에 기록됨)도 처리된 것으로 기억하여 다음 tick에 DB를 다시 조회하지 않는다
+        _alerted.setdefault((user_id, leg["id"], c["airport"]), set()).add(c["ctype"])
+        if (user_id, leg["id"], c["airport"], c["ctype"]) not in claimed:
+            continue
 
-    # 오래된 last_check 항목 정리 (1시간 이상 된 것)
-    stale = [k for k, v in _last_check.items() if now_ts - v > 3600]
-    for k in stale:
-        del _last_check[k]
+        mins = int(info["minutes_to_dep"])
+        hours = mins // 60
+        remaining_mins = mins % 60
+        desc = _format_condition(c["ctype"], c["cvalue"])
+        pending.append((
+            enabled_users[user_id],
+            {
+                "title": f"Weather Alert: {c['airport']}",
+                "body": (
+                    f"{desc}\n"
+                    f"Flight {leg.get('flight_number', '')} {leg.get('origin', '')}\u2192{leg.get('destination', '')} "
+                    f"departs in {hours}h{remaining_mins}m"
+                ),
+            },
+            user_id,
+        ))
+        sent.append(c)
+
+    # 7) push 동시 발송
+    results = await push_dispatcher.send_many(pending)
+    for c, result in zip(sent, results):
+        if result.ok:
+            logger.info(
+                "Weather alert sent: user=%s airport=%s condition=%s",
+                c["info"]["user_id"], c["airport"], c["ctype"],
+            )
 
 
 async def _run_loop() -> None:
     """asyncio 태스크로 실행되는 메인 루프."""
     while True:
         try:
-            await asyncio.to_thread(_check_and_send)
+            await _check_and_send()
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -0,0 +1,57 @@
+-- Tag: core
+-- Path: /Users/hodduk/Documents/git/mfa/backend/migrations/004_due_reminders.sql
+-- 발송 시점(report_time_utc - reminder_minutes)이 [p_from, p_to]에 있고
+-- 아직 notification_log에 없는 리마인더를 한 번에 조회 (유저별 N+1 조회 대체)
+
+CREATE OR REPLACE FUNCTION due_reminders(
+  p_from TIMESTAMPTZ,
+  p_to TIMESTAMPTZ,
+  p_user_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+  user_id UUID,
+  push_token TEXT,
+  day_summary_id UUID,
+  flight_date DATE,
+  report_time TEXT,
+  reminder_minutes INT,
+  fire_at TIMESTAMPTZ
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    u.id,
+    u.push_token,
+    d.id,
+    d.flight_date,
+    d.report_time,
+    m.minutes,
+    d.report_time_utc - make_interval(mins => m.minutes) AS fire_at
+  FROM users u
+  CROSS JOIN LATERAL (
+    SELECT value::INT AS minutes
+    FROM jsonb_array_elements_text(
+      CASE WHEN jsonb_typeof(u.settings->'reminder_minutes') = 'array'
+           THEN u.settings->'reminder_minutes'
+           ELSE '[]'::jsonb END
+    )
+  ) m
+  JOIN pairings p ON p.user_id = u.id
+  JOIN day_summaries d ON d.pairing_id = p.id
+  WHERE u.push_token IS NOT NULL
+    AND (u.settings->>'reminder_enabled')::BOOLEAN IS TRUE
+    AND (p_user_id IS NULL OR u.id = p_user_id)
+    AND d.report_time_utc IS NOT NULL
+    AND d.report_time_utc - make_interval(mins => m.minutes) BETWEEN p_from AND p_to
+    AND NOT EXISTS (
+      SELECT 1 FROM notification_log n
+      WHERE n.user_id = u.id
+        AND n.day_summary_id = d.id
+        AND n.reminder_minutes = m.minutes
+    )
+  ORDER BY fire_at;
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_day_summaries_report_time_utc ON day_summaries(report_time_utc);
+CREATE INDEX IF NOT EXISTS idx_day_summaries_pairing_id ON day_summaries(pairing_id);
@@ -0,0 +1,125 @@
+# Tag: bench
+# Path: /Users/hodduk/Documents/git/mfa/backend/scripts/bench_notam_classifier.py
+
+"""NOTAM 분류기 벤치마크: 기존 키워드별 re.search 방식 vs 단일 패스 classify_notam.
+
+실행: cd backend && python scripts/bench_notam_classifier.py [반복 횟수]
+두 구현의 결과가 corpus 전체에서 동일한지 먼저 검증한 뒤 NOTAM당 평균 처리 시간을 비교한다.
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.notam import CRITICAL_KEYWORDS, KEYWORD_CATEGORIES, classify_notam  # noqa: E402
+
+# FAA/ICAO 형식 NOTAM 텍스트 (KJFK/KLAX/KORD 등 허브 공항 실제 NOTAM 문형)
+CORPUS = [
+    "!JFK 02/112 JFK RWY 04L/22R CLSD 2602100400-2602101000",
+    "!JFK 02/098 JFK TWY B BTN TWY P AND TWY Q CLSD 2602090500-2602231000",
+    "!JFK 01/245 JFK NAV ILS RWY 22L GP U/S 2601201200-2603012359EST",
+    "!JFK 02/045 JFK OBST CRANE (ASN 2025-AEA-1234-NRA) 404012N0734701W (0.8NM SE JFK) 167FT (154FT AGL) FLAGGED AND LGTD 2602010000-2604302359",
+    "!JFK 02/130 JFK AD AP RWY 13R/31L ARRESTING SYSTEM EMAS U/S 2602111200-2602281200",
+    "!FDC 6/1234 JFK IAP JOHN F KENNEDY INTL, NEW YORK, NY. RNAV (GPS) RWY 22L, AMDT 2... LPV DA 232/HAT 219 ALL CATS. 2602011200-2605011200EST",
+    "!LAX 02/067 LAX RWY 07R/25L CLSD EXC TAX 2602120700-2602121300",
+    "!LAX 02/071 LAX TWY C BTN TWY C8 AND TWY C10 CLSD 2602110800-2602121200",
+    "!LAX 01/302 LAX NAV ILS RWY 24R LOC/GP OTS 2601300600-2602151400",
+    "!LAX 02/015 LAX SVC FUEL JET A NOT AVBL 2602050000-2602062359",
+    "!LAX 02/088 LAX AIRSPACE TFR SEE FDC 6/5678 ZLA 99.7 2602141500-2602142300",
+    "!ORD 02/210 ORD RWY 10L/28R CLSD 2602130500-2602131100",
+    "!ORD 02/199 ORD TWY M BTN TWY M1 AND TWY M3 CLSD 2602100000-2602262359",
+    "!ORD 02/177 ORD APCH RNAV (RNP) Z RWY 27L NA 2602090000-2602222359",
+    "!ORD 02/150 ORD SVC ATIS 135.4 UNUSABLE 2602071300-2602071900",
+    "!ORD 01/410 ORD OBST TOWER 415701N0875411W (2.1NM NE ORD) 1049FT (312FT AGL) NOT LGTD 2601250000-2602252359",
+    "!ATL 02/045 ATL RWY 08L/26R CLOSED TO ACFT WINGSPAN MORE THAN 171FT 2602010000-2603012359",
+    "!ATL 02/052 ATL TWY E WIP ADJ 2602031200-2602281200",
+    "!ATL 02/060 ATL NAV VOR ATL 116.9 OUT OF SERVICE 2602060800-2602061600",
+    "!DEN 02/033 DEN RWY 16R/34L CLSD SNOW REMOVAL 2602111100-2602111300",
+    "!DEN 02/041 DEN RWY 17R FICON 5/5/5 100 PCT WET OBS AT 2602111200",
+    "!DEN 02/058 DEN SID PIKES ONE DEPARTURE NOT AUTH 2602100000-2602282359",
+    "!SFO 02/090 SFO RWY 28L/10R CLSD 2602120600-2602121400",
+    "!SFO 02/095 SFO NAV ILS RWY 28R GS UNSERVICEABLE 2602110000-2602282359",
+    "!SFO 02/101 SFO TWR HOURS OF OPS/SVC 0600-2300 2602010000-2602282359",
+    "!SEA 02/022 SEA STAR HAWKZ SEVEN ARRIVAL CHANGE TO MEA 2602090000-2602232359",
+    "!SEA 02/030 SEA AD AP WINDCONE RWY 16C U/S 2602060000-2602202359",
+    "!MIA 02/075 MIA TAXIWAY Q CLOSED BTN TAXIWAY R AND TAXIWAY S 2602100400-2602101000",
+    "!MIA 02/080 MIA CTAF 118.3 NOT AVBL 2602101600-2602102200",
+    "!BOS 02/120 BOS NDB LWM 237 U/S 2602050000-2602192359",
+    "!BOS 02/125 BOS RY 04R/22L CLSD 2602120300-2602120900",
+    "!DFW 02/140 DFW AERODROME BIRD ACTIVITY INVOF ALL RWYS 2602010000-2603312359",
+    "!DFW 02/145 DFW GLIDESLOPE RWY 17C OUT OF SERVICE 2602100600-2602101800",
+    "!IAH 02/033 IAH NOTAM CANCELLED 2602110000",
+    "A1234/26 NOTAMN Q) RJJJ/QMRLC/IV/NBO/A/000/999/3546N13947E005 A) RJTT B) 2602101500 C) 2602102100 E) RWY 16L/34R CLSD DUE TO MAINT",
+    "A0567/26 NOTAMN Q) EGTT/QICAS/I/NBO/A/000/999/5129N00028W005 A) EGLL B) 2602090800 C) 2602091600 E) ILS RWY 27L NOT AVBL",
+    "C0890/26 NOTAMN Q) LFFF/QFAXX/IV/NBO/A/000/999/4901N00233E005 A) LFPG B) 2602100000 C) 2602282359 E) AD WIP NEAR TWY R, CRANE MAX HGT 120FT",
+    "B2345/26 NOTAMR B2300/26 Q) EDGG/QSTAH/IV/BO/A/000/999/5002N00834E005 A) EDDF B) 2602110500 C) 2602111100 E) TWR SERVICE HOURS CHANGED",
+]
+
+
+# ─────────── 기존 구현 (키워드마다 re.search, 텍스트 3회 upper) ───────────
+
+def _legacy_extract_keywords(text: str) -> list[str]:
+    text_upper = text.upper()
+    found = []
+    for kw in CRITICAL_KEYWORDS:
+        if re.search(rf"\b{kw}\b", text_upper):
+            found.append(kw)
+    return found
+
+
+def _legacy_categorize(text: str) -> str:
+    text_upper = text.upper()
+    for category, keywords in KEYWORD_CATEGORIES.items():
+        for kw in keywords:
+            if re.search(rf"\b{kw}\b", text_upper):
+                return category
+    return "other"
+
+
+def _legacy_is_critical(text: str) -> bool:
+    text_upper = text.upper()
+    if re.search(r"\b(RWY|RY|RUNWAY|TWY|TAXIWAY).*\b(CLSD|CLOSED)\b", text_upper):
+        return True
+    if re.search(r"\b(ILS|LOC|GS|APCH).*\b(CLSD|CLOSED|U/S|UNSERVICEABLE|OTS|OUT OF SERVICE)\b", text_upper):
+        return True
+    return False
+
+
+def legacy_classify(text: str) -> dict:
+    return {
+        "keywords": _legacy_extract_keywords(text),
+        "category": _legacy_categorize(text),
+        "is_critical": _legacy_is_critical(text),
+    }
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    mismatches = [t for t in CORPUS if legacy_classify(t) != classify_notam(t)]
+    if mismatches:
+        for t in mismatches:
+            print("MISMATCH:", t)
+            print("  legacy:", legacy_classify(t))
+            print("  new:   ", classify_notam(t))
+        sys.exit(1)
+
+    def run(fn):
+        for t in CORPUS:
+            fn(t)
+
+    n = rounds * len(CORPUS)
+    legacy = min(timeit.repeat(lambda: run(legacy_classify), number=rounds, repeat=5))
+    new = min(timeit.repeat(lambda: run(classify_notam), number=rounds, repeat=5))
+
+    print(f"corpus: {len(CORPUS)} NOTAMs x {rounds} rounds")
+    print(f"legacy : {legacy / n * 1e6:8.2f} us/NOTAM")
+    print(f"single : {new / n * 1e6:8.2f} us/NOTAM")
+    print(f"speedup: {legacy / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
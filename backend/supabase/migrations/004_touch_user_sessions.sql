@@ -0,0 +1,15 @@
+-- Tag: core
+-- Path: /Users/hodduk/Documents/git/mfa/backend/supabase/migrations/004_touch_user_sessions.sql
+
+-- heartbeat 일괄 반영: [{user_id, device_id, last_activity}, ...]
+-- 존재하는 세션만 갱신 (logout/정리된 세션은 되살리지 않음)
+CREATE OR REPLACE FUNCTION touch_user_sessions(p_sessions JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  UPDATE user_sessions s
+  SET last_activity = GREATEST(s.last_activity, t.last_activity)
+  FROM jsonb_to_recordset(p_sessions) AS t(user_id UUID, device_id TEXT, last_activity TIMESTAMPTZ)
+  WHERE s.user_id = t.user_id
+    AND s.device_id = t.device_id;
+$$;
@@ -0,0 +1,10 @@
+-- Tag: config
+-- Path: /Users/hodduk/Documents/git/mfa/backend/supabase/migrations/005_calendar_content_hash.sql
+-- ICS 변경 감지: 피드 conditional GET validator + 원본 content hash
+
+ALTER TABLE calendar_sources ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE calendar_sources ADD COLUMN IF NOT EXISTS etag TEXT;
+ALTER TABLE calendar_sources ADD COLUMN IF NOT EXISTS last_modified TEXT;
+
+-- 현재 저장된 스케줄의 원본 ICS hash (업로드/피드 공통)
+ALTER TABLE users ADD COLUMN IF NOT EXISTS schedule_hash TEXT;
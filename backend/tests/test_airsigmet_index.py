@@ -0,0 +1,66 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_airsigmet_index.py
+
+"""AIRSIGMET 경로 corridor 테스트. 실행: cd backend && python -m pytest tests"""
+
+import shapely
+
+from app.services.airsigmet_index import AirsigmetIndex, route_corridor
+
+PHNL = (21.32, -157.92)
+PGUM = (13.48, 144.80)
+
+
+def _box(name: str, lat1: float, lon1: float, lat2: float, lon2: float) -> dict:
+    coords = [
+        {"lat": lat1, "lon": lon1},
+        {"lat": lat1, "lon": lon2},
+        {"lat": lat2, "lon": lon2},
+        {"lat": lat2, "lon": lon1},
+    ]
+    return {"name": name, "coords": coords}
+
+
+def test_trans_pacific_corridor_stays_near_route():
+    corridor = route_corridor(*PHNL, *PGUM, 50)
+    min_lon, min_lat, max_lon, max_lat = corridor.bounds
+    # ±180에서 나뉜 두 조각: 동쪽(괌 쪽)과 서쪽(호놀룰루 쪽)
+    assert corridor.geom_type == "MultiPolygon"
+    assert corridor.area < 200  # 전 경도 띠(약 360 x 10도)가 아님
+    assert 10 < min_lat and max_lat < 25
+    assert min_lon == -180 and max_lon == 180
+
+
+def test_trans_pacific_route_query():
+    index = AirsigmetIndex([
+        _box("caribbean", 19, -82, 21, -78),
+        _box("dateline", 17, 178, 20, -178),  # 날짜변경선을 가로지르는 SIGMET
+        _box("west_of_hawaii", 19, -166, 22, -163),
+        _box("north_pacific", 45, 170, 50, 175),
+    ])
+    hits = [i["name"] for i in index.along_route(*PHNL, *PGUM, 50)]
+    assert hits == ["dateline", "west_of_hawaii"]
+
+
+def test_dateline_sigmet_bbox_query():
+    index = AirsigmetIndex([_box("dateline", 17, 178, 20, -178)])
+    assert index.in_bbox(15, 22, -179.5, -179) != []
+    assert index.in_bbox(15, 22, 0, 10) == []
+
+
+def test_short_leg_corridor():
+    # SEGMENT_M(50nm)보다 짧은 구간도 중간점 없이 corridor를 만든다
+    index = AirsigmetIndex([_box("nearby", 21.4, -158.2, 21.6, -157.9)])
+    for offset in (0.3, 0.8):
+        corridor = route_corridor(21.32, -157.92, 21.32 + offset, -157.92, 20)
+        assert corridor.geom_type == "Polygon"
+        assert corridor.contains(shapely.Point(-157.92, 21.32 + offset / 2))
+        assert [i["name"] for i in index.along_route(21.32, -157.92, 21.32 + offset, -157.92, 20)] == ["nearby"]
+
+
+def test_same_airport_corridor_is_circle():
+    corridor = route_corridor(*PHNL, *PHNL, 20)
+    assert corridor.geom_type == "Polygon"
+    assert corridor.contains(shapely.Point(PHNL[1], PHNL[0]))
+    min_lon, min_lat, max_lon, max_lat = corridor.bounds
+    assert 0.6 < max_lat - min_lat < 0.7  # 반경 20nm ≈ 위도 0.33도
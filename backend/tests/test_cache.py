@@ -0,0 +1,57 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_cache.py
+
+"""인메모리 LRU/TTL 캐시 테스트. 실행: cd backend && python -m pytest tests"""
+
+import time
+
+from app.services.cache import TTLCache
+
+
+def test_ttl_expiry_and_stale_window():
+    cache = TTLCache("test", ttl=10, stale_ttl=100)
+    now = time.time()
+    cache.set("fresh", 1)
+    cache.set("stale", 2, stored_at=now - 50)  # TTL 지남, stale 기간 안
+    cache.set("expired", 3, stored_at=now - 200)  # stale 기간도 지남
+
+    assert cache.get("fresh") == 1
+    # get은 fresh만, get_entry는 stale도 stale=True로 반환
+    assert cache.get("stale") is None
+    entry = cache.get_entry("stale")
+    assert entry is not None and entry.value == 2 and entry.stale
+    assert cache.get_entry("expired") is None
+    assert len(cache) == 2  # 만료 항목은 조회 시 제거
+
+
+def test_purge_expired():
+    cache = TTLCache("test", ttl=10)
+    cache.set("a", 1, stored_at=time.time() - 60)
+    cache.set("b", 2)
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
+    assert cache.stats()["expirations"] == 1
+
+
+def test_lru_eviction_by_entries():
+    cache = TTLCache("test", ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a 사용 → b가 가장 오래 사용되지 않음
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    value = "x" * 1000
+    cache = TTLCache("test", ttl=60, max_entries=100, max_bytes=2500)
+    for key in ("a", "b", "c"):
+        cache.set(key, value)
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= 2500
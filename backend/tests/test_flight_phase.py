@@ -0,0 +1,99 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_flight_phase.py
+
+"""비행 단계 추정 테스트 — OpenSky poller 주기(60초)와 10초 해상도 샘플. 실행: cd backend && python -m pytest tests"""
+
+import math
+
+import pytest
+
+from app.services.flight_phase import HISTORY_CAPACITY, FlightPhaseEstimator, FlightState, Phase
+
+
+def _descent_phases(interval: int) -> set[Phase]:
+    """순항 후 1,500 fpm / 240 kts 로 꾸준히 하강하는 비행을 interval초마다 샘플링."""
+    est = FlightPhaseEstimator(total_distance=500)
+    phases = set()
+    t0 = 1_700_000_000
+    for t in range(0, 1500, interval):
+        descending = t >= 300
+        alt = 35000 if not descending else max(3000, 35000 - 1500 * (t - 300) / 60)
+        state = FlightState(
+            time=t0 + t,
+            lat=33.0,
+            lon=-112.0 + t * 0.001,
+            altitude=alt,
+            velocity=240,
+            vertical_rate=-1500 if descending and alt > 3000 else 0,
+            true_track=90,
+            on_ground=False,
+            dist_to_arr=max(1.0, 110 - 4 * t / 60),
+            dist_from_dep=390 + 4 * t / 60,
+        )
+        est.update(state)
+        phases.add(est.estimate(state))
+    return phases
+
+
+@pytest.mark.parametrize("interval", [10, 60])
+def test_steady_descent_reaches_initial_descent_and_approach(interval):
+    phases = _descent_phases(interval)
+    assert Phase.INITIAL_DESCENT in phases
+    assert Phase.APPROACH in phases
+
+
+def test_holding_detected_at_poller_cadence():
+    est = FlightPhaseEstimator(total_distance=500)
+    t0 = 1_700_000_000
+    phase = None
+    for i in range(8):
+        # 4분에 한 바퀴 도는 레이스트랙 (1분마다 90도 선회)
+        angle = math.radians(90 * i)
+        state = FlightState(
+            time=t0 + 60 * i,
+            lat=33.5 + 0.03 * math.sin(angle),
+            lon=-112.0 + 0.03 * math.cos(angle),
+            altitude=8000,
+            velocity=210,
+            vertical_rate=0,
+            true_track=(90 * i) % 360,
+            on_ground=False,
+            dist_to_arr=30,
+            dist_from_dep=470,
+        )
+        est.update(state)
+        phase = est.estimate(state)
+    assert phase == Phase.HOLDING
+
+
+def _level_state(t: int) -> FlightState:
+    return FlightState(
+        time=t, lat=33.0, lon=-112.0, altitude=35000, velocity=450, vertical_rate=0,
+        true_track=90, on_ground=False, dist_to_arr=300, dist_from_dep=200,
+    )
+
+
+def test_history_keeps_last_ten_minutes_within_capacity():
+    est = FlightPhaseEstimator(total_distance=500)
+    t0 = 1_700_000_000
+    for t in range(0, 1200, 5):  # 5초 간격 → 10분에 120개 (capacity 초과)
+        est.update(_level_state(t0 + t))
+    assert len(est) == HISTORY_CAPACITY
+    for t in range(1200, 2400, 60):  # 60초 간격 → 10분치만 남는다
+        est.update(_level_state(t0 + t))
+    assert len(est) == 10
+
+    # 이전 샘플보다 오래된 보고는 무시
+    est.update(_level_state(t0))
+    assert len(est) == 10
+
+
+def test_estimate_does_not_change_history():
+    est = FlightPhaseEstimator(total_distance=500)
+    t0 = 1_700_000_000
+    for t in range(0, 600, 60):
+        est.update(_level_state(t0 + t))
+    state = _level_state(t0 + 540)
+    before = (len(est), est._start, est._time.tobytes())
+    assert [est.estimate(state) for _ in range(3)] == [Phase.CRUISE] * 3
+    assert (len(est), est._start, est._time.tobytes()) == before
@@ -0,0 +1,43 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_flight_tracker_poller.py
+
+"""OpenSky poller 대상/구간별 estimator 테스트. 실행: cd backend && python -m pytest tests"""
+
+import time
+
+import pytest
+
+from app.services import flight_tracker as ft
+
+
+@pytest.fixture(autouse=True)
+def _reset_poller(monkeypatch):
+    monkeypatch.setattr(ft, "_watched", {})
+    monkeypatch.setattr(ft, "_scheduled_windows", {})
+    monkeypatch.setattr(ft, "_fed_times", {})
+    ft._estimators.clear()
+    yield
+    ft._estimators.clear()
+
+
+def test_scheduled_tail_polled_only_inside_leg_window():
+    now = time.time()
+    ft._scheduled_windows.update({
+        "a00001": [(now - 60, now + 3600)],  # 구간 안
+        "a00002": [(now + 7200, now + 14400)],  # 아직 이른 레그
+        "a00003": [(now - 14400, now - 7200), (now + 600, now + 3600)],  # 지난 레그, 다음 레그 전
+    })
+    assert ft._tracked_icao24s(now) == {"a00001"}
+
+
+def test_watchers_with_different_legs_keep_separate_estimators():
+    ft._watch("a00001", "N1", "KPHX", {"origin": "KLAX"})
+    ft._watch("a00001", "N1", "KSFO", {"origin": "KLAS"})
+    assert len(ft._watched) == 2
+    assert ft._tracked_icao24s(time.time()) == {"a00001"}
+
+    first = ft._get_estimator(ft._estimator_key("a00001", "KLAX", "KPHX"), 320)
+    second = ft._get_estimator(ft._estimator_key("a00001", "KLAS", "KSFO"), 360)
+    # 다른 구간 요청이 번갈아 와도 서로의 estimator를 새로 만들지 않는다
+    assert ft._get_estimator(ft._estimator_key("a00001", "KLAX", "KPHX"), 320) is first
+    assert ft._get_estimator(ft._estimator_key("a00001", "KLAS", "KSFO"), 360) is second
@@ -0,0 +1,51 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_provider_gateway.py
+
+"""provider 게이트웨이 circuit breaker 테스트. 실행: cd backend && python -m pytest tests"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import http_client
+from app.services.provider_gateway import ProviderGateway, ProviderUnavailable
+
+
+@pytest.fixture(autouse=True)
+def _isolated_clients(monkeypatch):
+    """테스트용 mock 클라이언트가 공유 클라이언트 레지스트리에 남지 않도록 격리한다."""
+    monkeypatch.setattr(http_client, "_clients", {})
+    monkeypatch.setattr(http_client, "_client_loops", {})
+
+
+def _error_body(resp: httpx.Response):
+    data = resp.json()
+    return str(data["error"]) if data.get("error") else None
+
+
+def test_circuit_opens_after_error_bodies():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"error": {"code": "usage_limit_reached"}})
+
+    async def run():
+        http_client._clients["aviationstack"] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        http_client._client_loops["aviationstack"] = asyncio.get_running_loop()
+        gateway = ProviderGateway("aviationstack", "1000/day", burst=10)
+
+        reasons = []
+        for _ in range(5):
+            with pytest.raises(ProviderUnavailable) as exc:
+                await gateway.get("https://api.aviationstack.com/v1/flights", body_error=_error_body)
+            reasons.append(exc.value.reason)
+        await http_client._clients["aviationstack"].aclose()
+        return gateway, reasons
+
+    gateway, reasons = asyncio.run(run())
+    assert reasons == ["error_response"] * 3 + ["circuit_open"] * 2
+    assert len(requests) == 3
+    assert gateway.breaker.state == "open"
+    assert gateway.health()["failures"] == 3
@@ -0,0 +1,115 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_push_dispatcher.py
+
+"""Web Push 디스패처 재시도/구독 만료/워커 풀 테스트. 실행: cd backend && python -m pytest tests"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import http_client
+from app.services import push_dispatcher as pd
+
+
+class _Pusher:
+    """암호화 없이 payload를 그대로 body로 쓰는 WebPusher 대역"""
+
+    def __init__(self, subscription):
+        self.subscription = subscription
+
+    def encode(self, data, content_encoding):
+        return {"body": data}
+
+
+@pytest.fixture
+def push_service(monkeypatch):
+    """endpoint 경로별로 정해 둔 응답 상태 코드를 순서대로 돌려주는 mock push 서비스."""
+    plan: dict[str, list[int]] = {}
+    requests: list[str] = []
+    cleared: list[str] = []
+
+    def handler(request):
+        path = request.url.path
+        requests.append(path)
+        statuses = plan.get(path) or [201]
+        return httpx.Response(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+
+    monkeypatch.setattr(http_client, "_clients", {})
+    monkeypatch.setattr(http_client, "_client_loops", {})
+    monkeypatch.setattr(pd, "WebPusher", _Pusher)
+    monkeypatch.setattr(pd, "_vapid_header", lambda endpoint: "vapid t=test")
+    monkeypatch.setattr(pd, "_clear_token", lambda user_id, sub: cleared.append(user_id))
+    monkeypatch.setattr(pd, "BACKOFF_BASE", 0.0)
+    monkeypatch.setattr(pd, "_stats", {"sent": 0, "failed": 0, "expired": 0, "retries": 0})
+    return plan, requests, cleared, handler
+
+
+def _sub(path: str) -> dict:
+    return {"endpoint": f"https://push.example.com{path}", "keys": {}}
+
+
+async def _with_client(handler, coro_fn):
+    loop = asyncio.get_running_loop()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    http_client._clients["webpush"] = client
+    http_client._client_loops["webpush"] = loop
+    try:
+        return await coro_fn()
+    finally:
+        await client.aclose()
+
+
+def test_retries_server_errors_then_succeeds(push_service):
+    plan, requests, _, handler = push_service
+    plan["/a"] = [503, 429, 201]
+
+    result = asyncio.run(_with_client(handler, lambda: pd.send(_sub("/a"), {"title": "t"})))
+    assert result.ok and result.status == 201
+    assert requests == ["/a"] * 3
+    assert pd._stats["retries"] == 2
+
+
+def test_client_error_is_not_retried(push_service):
+    plan, requests, _, handler = push_service
+    plan["/bad"] = [400]
+
+    result = asyncio.run(_with_client(handler, lambda: pd.send(_sub("/bad"), {"title": "t"})))
+    assert not result.ok and result.status == 400 and not result.expired
+    assert requests == ["/bad"]
+
+
+def test_expired_subscription_clears_token(push_service):
+    plan, requests, cleared, handler = push_service
+    plan["/gone"] = [410]
+
+    result = asyncio.run(
+        _with_client(handler, lambda: pd.send(_sub("/gone"), {"title": "t"}, user_id="u1"))
+    )
+    assert result.expired
+    assert cleared == ["u1"]
+    assert requests == ["/gone"]
+
+
+def test_worker_pool_returns_results_in_input_order(push_service, monkeypatch):
+    plan, requests, cleared, handler = push_service
+    plan["/gone"] = [404]
+    monkeypatch.setattr(pd, "VAPID_PRIVATE_KEY", "test-key")
+    monkeypatch.setattr(pd, "WORKERS", 4)
+
+    async def run():
+        pd.start_push_dispatcher()
+        try:
+            return await pd.send_many([
+                (_sub(f"/{p}"), {"title": p}, f"user-{p}")
+                for p in ("a", "gone", "b", "c", "d", "e")
+            ])
+        finally:
+            await pd.stop_push_dispatcher()
+
+    results = asyncio.run(_with_client(handler, run))
+    assert [r.ok for r in results] == [True, False, True, True, True, True]
+    assert results[1].expired
+    assert cleared == ["user-gone"]
+    assert sorted(requests) == ["/a", "/b", "/c", "/d", "/e", "/gone"]
+    assert pd._workers == []
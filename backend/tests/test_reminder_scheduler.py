@@ -0,0 +1,68 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_reminder_scheduler.py
+
+"""리마인더 heap 순서/무효화 테스트. 실행: cd backend && python -m pytest tests"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import reminder_scheduler as rs
+
+T0 = 1_700_000_000
+
+
+@pytest.fixture(autouse=True)
+def _empty_heap(monkeypatch):
+    monkeypatch.setattr(rs, "_heap", [])
+    monkeypatch.setattr(rs, "_generations", {})
+
+
+def _row(user_id: str, fire_at: float, minutes: int = 60) -> dict:
+    return {
+        "user_id": user_id,
+        "day_summary_id": f"day-{user_id}",
+        "reminder_minutes": minutes,
+        "fire_at": datetime.fromtimestamp(fire_at, tz=timezone.utc).isoformat(),
+    }
+
+
+def test_due_reminders_pop_in_fire_order():
+    rs._push_rows([
+        _row("u3", T0 + 300),
+        _row("u1", T0 + 100),
+        _row("u2", T0 + 200, minutes=30),
+        _row("u2", T0 + 200, minutes=90),  # 같은 시각은 넣은 순서대로
+        _row("u4", T0 + 900),
+    ])
+
+    due = rs._pop_due(T0 + 300)
+    assert [(r["user_id"], r["reminder_minutes"]) for r in due] == [
+        ("u1", 60), ("u2", 30), ("u2", 90), ("u3", 60),
+    ]
+    # 아직 시각이 안 된 항목은 남는다
+    assert rs._pop_due(T0 + 300) == []
+    assert [r["user_id"] for r in rs._pop_due(T0 + 900)] == ["u4"]
+
+
+def test_invalidated_user_entries_are_skipped():
+    rs._push_rows([_row("u1", T0 + 100), _row("u2", T0 + 100)])
+    # invalidate → generation 증가 후 새 항목만 유효
+    rs._generations["u1"] = 1
+    rs._push_rows([_row("u1", T0 + 150)])
+
+    due = rs._pop_due(T0 + 200)
+    assert [(r["user_id"], r["fire_at"]) for r in due] == [
+        ("u2", _row("u2", T0 + 100)["fire_at"]),
+        ("u1", _row("u1", T0 + 150)["fire_at"]),
+    ]
+
+
+def test_failed_reminders_retried_within_tolerance():
+    late = _row("u1", T0 - rs.TOLERANCE_SECONDS + rs.RETRY_DELAY)  # 재시도 시각이 허용 오차 끝
+    too_late = _row("u2", T0 - rs.TOLERANCE_SECONDS)
+    rs._schedule_retries([late, too_late], T0)
+
+    assert rs._pop_due(T0 + rs.RETRY_DELAY - 1) == []
+    assert [r["user_id"] for r in rs._pop_due(T0 + rs.RETRY_DELAY)] == ["u1"]
+    assert rs._heap == []
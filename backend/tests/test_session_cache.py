@@ -0,0 +1,89 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_session_cache.py
+
+"""세션 캐시 + write-behind heartbeat 테스트. 실행: cd backend && python -m pytest tests"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.services import session_cache as sc
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """DB 대신 (user_id, device_id) → last_activity epoch 를 읽고 flush된 행을 기록한다."""
+    state = {"rows": {}, "loads": 0, "flushed": []}
+
+    def load(user_id, device_id):
+        state["loads"] += 1
+        values = [ts for (u, d), ts in state["rows"].items() if u == user_id and device_id in (None, d)]
+        return max(values) if values else None
+
+    monkeypatch.setattr(sc, "_sessions", {})
+    monkeypatch.setattr(sc, "_pending", {})
+    monkeypatch.setattr(sc, "_task", None)
+    monkeypatch.setattr(sc, "_load_last_activity", load)
+    monkeypatch.setattr(sc, "_touch_sessions", state["flushed"].append)
+    return state
+
+
+def test_active_session_cached_for_ttl(db):
+    db["rows"][("u1", "d1")] = time.time() - 60
+
+    async def run():
+        return [await sc.is_session_active("u1", "d1") for _ in range(3)]
+
+    assert asyncio.run(run()) == [True] * 3
+    assert db["loads"] == 1
+
+
+def test_expired_or_missing_session_is_inactive(db):
+    db["rows"][("u1", "d1")] = time.time() - (sc.SESSION_TIMEOUT_MINUTES + 1) * 60
+
+    async def run():
+        return await sc.is_session_active("u1", "d1"), await sc.is_session_active("u1", "other")
+
+    assert asyncio.run(run()) == (False, False)
+
+
+def test_touch_refreshes_cache_and_flushes(db):
+    db["rows"][("u1", "d1")] = time.time() - (sc.SESSION_TIMEOUT_MINUTES - 1) * 60
+
+    async def run():
+        await sc.is_session_active("u1", "d1")
+        # flush 루프가 없으면 touch가 바로 반영한다
+        await sc.touch("u1", "d1")
+        return await sc.is_session_active("u1", "d1")
+
+    assert asyncio.run(run()) is True
+    assert len(db["flushed"]) == 1
+    row = db["flushed"][0][0]
+    assert (row["user_id"], row["device_id"]) == ("u1", "d1")
+    assert time.time() - datetime.fromisoformat(row["last_activity"]).timestamp() < 5
+    assert sc._pending == {}
+
+
+def test_register_invalidate_keeps_other_devices_pending(db):
+    sc._sessions[("u1", "d1")] = (time.time(), time.time())
+    sc._sessions[("u1", None)] = (time.time(), time.time())
+    sc._pending[("u1", "d2")] = time.time()
+
+    sc.invalidate("u1")
+    assert sc._sessions == {}
+    assert ("u1", "d2") in sc._pending
+
+    sc.invalidate("u1", "d2")
+    assert sc._pending == {}
+
+
+def test_failed_flush_is_retried(db, monkeypatch):
+    def fail(rows):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(sc, "_touch_sessions", fail)
+    sc._pending[("u1", "d1")] = 100.0
+    asyncio.run(sc.flush_heartbeats())
+    assert sc._pending == {("u1", "d1"): 100.0}
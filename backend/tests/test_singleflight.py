@@ -0,0 +1,106 @@
+# Tag: test
+# Path: /Users/hodduk/Documents/git/mfa/backend/tests/test_singleflight.py
+
+"""Single-flight 요청 병합 테스트. 실행: cd backend && python -m pytest tests"""
+
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"metar": "KJFK"}
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("metar:KJFK", fetch) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"metar": "KJFK"} for r in results)
+
+
+def test_error_propagates_to_all_waiters_and_clears_key():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def ok():
+        calls.append(1)
+        return "ok"
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *(flight.do("k", failing) for _ in range(3)), return_exceptions=True
+        )
+        # 실패 후에는 다음 호출이 새로 실행된다
+        return results, await flight.do("k", ok)
+
+    results, retried = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) and str(r) == "upstream down" for r in results)
+    assert retried == "ok"
+    assert len(calls) == 2
+
+
+def test_timeout_raises_to_callers():
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def run():
+        await SingleFlight(timeout=0.01).do("k", slow)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+
+def test_do_many_requests_only_keys_not_in_flight():
+    batches = []
+
+    async def fetch_one():
+        await asyncio.sleep(0.02)
+        return "a-single"
+
+    async def fetch_many(keys):
+        batches.append(list(keys))
+        await asyncio.sleep(0.01)
+        return {k: f"{k}-batch" for k in keys if k != "c"}
+
+    async def run():
+        flight = SingleFlight()
+        single = asyncio.ensure_future(flight.do("a", fetch_one))
+        await asyncio.sleep(0)
+        many = await flight.do_many(["a", "b", "c", "b"], fetch_many)
+        return await single, many
+
+    single, many = asyncio.run(run())
+    assert batches == [["b", "c"]]
+    assert single == "a-single"
+    # 진행 중이던 a는 그 결과를 공유하고, 결과에 없는 c는 None
+    assert many == {"a": "a-single", "b": "b-batch", "c": None}
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
@@ -7,7 +7,7 @@ import { useState, useEffect, useCallback, useMemo, useRef } from "react";
 import { useSearchParams } from "next/navigation";
 import dynamic from "next/dynamic";
 import { useScheduleStore } from "@/stores/scheduleStore";
-import { fetchFullBriefing, fetchAirSigmet, fetchFar117Status } from "@/lib/api";
+import { fetchFullBriefing, fetchPairingBriefing, fetchFar117Status } from "@/lib/api";
 import { toUtcDate, utcHHMM } from "@/lib/utils";
 import OverviewTab from "@/components/briefing/OverviewTab";
 import type { FlightLeg, Far117Status, Pairing } from "@/types";
@@ -88,6 +88,20 @@ interface BriefingData {
   notam_critical_count: number;
 }
 
+interface PairingLegBriefing {
+  flight_date: string;
+  leg_number: number;
+  origin: string;
+  destination: string;
+  airsigmet: SigmetData | null;
+}
+
+// /api/briefing/pairing 응답: 공항별 브리핑(/full과 같은 형식) + 레그별 경로 SIGMET/AIRMET
+interface PairingBriefingData {
+  stations: Record<string, BriefingData>;
+  legs: PairingLegBriefing[];
+}
+
 const RouteMap = dynamic(
   () => import("@/components/briefing/RouteMap"),
   { ssr: false }
@@ -128,12 +142,17 @@ interface DayInfo {
 
 interface TripInfo {
   pairingId: string;
+  startUtc: string;
   summary: string;
   days: DayInfo[];
 }
 
 type SortedLeg = FlightLeg & { passed: boolean };
 
+function legKey(leg: { flight_date: string; leg_number: number }) {
+  return `${leg.flight_date}-${leg.leg_number}`;
+}
+
 const OVERVIEW_TAB = -1;
 
 export default function BriefingPage() {
@@ -156,6 +175,9 @@ export default function BriefingPage() {
   const [expandedCard, setExpandedCard] = useState<string | null>(null);
   const [now, setNow] = useState(new Date());
   const fetchedRef = useRef(new Set<string>());
+  const fetchedTripsRef = useRef(new Set<string>());
+  const [routeSigmets, setRouteSigmets] = useState<Record<string, SigmetData | null>>({});
+  const [loadingTrip, setLoadingTrip] = useState<string | null>(null);
   const [far117Status, setFar117Status] = useState<Far117Status | null>(null);
   const [far117Loading, setFar117Loading] = useState(false);
 
@@ -194,6 +216,7 @@ export default function BriefingPage() {
       if (dayList.length > 0) {
         tripList.push({
           pairingId: p.pairing_id,
+          startUtc: p.start_utc,
           summary: p.summary,
           days: dayList,
         });
@@ -299,12 +322,50 @@ export default function BriefingPage() {
     });
   }, []);
 
-  // Day 탭 변경 시 자동 로딩
-  useEffect(() => {
-    if (days[activeDayIndex]) {
-      loadBriefings(days[activeDayIndex].airports);
+  // 트립 전체 브리핑 (공항 + 레그별 경로 SIGMET)을 한 번의 요청으로 로딩
+  const loadTrip = useCallback(async (trip: TripInfo) => {
+    const tripKey = `${trip.pairingId}:${trip.startUtc}`;
+    if (fetchedTripsRef.current.has(tripKey)) return;
+    fetchedTripsRef.current.add(tripKey);
+
+    const airports = Array.from(new Set(trip.days.flatMap((d) => d.airports)))
+      .filter((a) => !fetchedRef.current.has(a));
+    airports.forEach((a) => fetchedRef.current.add(a));
+    setLoadingAirports((prev) => new Set([...prev, ...airports]));
+    setLoadingTrip(tripKey);
+
+    try {
+      const data: PairingBriefingData = await fetchPairingBriefing(trip.pairingId, trip.startUtc);
+      setBriefingCache((prev) => ({ ...prev, ...data.stations }));
+      setErrorAirports((prev) => {
+        const updated = { ...prev };
+        Object.keys(data.stations).forEach((s) => delete updated[s]);
+        return updated;
+      });
+      setRouteSigmets((prev) => {
+        const updated = { ...prev };
+        data.legs.forEach((l) => { updated[legKey(l)] = l.airsigmet; });
+        return updated;
+      });
+    } catch {
+      // 페어링 조회 실패 시 공항별 조회로 대체 (경로 SIGMET은 표시하지 않음)
+      airports.forEach((a) => fetchedRef.current.delete(a));
+      await loadBriefings(airports);
+    } finally {
+      setLoadingAirports((prev) => {
+        const updated = new Set(prev);
+        airports.forEach((a) => updated.delete(a));
+        return updated;
+      });
+      setLoadingTrip((prev) => (prev === tripKey ? null : prev));
     }
-  }, [activeDayIndex, days, loadBriefings]);
+  }, [loadBriefings]);
+
+  // 트립 변경 시 자동 로딩 (Day 탭/Overview 공통)
+  useEffect(() => {
+    const trip = trips[activeTripIndex];
+    if (trip) loadTrip(trip);
+  }, [trips, activeTripIndex, loadTrip]);
 
   // Overview 탭: FAR 117 데이터 fetch
   useEffect(() => {
@@ -316,14 +377,6 @@ export default function BriefingPage() {
       .finally(() => setFar117Loading(false));
   }, [activeDayIndex]);
 
-  // Overview 탭: 오늘+내일 날씨 프리로드
-  useEffect(() => {
-    if (activeDayIndex !== OVERVIEW_TAB) return;
-    const preloadDays = trips[activeTripIndex]?.days.slice(0, 2) ?? [];
-    const airports = preloadDays.flatMap((d) => d.airports);
-    if (airports.length > 0) loadBriefings(airports);
-  }, [activeDayIndex, trips, activeTripIndex, loadBriefings]);
-
   // 재시도
   const retryAirport = useCallback(
     (apt: string) => {
@@ -358,6 +411,8 @@ export default function BriefingPage() {
   }, [searchInput]);
 
   const currentDay = days[activeDayIndex];
+  const activeTrip = trips[activeTripIndex];
+  const activeTripKey = activeTrip ? `${activeTrip.pairingId}:${activeTrip.startUtc}` : null;
 
   return (
     <div className="space-y-4">
@@ -523,8 +578,10 @@ export default function BriefingPage() {
         <div className="space-y-5">
           {sortedLegs.map((leg) => (
             <LegBriefingBlock
-              key={`${leg.flight_date}-${leg.leg_number}`}
+              key={legKey(leg)}
               leg={leg}
+              sigmetData={routeSigmets[legKey(leg)] ?? null}
+              sigmetLoading={loadingTrip === activeTripKey}
               briefingCache={briefingCache}
               loadingAirports={loadingAirports}
               errorAirports={errorAirports}
@@ -553,6 +610,8 @@ export default function BriefingPage() {
 
 function LegBriefingBlock({
   leg,
+  sigmetData,
+  sigmetLoading,
   briefingCache,
   loadingAirports,
   errorAirports,
@@ -561,6 +620,8 @@ function LegBriefingBlock({
   onRetry,
 }: {
   leg: SortedLeg;
+  sigmetData: SigmetData | null;
+  sigmetLoading: boolean;
   briefingCache: Record<string, BriefingData>;
   loadingAirports: Set<string>;
   errorAirports: Record<string, string>;
@@ -571,20 +632,6 @@ function LegBriefingBlock({
   const cardKeyOrigin = `${leg.leg_number}-${leg.origin}`;
   const cardKeyDest = `${leg.leg_number}-${leg.destination}`;
 
-  const [sigmetData, setSigmetData] = useState<SigmetData | null>(null);
-  const [sigmetLoading, setSigmetLoading] = useState(false);
-
-  useEffect(() => {
-    let cancelled = false;
-    setSigmetLoading(true);
-    setSigmetData(null);
-    fetchAirSigmet(leg.origin, leg.destination)
-      .then((data) => { if (!cancelled) setSigmetData(data); })
-      .catch(() => { if (!cancelled) setSigmetData(null); })
-      .finally(() => { if (!cancelled) setSigmetLoading(false); });
-    return () => { cancelled = true; };
-  }, [leg.origin, leg.destination]);
-
   return (
     <div className={`space-y-2 ${leg.passed ? "opacity-40" : ""}`}>
       {/* 레그 헤더 */}
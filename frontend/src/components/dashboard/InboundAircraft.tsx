@@ -4,7 +4,7 @@
 "use client";
 
 import { useState, useEffect, useCallback, useMemo } from "react";
-import { fetchFlightTrack } from "@/lib/api";
+import { fetchFlightTrack, subscribeFlightTrack } from "@/lib/api";
 import { getTailTrackingUrl } from "@/lib/utils";
 import type { FlightTrackData, FlightPhase } from "@/types";
 
@@ -66,7 +66,7 @@ export default function InboundAircraft({
     return () => clearInterval(timer);
   }, []);
 
-  // tail_number로 자동 조회 (스케줄 컨텍스트 포함)
+  // 수동 새로고침용 단건 조회
   const doFetch = useCallback(
     async (tn: string, dest: string) => {
       setLoading(true);
@@ -90,12 +90,27 @@ export default function InboundAircraft({
     [origin, scheduledDep, scheduledArr]
   );
 
-  // 마운트 시 자동 조회
+  // 서버 push 구독 (스케줄 컨텍스트 포함) — 같은 항공기를 보는 탭/유저는 서버 조회 하나를 공유
   useEffect(() => {
-    if (tailNumber) {
-      doFetch(tailNumber, destination);
-    }
-  }, [tailNumber, destination, doFetch]);
+    if (!tailNumber) return;
+    setLoading(true);
+    setError(null);
+    return subscribeFlightTrack(
+      {
+        tail_number: tailNumber,
+        destination,
+        origin,
+        scheduled_dep: scheduledDep,
+        scheduled_arr: scheduledArr,
+      },
+      (result) => {
+        setData(result);
+        setError(null);
+        setLoading(false);
+      },
+      () => setLoading(false)
+    );
+  }, [tailNumber, destination, origin, scheduledDep, scheduledArr]);
 
   const handleRefresh = () => {
     if (tailNumber) {
@@ -2,6 +2,7 @@
 // Path: /Users/hodduk/Documents/git/mfa/frontend/src/lib/api.ts
 
 import { supabase } from "@/lib/supabase";
+import type { FlightTrackData } from "@/types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "";
 
@@ -201,13 +202,17 @@ export async function fetchFullBriefing(station: string) {
   return safeJson(res);
 }
 
-export async function fetchAirSigmet(origin: string, destination: string) {
-  const res = await fetch(
-    `${API_BASE}/api/briefing/airsigmet?origin=${origin}&destination=${destination}`
+// 같은 페어링 번호가 날짜별로 반복되므로 시작 시각(start_utc)으로 특정한다
+export async function fetchPairingBriefing(pairingId: string, startUtc: string) {
+  const headers = await getAuthHeaders();
+  const startDate = new Date(startUtc).toISOString().slice(0, 10);
+  const res = await handleResponse(
+    await fetch(
+      `${API_BASE}/api/briefing/pairing/${encodeURIComponent(pairingId)}?start_date=${startDate}`,
+      { headers }
+    )
   );
-  if (!res.ok) {
-    throw new Error("Failed to fetch SIGMET/AIRMET data");
-  }
+  if (!res.ok) throw new Error(`Failed to fetch briefing for pairing ${pairingId}`);
   return safeJson(res);
 }
 
@@ -321,15 +326,7 @@ export async function fetchFar117DelaySimulation(
 }
 
 /* ── Flight API ── */
-export async function fetchFlightTrack({
-  tail_number,
-  flight_number,
-  provider,
-  destination,
-  origin,
-  scheduled_dep,
-  scheduled_arr,
-}: {
+export interface FlightTrackParams {
   tail_number?: string;
   flight_number?: string;
   provider?: string;
@@ -337,17 +334,22 @@ export async function fetchFlightTrack({
   origin?: string;
   scheduled_dep?: string;
   scheduled_arr?: string;
-}) {
+}
+
+function flightTrackQuery(p: FlightTrackParams): string {
   const params = new URLSearchParams();
-  if (tail_number) params.set("tail_number", tail_number);
-  if (flight_number) params.set("flight_number", flight_number);
-  if (provider) params.set("provider", provider);
-  if (destination) params.set("destination", destination);
-  if (origin) params.set("origin", origin);
-  if (scheduled_dep) params.set("scheduled_dep", scheduled_dep);
-  if (scheduled_arr) params.set("scheduled_arr", scheduled_arr);
-
-  const res = await fetch(`${API_BASE}/api/flight/track?${params.toString()}`);
+  if (p.tail_number) params.set("tail_number", p.tail_number);
+  if (p.flight_number) params.set("flight_number", p.flight_number);
+  if (p.provider) params.set("provider", p.provider);
+  if (p.destination) params.set("destination", p.destination);
+  if (p.origin) params.set("origin", p.origin);
+  if (p.scheduled_dep) params.set("scheduled_dep", p.scheduled_dep);
+  if (p.scheduled_arr) params.set("scheduled_arr", p.scheduled_arr);
+  return params.toString();
+}
+
+export async function fetchFlightTrack(p: FlightTrackParams) {
+  const res = await fetch(`${API_BASE}/api/flight/track?${flightTrackQuery(p)}`);
   if (!res.ok) {
     const error = await safeJson(res);
     throw new Error(error?.detail || "Failed to fetch flight track");
@@ -355,6 +357,21 @@ export async function fetchFlightTrack({
   return safeJson(res);
 }
 
+// 서버가 poller 주기마다 push하는 추적 결과를 구독한다. 반환된 함수로 구독 해제.
+// 연결이 끊기면 EventSource가 자동 재연결한다.
+export function subscribeFlightTrack(
+  p: FlightTrackParams,
+  onData: (data: FlightTrackData) => void,
+  onError?: () => void
+): () => void {
+  const source = new EventSource(`${API_BASE}/api/flight/track/stream?${flightTrackQuery(p)}`);
+  source.addEventListener("track", (e) => {
+    onData(JSON.parse((e as MessageEvent).data));
+  });
+  if (onError) source.onerror = onError;
+  return () => source.close();
+}
+
 export async function fetchTrackerStatus() {
   const res = await fetch(`${API_BASE}/api/flight/status`);
   if (!res.ok) {